@@ -1,15 +1,21 @@
 from PIL import ImageTk, Image, ImageDraw
 import tkinter as tk 
 import tkinter.font as tkFont
+from sprite_cache import SpriteCache
+from image_assets import chromaKey, imageHash, loadDerivedAssets
 
 class TrackItem:
-    def __init__(self, scale=40, position=(0, 0), sourceImages=None, animations=None, parent=None, trackMember=None,  type="image"):
+    progressBarSprites = SpriteCache(maxSize=512)  # Shared by all members: keyed by (width, height, color)
+    progressBarWidthStep = 2  # Bar widths are rounded to this many pixels so sprites get reused
+    resizedImages = SpriteCache(maxSize=256)  # Keyed by (member, variant, source pixel hash, scale, fast)
+    resizeScaleStep = 0.25  # Scales are rounded to this step so nearby window sizes share images
+    
+    def __init__(self, scale=40, position=(0, 0), sourceImages=None, parent=None, trackMember=None,  type="image"):
         """
         Initialize a TrackItem instance.
 
         :param scale: Integer (0-1000) representing the scaled height of the image.
         :param position: Tuple (x, y) for the image's position, scaled relative to base dimensions.
-        :param animations: Placeholder for animations, currently empty.
         """
         self.trackMember = trackMember
         self.scale = max(0, min(scale, 1000))
@@ -18,9 +24,9 @@ class TrackItem:
         self.sourceImages = {
             key: ImageTk.PhotoImage(img) for key, img in self.originalImages.items()
         } 
+        self.assetHashes = {}  # variant -> (original image, pixel hash), hashed once per image
         self.imageId = None
         self.currentImageKey = "dark"
-        self.animations = animations if animations is not None else []
         self.timerValue = 0.0  # Timer starts at 0.0 seconds
         self.parent = parent
         self.font = tkFont.Font(family="Digital-7", size=25, weight="bold")
@@ -32,18 +38,22 @@ class TrackItem:
         self.timerCanvasHeight = 200
         self.timerX = 0
         self.timerY = 0
+        self.timerTextId = None
+        self.timerText = None  # Text currently shown, so the timer image is only looked up when it changes
+        self.timerImage = None
         self.initializeTimerDim()
         self.heightOffset = None
-        self.lastUpdateChunk = 0
         self.progressBarColor = "#00ff0f"
+        self.barStartPixel = None
         
         if type == "image":
             numChunks = len(self.parent.chunks)
-            self.timeline = [0.0] * numChunks
             self.positionTimeline = [0.0] * numChunks
-            self.initializeTimeline()
             self.memberColor = self.parent.getMemberColor(self.trackMember)
-            clearImage = self.chromaKeyImage(self.originalImages["dark"], self.memberColor)
+            # Clear image and bar start are derived once per source image and color, then read from the disk cache
+            clearImage, self.barStartPixel = loadDerivedAssets(
+                self.originalImages["dark"], self.chromaKeyColor(self.memberColor), self.memberColor
+            )
             self.originalImages["clear"] = clearImage  
             self.sourceImages["clear"] = ImageTk.PhotoImage(clearImage)
             self.xOffset = int((700 / 1920) * self.parent.baseWidth * self.parent.scaleX)  # Fixed distance from the right edge of the canvas
@@ -60,122 +70,16 @@ class TrackItem:
         baseHeight = 1080
         x, y = position
         return x / baseWidth, y / baseHeight
-    
-    def setMaxTime(self, maxTime):
-        self.maxTime = maxTime
+        
+    @staticmethod
+    def chromaKeyColor(memberColor):
+        """Color keyed out of a member's dark image."""
+        return "ffff00" if memberColor == "#aa9f00" else memberColor
         
     def chromaKeyImage(self, image, keyColor):
         """Apply chroma keying to an image"""
-        if keyColor == "#aa9f00": keyColor = "ffff00"
-        keyColorRGB = tuple(int(keyColor.lstrip('#')[i:i+2], 16) for i in (0, 2, 4))
-        
-        image = image.convert("RGBA")
-        data = image.getdata()
-        newData = []
-        for item in data:
-            if item[:3] == keyColorRGB:
-                newData.append((0, 0, 0, 0))
-            else:
-                newData.append(item)
-        
-        image.putdata(newData)
-        return image
+        return chromaKey(image, self.chromaKeyColor(keyColor))
     
-    def animatePosition(self, startY, endY, startChunk, endChunk):
-        self.animations.append({
-            "startY": startY,
-            "endY": endY,
-            "startChunk": startChunk,
-            "endChunk": endChunk
-        })
-        
-    def updateAnimations(self, currentChunk):
-        for anim in self.animations[:]:
-            if currentChunk < anim["startChunk"]:
-                continue  # Animation hasn't started yet
-            
-            totalChunks = anim["endChunk"] - anim["startChunk"]
-            if totalChunks <= 0:
-                self.animations.remove(anim)
-                continue
-            
-            currentProgressChunk = currentChunk - anim["startChunk"]
-            progress = min(currentProgressChunk / totalChunks, 1.0)
-            # Linear interpolation for smooth transition
-            interpolatedY = anim["startY"] + (anim["endY"] - anim["startY"]) * progress
-            
-            # x, _ = self.parent.canvas.coords(self.imageId)
-           # self.parent.canvas.coords(self.imageId, x, interpolatedY)
-            self.positionTimeline[currentChunk] = interpolatedY
-            
-            if progress == 1.0:
-                interpolatedY = anim["endY"]  # Lock at final position
-                #self.parent.canvas.coords(self.imageId, x, interpolatedY)
-                self.positionTimeline[currentChunk] = interpolatedY
-                
-    def checkAndSwap(self, currentChunk):
-        """
-        Checks timeline conditions and triggers swap animations.
-        """
-        
-        keys = list(self.parent.memberImages.keys())
-        if not hasattr(self, 'heightOffset') or not self.heightOffset:
-            firstKey, secondKey = keys[0], keys[1]
-            firstY = self.parent.canvas.coords(self.parent.memberImages[firstKey].imageId)[1]
-            secondY = self.parent.canvas.coords(self.parent.memberImages[secondKey].imageId)[1]
-            self.heightOffset = (secondY - firstY, firstY)  # (scaledHeight, yOffset)
-            self.initializeProgressBar()
-        
-        currentKeyIndex = keys.index(self.trackMember)
-        currentValue = self.timeline[currentChunk]
-        
-        membersToPass = 0
-        positionsToUpdate = {} # Store members and posoitions for swapping
-        scaledHeight, yOffset = self.heightOffset
-        endingY = currentKeyIndex * scaledHeight + yOffset
-        
-        stableKeyOrder = list(keys)
-        
-        for i in range(currentKeyIndex - 1, -1, -1): # Decrement to check previous member 
-            otherKey = stableKeyOrder[i]
-            otherTrackItem = self.parent.memberImages[otherKey]
-            otherValue = otherTrackItem.timeline[currentChunk + 4]
-            baseChunkLength = 12 if otherValue > 0.0 else 10
-            futureIndex = currentChunk + baseChunkLength + 2 * (membersToPass - 1)
-            
-            # print(f"{self.trackMember} currentY: {currentY}, Other y: {otherY}")
-            # If current trackItem's value surpasses other's value
-            if currentValue > otherValue or (currentChunk < len(self.parent.chunks) - futureIndex - 1 and self.timeline[futureIndex] > otherValue and membersToPass > 1):
-                membersToPass += 1
-                startChunk = currentChunk + 2 * (membersToPass - 1) 
-                endChunk = startChunk + baseChunkLength
-                
-                newY = (i + 1) * scaledHeight + yOffset
-                positionsToUpdate[otherTrackItem] = (newY, startChunk, endChunk)
-                
-                # Update endingY for the current trackItem
-                endingY = i * scaledHeight + yOffset
-        
-        if membersToPass > 0:
-            self.animatePosition(
-                currentKeyIndex * scaledHeight + yOffset, 
-                endingY, 
-                currentChunk,
-                currentChunk + baseChunkLength + 2 * (membersToPass - 1))
-            
-            for otherTrackItem, (newY, startChunk, endChunk) in positionsToUpdate.items():
-                otherTrackItem.animatePosition(
-                    (stableKeyOrder.index(otherTrackItem.trackMember) * scaledHeight + yOffset), 
-                    newY, startChunk, endChunk)
-
-            keys.pop(currentKeyIndex)
-            keys.insert(currentKeyIndex - membersToPass, self.trackMember)
-            self.parent.memberImages = {key: self.parent.memberImages[key] for key in keys}
-            # print("Member image keys:", self.parent.memberImages.keys())
-        
-        _, y = self.parent.canvas.coords(self.imageId)
-        self.positionTimeline[currentChunk] = y
-        
     def initializeTimerDim(self):
         """
         Create a timer canvas based on the current scale.
@@ -183,37 +87,23 @@ class TrackItem:
         self.scaledWidth = int(self.timerCanvasWidth * (self.scale / 100))
         self.scaledHeight = int(self.timerCanvasHeight * (self.scale / 100))
     
-    def initializeTimeline(self):
-        self.timeline = [0.0] * len(self.parent.chunks)
-        activeChunks = 0
-        labelRanges = [] 
-        # print("All labels:", self.parent.labels)
-        for label in self.parent.labels:
-            member, start, end = label
-            if member == self.trackMember:
-                labelRanges.append((start, end))
-                for chunkIndex in range(start, end + 1):
-                    activeChunks += 1
-                    self.timeline[chunkIndex] = activeChunks * (self.parent.chunk_duration / 1000)
-            
-        totalChunks = len(self.timeline)
-        currentRangeIndex = 0
-        lastTime = 0.0
-        
-        for chunkIndex in range(totalChunks):
-        # If within the current label range, skip (already calculated)
-            if (currentRangeIndex < len(labelRanges) and labelRanges[currentRangeIndex][0] <= chunkIndex <= labelRanges[currentRangeIndex][1]):
-                if chunkIndex == labelRanges[currentRangeIndex][1]:
-                    lastTime = self.timeline[chunkIndex]
-                    currentRangeIndex += 1  # Move to the next range
-                    self.lastUpdateChunk = chunkIndex
-                continue
-
-            # Fill in time for chunks outside the active ranges
-            self.timeline[chunkIndex] = lastTime
+    def sceneValue(self, arrayName, chunkIndex):
+        """This member's value at a chunk in one of the parent scene's (members x chunks) arrays, e.g. "timers"."""
+        scene = self.parent.getScene()
+        row = scene.memberRows.get(self.trackMember)
+        if row is None or not 0 <= chunkIndex < scene.numChunks:
+            return 0.0
+        return float(getattr(scene, arrayName)[row, chunkIndex])
               
     def setImageId(self, imageId):
         self.imageId = imageId
+    
+    def getImageCoords(self):
+        """Position of the member image, as last placed through the parent's retained canvas."""
+        return self.parent.retainedCanvas.getCoords(self.imageId)
+    
+    def moveImage(self, x, y):
+        self.parent.retainedCanvas.coords(self.imageId, x, y)
         
     def getTimerX(self):
         if self.timerX:
@@ -253,20 +143,41 @@ class TrackItem:
         """
         Return a string representation of the TrackItem instance.
         """
-        return f"TrackItem(scale={self.scale}, position={self.position}, animations={self.animations})"
+        return f"TrackItem(scale={self.scale}, position={self.position})"
     
-    def resizeImages(self, scale):
+    def resizeImages(self, scale, fast=False):
         """
-        Resize all images ('dark' and 'light') to the new scale.
+        Resize all images ('dark', 'light' and 'clear') to the new scale.
+        Resized images are cached per rounded scale, so going back to a recent size does no resampling.
         :param scale: Scale factor (0-1000, where 100 is the normal size).
+        :param fast: Use nearest-neighbour resampling, for the intermediate sizes of a window drag.
         """
-        for key in self.originalImages:
-            originalImage = self.originalImages[key]
-            baseWidth, baseHeight = originalImage.size
-            newWidth = int(baseWidth * (scale / 100))
-            newHeight = int(baseHeight * (scale / 100))
-            resizedImage = originalImage.resize((newWidth, newHeight))
-            self.sourceImages[key] = ImageTk.PhotoImage(resizedImage)
+        scale = round(scale / self.resizeScaleStep) * self.resizeScaleStep
+        for key, originalImage in self.originalImages.items():
+            self.sourceImages[key] = self.resizedImages.get(
+                (self.trackMember, key, self.assetHash(key, originalImage), scale, fast),
+                lambda: ImageTk.PhotoImage(self._resizeImage(originalImage, scale, fast))
+            )
+    
+    def assetHash(self, key, originalImage):
+        """
+        Stable cache key for an original image. Unlike id() it cannot be reused by another image after this one is
+        garbage collected; the image is kept with its hash so a replaced variant is hashed again.
+        """
+        cached = self.assetHashes.get(key)
+        if cached is None or cached[0] is not originalImage:
+            cached = (originalImage, imageHash(originalImage))
+            self.assetHashes[key] = cached
+        return cached[1]
+    
+    @staticmethod
+    def _resizeImage(originalImage, scale, fast):
+        baseWidth, baseHeight = originalImage.size
+        newWidth = max(1, int(baseWidth * (scale / 100)))
+        newHeight = max(1, int(baseHeight * (scale / 100)))
+        if fast:
+            return originalImage.resize((newWidth, newHeight), Image.Resampling.NEAREST)
+        return originalImage.resize((newWidth, newHeight))
             
     def updateTime(self):
         """
@@ -275,57 +186,62 @@ class TrackItem:
         if self.parent and hasattr(self.parent, "chunk_duration"):
             self.timerValue += self.parent.chunk_duration / 1000.0
          
-    def saveLastTime(self, chunkIndex):
-        self.timeline[chunkIndex] = self.timeline[chunkIndex - 1]
-                 
     def drawTextForCurrentChunk(self, chunkIndex):
         """
         Draw the timer text at the appropriate position.
-        :param draw: ImageDraw instance for drawing text
+        The timer is one canvas item on the parent's retained canvas, so it is only reconfigured when the
+        shown value changes and only moved when the member image moves. Text comes from the parent's TimerRenderer glyph atlas when the font
+        file is available, otherwise from a canvas text item.
         """
         if chunkIndex == len(self.parent.chunks): return
         self.setPositionFromTimeline(chunkIndex)
           
-        timerText = f"{self.timeline[chunkIndex]:.1f}" if self.timeline[chunkIndex] > 0.0 else ''
+        timerValue = self.sceneValue("timers", chunkIndex)
+        timerText = f"{timerValue:.1f}" if timerValue > 0.0 else ''
         # print(f"Timer text: {timerText}")
         
-        textWidth = self.font.measure(timerText)
-        
-        # Update timer canvas dimensions
-        scaledHeight = int(50 * (self.timerScale / 100) * self.parent.scaleY)
-        scaledWidth = int(textWidth * (self.timerScale / 100) * self.parent.scaleX)
-        # print(f"Scaled height: {scaledHeight}, Scaled width: {scaledWidth}")
-        
-        self.timerCanvasWidth = scaledWidth
-        self.timerCanvasHeight = scaledHeight
-        
-        x, y = self.parent.canvas.coords(self.imageId)
+        x, y = self.getImageCoords()
         # Update timer position to align the top-right corner
         self.timerX = x + self.xOffset
         self.timerY = y - (15 * self.parent.scaleX)
+        timerCoords = (round(self.timerX), round(self.timerY))
         
         # print(f"Timer x: {self.timerX}, Timer y: {self.timerY}")
         
-        if hasattr(self, "timerTextId") and self.timerTextId:
-            self.parent.canvas.delete(self.timerTextId)
+        renderer = self.parent.timerRenderer
+        retainedCanvas = self.parent.retainedCanvas
+        if self.timerTextId is None:
+            if renderer.available:
+                self.timerTextId = retainedCanvas.create("image", *timerCoords, anchor="ne")
+            else:
+                self.timerTextId = retainedCanvas.create(
+                    "text", *timerCoords, font=self.font, fill="white", anchor="ne"  # Anchor the text to the right (east)
+                )
+        
+        if timerText != self.timerText:
+            self.timerText = timerText
+            if renderer.available:
+                self.timerImage = renderer.image(timerText)
+                retainedCanvas.itemconfig(self.timerTextId, image=self.timerImage or "")
+                textWidth = self.timerImage.width() if self.timerImage else 0
+            else:
+                retainedCanvas.itemconfig(self.timerTextId, text=timerText)
+                textWidth = self.font.measure(timerText)
+            
+            # Update timer canvas dimensions
+            self.timerCanvasWidth = int(textWidth * (self.timerScale / 100) * self.parent.scaleX)
+            self.timerCanvasHeight = int(50 * (self.timerScale / 100) * self.parent.scaleY)
         
-        self.timerTextId = self.parent.canvas.create_text(
-            round(self.timerX),
-            round(self.timerY),
-            text=timerText,
-            font=self.font,
-            fill="white",
-            anchor="ne"  # Anchor the text to the right (east)
-        )
+        retainedCanvas.coords(self.timerTextId, *timerCoords)
             
     def setPositionFromTimeline(self, currentChunk):
         """
         Sets the position of the TrackItem based on its positionTimeline for the given chunk.
         """
         if 0 <= currentChunk < len(self.positionTimeline):
-            x, _ = self.parent.canvas.coords(self.imageId)
-            self.parent.canvas.coords(self.imageId, x, self.positionTimeline[currentChunk])
-            self.updateProgressBar(currentChunk, self.maxTime)
+            x, _ = self.getImageCoords()
+            self.moveImage(x, float(self.positionTimeline[currentChunk]))
+            self.updateProgressBar(currentChunk)
             
     def updateAndDrawTimer(self, chunkIndex):
         """
@@ -336,24 +252,16 @@ class TrackItem:
             self.drawTextForCurrentChunk(chunkIndex)
     
     def getProgressY(self):
-        _, y = self.parent.canvas.coords(self.imageId)
+        _, y = self.getImageCoords()
         return  y + 0.7 * self.heightOffset[0]
     
     def findStartX(self):
         if self.progressBarXStart is None:
-            darkImage = self.originalImages["dark"]
-            memberColorRGBA = tuple(int(self.memberColor.lstrip('#')[i:i+2], 16) for i in (0, 2, 4)) + (255,)
-            pixels = darkImage.load()
-            width, _ = darkImage.size
-            
-            for x in range(width - 1, -1, -1):  # Iterate from the rightmost to the leftmost pixel
-                pixel = pixels[x, 0]  # Access the first row only
-                if pixel[:3] == memberColorRGBA[:3] and pixel[3] != 0:  # Check for member color and non-transparent alpha
-                    self.progressBarXStart = x * (self.scale / 100 / 2)
-                    return self.progressBarXStart  # Return the x-coordinate of the last matching pixel
-            return 0  # Default to 0 if no match is found
-        else:
-            return self.progressBarXStart
+            # Last pixel of the member color in the first row, found when the image assets were derived
+            if self.barStartPixel is None:
+                return 0  # Default to 0 if no match is found
+            self.progressBarXStart = self.barStartPixel * (self.scale / 100 / 2)
+        return self.progressBarXStart
     
     def createRoundedRectangleImage(self, width, height, color, radius):
         """Create a rounded rectangle image with Pillow."""
@@ -376,32 +284,31 @@ class TrackItem:
             0, self.progressBarHeight, self.progressBarColor, radius=self.progressBarHeight // 2
         )
         
-        self.progressBarCanvasImage = self.parent.canvas.create_image(
-            0, self.getProgressY(), anchor="nw", image=self.progressBarImage
+        self.progressBarCanvasImage = self.parent.retainedCanvas.create(
+            "image", 0, y, anchor="nw", image=self.progressBarImage
         )
         
         self.parent.canvas.tag_lower(self.progressBarCanvasImage, self.imageId)
         
-    def updateProgressBar(self, currentChunk, maxTime):
-        currentTime = self.timeline[currentChunk]
-        
-        if maxTime == 0 or currentTime == 0.0:
+    def updateProgressBar(self, currentChunk):
+        progress = self.sceneValue("progress", currentChunk)
+        if progress == 0.0:
             return
          
-        progress = currentTime / maxTime
         xStart = 1920 * self.parent.scaleX * 1 / 16 - self.progressBarHeight // 2
         xEnd = min(xStart + progress * (self.timerX - xStart), self.timerX) # Update later
         # print(f"X start: {xStart}, xEnd: {xEnd}")
         
         barWidth = int(xEnd - xStart) if xEnd != 0 else 0
+        barWidth = max(0, barWidth - barWidth % self.progressBarWidthStep)
         y = self.getProgressY()
         
         color = self.progressBarColor if self.currentImageKey == 'light' else "#ffffff"
-        # Update rectangle for the main bar
-        self.progressBarImage = self.createRoundedRectangleImage(
-            int(barWidth), self.progressBarHeight, color, radius=self.progressBarHeight // 2
+        # Bars are rendered once per (width, height, color) and reused from the cache
+        sprite = self.progressBarSprites.get(
+            (barWidth, self.progressBarHeight, color),
+            lambda: self.createRoundedRectangleImage(barWidth, self.progressBarHeight, color, radius=self.progressBarHeight // 2)
         )
-        
-        self.parent.canvas.itemconfig(self.progressBarCanvasImage, image=self.progressBarImage)
-        
-        self.parent.canvas.coords(self.progressBarCanvasImage, xStart, y)
\ No newline at end of file
+        self.progressBarImage = sprite  # Keeps the shown sprite alive even if the cache evicts it
+        self.parent.retainedCanvas.itemconfig(self.progressBarCanvasImage, image=sprite)
+        self.parent.retainedCanvas.coords(self.progressBarCanvasImage, xStart, y)
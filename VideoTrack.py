@@ -13,8 +13,12 @@ from tqdm import tqdm
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
 class VideoTrackItem(TrackItem):
-    def __init__(self, canvas, parent, videoPath, scale=100, scaleX=1.0, position=(0,0), baseHeight=720):
-        super().__init__(scale, position, sourceImages={}, animations=[], type="video")
+    def __init__(self, canvas, parent, videoPath, scale=100, scaleX=1.0, position=(0,0), baseHeight=720, isMusicVideo=True, clock=None):
+        """
+        :param isMusicVideo: True when the video belongs to the song; otherwise it is a background that loops.
+        :param clock: PlaybackClock the displayed frame follows. Play/pause/seek are taken from its events.
+        """
+        super().__init__(scale, position, sourceImages={}, type="video")
         self.canvas = canvas
         self.videoPath = videoPath
         self.parent = parent
@@ -27,6 +31,9 @@ class VideoTrackItem(TrackItem):
         self.thread = None
         self.baseHeight = baseHeight
         self.currentFrame = None
+        self.isMusicVideo = isMusicVideo
+        self.clock = clock
+        self.pendingSeekMs = None
         
         # Get video dimensions
         if self.cap.isOpened():
@@ -38,6 +45,18 @@ class VideoTrackItem(TrackItem):
         self.adjustScale(baseHeight)
         self.setPosition()
         
+        if self.clock is not None:
+            self.clock.subscribe(self.onClockEvent)
+    
+    def onClockEvent(self, event, positionMs, chunkIndex):
+        """Follow the playback clock. Seeks are applied by the video thread so the capture is only touched there."""
+        if event in ("play", "seek"):
+            self.pendingSeekMs = positionMs
+        if event in ("play", "resume"):
+            self.play()
+        elif event == "pause":
+            self.pause()
+        
     def adjustScale(self, currentHeight):
         """Adjust the video dimensions and scale based on the current height."""
         # Calculate the new scale as a percentage
@@ -80,17 +99,54 @@ class VideoTrackItem(TrackItem):
             raise ValueError("Invalid FPS detected in video file.")
 
         frameDuration = 1000 / fps  # Duration of each frame in ms
+        totalFrames = max(1, int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT)))
+        nextFrame = int(self.cap.get(cv2.CAP_PROP_POS_FRAMES))
         lastFrameTime = time.time()
         
         while self.isPlaying and self.cap.isOpened():
             if self.isPaused:
                 time.sleep(0.02)  # Wait briefly while paused
-                lastFrameTime = time.time() 
+                lastFrameTime = time.time()
                 continue
             
+            if self.clock is None:
+                # No clock to follow, pace frames by sleeping
+                elapsedTime = time.time() - lastFrameTime
+                time.sleep(max(0, (frameDuration / 1000) - elapsedTime))
+                lastFrameTime = time.time()
+                targetFrame = nextFrame
+            else:
+                if self.pendingSeekMs is not None:
+                    nextFrame = self._frameAt(self.pendingSeekMs, frameDuration, totalFrames)
+                    self.cap.set(cv2.CAP_PROP_POS_FRAMES, nextFrame)
+                    self.pendingSeekMs = None
+                
+                positionMs = self.clock.positionMs()
+                targetFrame = self._frameAt(positionMs, frameDuration, totalFrames)
+                if not self.isMusicVideo and targetFrame < nextFrame - 1:
+                    # Background loop wrapped around
+                    nextFrame = 0
+                    self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                if targetFrame < nextFrame:
+                    # Ahead of the clock, wait until the next frame is due
+                    time.sleep(min(0.02, max(0.001, (nextFrame * frameDuration - positionMs % (totalFrames * frameDuration)) / 1000)))
+                    continue
+                
+                if targetFrame - nextFrame > fps:
+                    # Far behind, jump instead of decoding every frame
+                    self.cap.set(cv2.CAP_PROP_POS_FRAMES, targetFrame)
+                    nextFrame = targetFrame
+                while nextFrame < targetFrame and self.cap.grab():
+                    nextFrame += 1  # Drop frames to catch up with the clock
+            
             ret, frame = self.cap.read()
             if not ret:
+                if not self.isMusicVideo:
+                    self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                    nextFrame = 0
+                    continue
                 break
+            nextFrame += 1
             
             frame = cv2.resize(frame, (self.newWidth, self.newHeight))
             frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
@@ -106,14 +162,15 @@ class VideoTrackItem(TrackItem):
             self.canvas.image = img
             self.canvas.coords(self.videoFrameId, self.position[0], self.position[1])
             self.canvas.update()
-            
-            # Maintain FPS
-            elapsedTime = time.time() - lastFrameTime
-            sleepTime = max(0, (frameDuration / 1000) - elapsedTime)
-            time.sleep(sleepTime)
-            lastFrameTime = time.time()
         self.isPlaying = False
 
+    def _frameAt(self, timeMs, frameDuration, totalFrames):
+        """Frame index shown at a song time. Background videos loop, music videos hold their last frame."""
+        frameIndex = int(timeMs / frameDuration)
+        if self.isMusicVideo:
+            return min(frameIndex, totalFrames - 1)
+        return frameIndex % totalFrames
+
     def setPosition(self):
         x = 300 / 1920 * 1920 * self.scaleX - (self.newWidth / 2)
         self.position = (x, 0)
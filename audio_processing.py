@@ -1,10 +1,10 @@
 import os
-import json
 from pydub import AudioSegment
 import librosa
 from tensorflow.keras.models import Sequential
 from tensorflow.keras.layers import Dense, Flatten, Input
 from concurrent.futures import ThreadPoolExecutor
+from project_store import loadSongLabels
 import numpy as np
 
 CHUNK_DURATION = 40
@@ -12,6 +12,31 @@ CHUNK_DURATION = 40
 def convertToWav(inputMp3Path, outputWavPath):
     audio = AudioSegment.from_mp3(inputMp3Path)
     audio.export(outputWavPath, format="wav")
+
+def isCacheFresh(sourcePath, cachedPath):
+    """A cached file is reusable if it exists and is newer than the file it was derived from."""
+    return os.path.exists(cachedPath) and os.path.getmtime(cachedPath) >= os.path.getmtime(sourcePath)
+
+def convertToWavCached(inputMp3Path, outputWavPath):
+    """Decode to WAV only when the cached WAV is missing or older than the MP3."""
+    if isCacheFresh(inputMp3Path, outputWavPath):
+        return False
+    convertToWav(inputMp3Path, outputWavPath)
+    return True
+
+def prepareWav(songPath, wavPath):
+    """Decode a song to WAV unless the cached WAV is still valid. Picklable, so it can run in a prefetch worker."""
+    convertToWavCached(songPath, wavPath)
+    return wavPath
+
+def prepareSong(songPath, wavPath, featuresPath, segmentDuration=200):
+    """Decode a song to PCM and extract its segment features, reusing both caches when still valid.
+    Runs in a background worker while the previous song is being trained on."""
+    convertToWavCached(songPath, wavPath)
+    if os.path.exists(featuresPath) and not isCacheFresh(wavPath, featuresPath):
+        os.remove(featuresPath)
+    segmentAndSaveAudio(wavPath, featuresPath, segmentDuration=segmentDuration)
+    return wavPath, featuresPath
     
 def extractFeatures(audioPath, sr=22050):
     """Extracts features for the full duration of the training audio"""
@@ -44,8 +69,7 @@ def combineMemberVocals(jsonFiles, vocalsOnlySongs, selectedGroup):
             print(f"Warning: No matching JSON file found for {songTitle}. Skipping.")
             continue
 
-        with open(jsonFilePath, 'r') as file:
-            labels = json.load(file)
+        labels = loadSongLabels(selectedGroup, songTitle, jsonFilePath)
             
         vocalsPath = os.path.join(f"./training_data/{selectedGroup}", vocalsFile)
         vocals = AudioSegment.from_file(vocalsPath)
@@ -69,11 +93,14 @@ def combineMemberVocals(jsonFiles, vocalsOnlySongs, selectedGroup):
         audioSegment.export(outputFile, format="mp3")
         print(f"Saved {outputFile}")
         
-def segmentAndSaveAudio(audioPath, savePath='', segmentDuration=200):
-    """Segment the audio into fixed 40ms chunks and extract features per chunk"""
+def segmentAndSaveAudio(audioPath, savePath='', segmentDuration=200, scaler=None):
+    """Segment the audio into fixed 40ms chunks and extract features per chunk.
+    If a RunningScaler is given, its statistics are updated as the features are produced."""
     
     if os.path.exists(savePath) and savePath != '':  # ✅ Skip processing if file already exists
         print(f"Loading precomputed chunks from {savePath}")
+        if scaler is not None:
+            scaler.updateFromFile(savePath)
         return np.load(savePath)
     
     print(f"Extracting audio chunks from {audioPath}...")
@@ -104,7 +131,11 @@ def segmentAndSaveAudio(audioPath, savePath='', segmentDuration=200):
         featureMatrix = featureMatrix.T  # Shape: (time-steps, 153)
 
         featureChunks.append(featureMatrix)
+        if scaler is not None and not scaler.hasSource(savePath):
+            scaler.update(featureMatrix)
     
+    if scaler is not None and savePath != '':
+        scaler.sources.add(savePath)
     np.save(savePath, featureChunks)
     print(f"Saved chunks to {savePath}")
     return np.array(featureChunks)
@@ -148,9 +179,12 @@ def getSongsFromSameAlbum():
     
     return songsFromSameAlbum
 
-def getVoiceDetectionArray(model, totalChunks, audioSegments):
+def getVoiceDetectionArray(model, totalChunks, audioSegments, scaler=None):
     detectionArray = [0] * (totalChunks + 1) # Track 40ms per chunk responsees
     
+    if scaler is not None:
+        audioSegments = scaler.transform(audioSegments)
+    
     def processSegment(segmentIndex):
         # Ensure input shape matches model expectation
         segment = audioSegments[segmentIndex]
@@ -11,15 +11,29 @@ from pydub.utils import make_chunks
 from TrackItem import TrackItem
 from voice_training import extractFeatures
 import numpy as np
-import pygame
+from playback_engine import PcmPlaybackEngine
+from playback_clock import PlaybackClock
+from render_scheduler import RenderScheduler
+from retained_canvas import RetainedCanvas
+from member_activity import MemberActivityIndex, MemberTimelines
+from ranking import RankingEngine
+from label_store import LabelStore, labelsHash
+from label_matching import matchLabels
+from marker_index import MarkerIndex
+from project_store import getProjectStore, loadSongLyrics, saveSongLyrics
+from timer_renderer import TimerRenderer
+from scene import Scene, STATE_KEYS, STATE_DARK, compileScene, sceneKey, getScenePath
 from VideoTrack import VideoTrackItem
 from navigation_arrows import NavigationArrows
 import json
 import codecs
 import cv2
 from lyrics_box import LyricBox
+from lyric_layout import LyricLayout
 from audio_processing import getSongsFromSameAlbum, segmentAndSaveAudio, convertToWav, getVoiceDetectionArray
 from zoom_functions import ZoomManager, ProgressBarHandle, ProgressBarNavigator
+from feature_scaler import RunningScaler, getScalerPath
+from chunk_timeline import ChunkTimeline
 
 # Load the trained model for a specific member
 def loadModel(group, member):
@@ -30,6 +44,15 @@ def loadModel(group, member):
         print(f"Model for {member} not found in {modelPath}.")
         return None
 # End loadModel
+
+# Load the normalization stats saved next to a member's model
+def loadScaler(group, member):
+    scalerPath = getScalerPath(f"./{group}/{member}/train/data", member)
+    if os.path.exists(scalerPath):
+        return RunningScaler.load(scalerPath)
+    print(f"No normalization stats for {member} in {scalerPath}.")
+    return None
+# End loadScaler
     
 # Load images for member
 def loadMemberImages(groupName, members: dict, songPath):
@@ -79,7 +102,7 @@ class VoiceDetectionApp:
         self.audio = AudioSegment.from_file(self.vocalsOnlyPath)
         self.chunk_duration = 40
         self.totalDurationMs = len(self.audio)
-        self.chunks = [self.audio[i:i + self.chunk_duration] for i in range(0, len(self.audio), int(self.chunk_duration))]
+        self.chunks = ChunkTimeline(self.audio, self.chunk_duration)  # Slices audio lazily, only the chunk count is kept
         self.detectionResults = []
         self.currentChunkIndex = 0  # Track current playback position
         self.playbackOffset = 0
@@ -90,19 +113,31 @@ class VoiceDetectionApp:
         self.isManualUpdate = False
         self.skipNextAutoUpdate = False
         # self.root.after(100, self.loadSavedLabels) 
-        self.timeMarkers = {}
         self.lyrics = {}
-        pygame.mixer.init()
+        # Song is decoded once to PCM so seeks are instant and sample-accurate
+        self.player = PcmPlaybackEngine()
+        self.player.load(self.testSongPath)
+        # Every consumer (progress bar, timers, lyrics, video) follows this one clock
+        self.clock = PlaybackClock(self.chunk_duration, audioSource=self.player)
+        self.renderScheduler = RenderScheduler(self.root, self.clock, self.renderFrame)
             
-        self.startPoints = []
-        self.endPoints = []            
+        # Sorted marker points; progress bar sections are range queries on them
+        self.markerIndex = MarkerIndex(len(self.chunks))
+        self.startPoints = self.markerIndex.start
+        self.endPoints = self.markerIndex.end
             
+        # Canvas line for each drawn marker, keyed by chunk
         self.startPointMarkers = {}
         self.endPointMarkers = {}
         
         self.canvas = tk.Canvas(root, width=1280, height=720, bg="white")
         self.canvas.pack(fill="both", expand=True)
+        # Markers, time markers, member images, timers and progress bars are drawn through this layer
+        self.retainedCanvas = RetainedCanvas(self.canvas)
+        self.timeMarkerItems = []  # (line, text) item ids, reused on every redraw
+        self.resizeJob = None
         self.canvas.bind("<Configure>", self.onCanvasResize)
+        self.timerRenderer = TimerRenderer(self.canvas)  # Shared Digital-7 glyph atlas for member timers
         
         self.memberImages = {}
         self.memberImageIds = {}
@@ -112,7 +147,7 @@ class VoiceDetectionApp:
         self.testOrVideo = "Video"
 
         self.timeDisplayVar = tk.StringVar(value="00:00:000") # Display time iin MM:SS:milliseconds
-        self.zoomManager = ZoomManager(self.canvas, self, None, self.totalDurationMs, self.chunk_duration, pygame)
+        self.zoomManager = ZoomManager(self.canvas, self, None, self.totalDurationMs, self.chunk_duration, self.clock)
         self.progressBarCanvas = tk.Canvas(self.canvas, width=self.progressBarWidth, height=20, bg="black")
         self.progressBarCanvas.place(relx=0.5, rely=0.9, anchor="center")
         self.navigationArrows = NavigationArrows(self.canvas, self, self.progressBarCanvas)
@@ -135,14 +170,35 @@ class VoiceDetectionApp:
         # Initialize VideoTrack
         videoPath = f"./training_data/{self.selectedGroup}/{os.path.basename(self.testSongPath).replace('.mp3', '.mp4')}"
         if os.path.exists(videoPath):
-            self.videoTrackItem = VideoTrackItem(self.canvas, self, videoPath, scale=100, scaleX=self.scaleX, position=(0,0), baseHeight=720)
+            self.videoTrackItem = VideoTrackItem(self.canvas, self, videoPath, scale=100, scaleX=self.scaleX, position=(0,0), baseHeight=720, clock=self.clock)
         else:
             print(f"No music video in {videoPath}")
             # self.createThumbnail()
             videoPath = "./looping_background.mp4"
-            self.videoTrackItem = VideoTrackItem(self.canvas, self, videoPath, scale=100, scaleX=self.scaleX, position=(0,0), baseHeight=720, isMusicVideo=False)
-        
+            self.videoTrackItem = VideoTrackItem(self.canvas, self, videoPath, scale=100, scaleX=self.scaleX, position=(0,0), baseHeight=720, isMusicVideo=False, clock=self.clock)
+        
+        # Labels are edited in memory and written behind to the JSON file. Every edit is also written through
+        # to the project database, so training queries see the current labels and not the last snapshot.
+        self.projectStore = getProjectStore()
+        self.songTitle = os.path.splitext(os.path.basename(self.testSongPath))[0]
+        self.labelStore = LabelStore(
+            self.getLabelFilePath(),
+            onSnapshot=lambda labels: self.projectStore.markSynced(self.labelStore.path)
+        )
+        self.labelStore.subscribe(self.mirrorLabelEdit)
+        self.positionUpdateJob = None
         self.labels = self.loadSavedLabels() # Store labels (member, start, end)
+        self.activityIndex = MemberActivityIndex([member['name'] for member in self.members], len(self.chunks), self.labels)
+        self.timelines = MemberTimelines(self.activityIndex, self.chunk_duration)
+        self.rankingEngine = None
+        self.memberPositions = None
+        self.dirtyFromChunk = None  # Earliest chunk affected by label edits not yet laid out
+        self.scene = None  # Compiled per-chunk scene, compiled on first use and patched after edits
+        self.sceneDirtyFrom = None  # Earliest chunk whose member arrays in the scene are out of date
+        self.sceneLyricsDirty = False
+        self.lyricLayout = LyricLayout(bottom=self.lyricBottom())  # Stacked lyric positions, updated per added lyric
+        self.shownLyrics = {}
+        self.labelStore.subscribe(self.onLabelsChanged)
         self.root.after(100, self.initializeMemberImages)
         self.root.after(100, self.updateElementPositions)
         self.addControls(root)
@@ -150,6 +206,8 @@ class VoiceDetectionApp:
         self.root.after(50, self.loadLyricsFromFile)
         
         self.voiceDetectionResults = self.setAudioSegments()
+        self.clock.subscribe(self.onClockProgress)
+        self.clock.subscribe(self.onClockFrame)
         
         self.lastKeyPressTime = 0
         self.updateTimer = 0
@@ -174,16 +232,14 @@ class VoiceDetectionApp:
         
         audioSegments = segmentAndSaveAudio(songWavPath, songChunksDir, segmentDuration=200)
         print(f"Shape of first segment: {audioSegments.shape}")
-        voiceDetectionArray = getVoiceDetectionArray(self.model, len(self.chunks), audioSegments)
+        scaler = loadScaler(self.selectedGroup, self.trainingMember['name'])
+        voiceDetectionArray = getVoiceDetectionArray(self.model, len(self.chunks), audioSegments, scaler)
+        self.projectStore.saveDetections(self.selectedGroup, self.songTitle, self.trainingMember['name'], voiceDetectionArray)
         return voiceDetectionArray
     
     def resetLabels(self, event):
-        self.labels = self.loadSavedLabels()
-        for trackItem in self.memberImages.values():
-            if trackItem:
-                trackItem.initializeTimeline()
-        
-        self.initializePositions
+        self.labels = self.loadSavedLabels()  # Reloading rebuilds the activity index and timelines
+        self.schedulePositionUpdate()
     
     def toggleUIElements(self, event=None):
         """Toggle visibility of navigation arrows, progress bar handle, progress bar canvas, and time markers."""
@@ -205,7 +261,9 @@ class VoiceDetectionApp:
                 self.progressBarCanvas.place(relx=0.5, rely=0.9, anchor="center")  # Restores the canvas
         
         # Hide/Show Time Markers
-        self.canvas.itemconfig("time_marker", state=newState)
+        for lineId, textId in self.timeMarkerItems:
+            self.retainedCanvas.itemconfig(lineId, state=newState)
+            self.retainedCanvas.itemconfig(textId, state=newState)
         
         if hasattr(self, "timeDisplayLabel"):
             if self.uiHidden:
@@ -220,6 +278,7 @@ class VoiceDetectionApp:
         if hasattr(self, "videoTrackItem"):
             songNameWithoutExtension = os.path.splitext(os.path.basename(self.testSongPath))[0]
             self.toggleUIElements()
+            self.saveScene()  # Frames below are drawn from the compiled scene
             if (self.videoTrackItem.isMusicVideo):
                 self.videoTrackItem.processVideoAndSave(outputPath=songNameWithoutExtension + ".mp4")
             else:
@@ -310,9 +369,9 @@ class VoiceDetectionApp:
         self.selectedMarker = {"chunkIndex": chunkIndex, "type": markerType}
         print(f"Marker selected at {chunkIndex} with type {markerType}")
         if markerType == "start":
-            self.canvas.itemconfig(self.startPointMarkers[chunkIndex], fill="turquoise")
+            self.retainedCanvas.itemconfig(self.startPointMarkers[chunkIndex], fill="turquoise")
         elif markerType == "end":
-            self.canvas.itemconfig(self.endPointMarkers[chunkIndex], fill="pink")
+            self.retainedCanvas.itemconfig(self.endPointMarkers[chunkIndex], fill="pink")
         
         self.canvas.bind("<Delete>", self.deleteSelectedMarker)
         
@@ -328,14 +387,12 @@ class VoiceDetectionApp:
         
         if markerType == "start":
             if chunkIndex in self.startPointMarkers:
-                self.canvas.delete(self.startPointMarkers[chunkIndex])
-                del self.startPointMarkers[chunkIndex]
+                self.retainedCanvas.release(self.startPointMarkers.pop(chunkIndex))
                 if chunkIndex in self.startPoints:
                     self.startPoints.remove(chunkIndex)  # Remove from startPoints
         elif markerType == "end":
             if chunkIndex in self.endPointMarkers:
-                self.canvas.delete(self.endPointMarkers[chunkIndex])
-                del self.endPointMarkers[chunkIndex]
+                self.retainedCanvas.release(self.endPointMarkers.pop(chunkIndex))
                 if chunkIndex in self.endPoints:
                     self.endPoints.remove(chunkIndex)  # Remove from endPoints
                 
@@ -353,9 +410,9 @@ class VoiceDetectionApp:
         markerType = self.selectedMarker["type"]
 
         if markerType == "start" and chunkIndex in self.startPointMarkers:
-            self.canvas.itemconfig(self.startPointMarkers[chunkIndex], fill="green")
+            self.retainedCanvas.itemconfig(self.startPointMarkers[chunkIndex], fill="green")
         elif markerType == "end" and chunkIndex in self.endPointMarkers:
-            self.canvas.itemconfig(self.endPointMarkers[chunkIndex], fill="red")
+            self.retainedCanvas.itemconfig(self.endPointMarkers[chunkIndex], fill="red")
         self.selectedMarker = None
     
     def onMarkerClick(self, event):
@@ -403,62 +460,113 @@ class VoiceDetectionApp:
     
     def updateLabelInJSON(self):
         """
-        Save updated labels to JSON file
+        Queue the edited label for saving and refresh the markers
         """
         # print("Label update function called")
         if not self.selectedLabel:
             print("Label not selected")
             return
         
-        fileNameWithoutExtension = os.path.splitext(os.path.basename(self.testSongPath))[0]
-        labelFilePath = f"./saved_labels/{self.selectedGroup}/{fileNameWithoutExtension}_labels.json"
-        
-        try:
-            # with open(labelFilePath, "r") as file:
-            #     savedLabels = json.load(file)
-            # for i, label in enumerate(savedLabels):
-            #     if label[0] == self.originalLabel[0] and label[1] == self.originalLabel[1] and label[2] == self.originalLabel[2]:    
-            #         savedLabels[i] = self.selectedLabel
-            #         self.originalLabel = self.selectedLabel
-            #         break
-            sortedLabels = sorted(self.labels, key=lambda label: label[1])
-            with open(labelFilePath, "w") as file:
-                json.dump(sortedLabels , file, indent=4)
-                
-            # print(f"Labels saved to {labelFilePath}.")
-            self.updateTimeMarkersDict()
-            self.initializePositions()
-        except Exception as e:
-            print(f"Error saving labels to {labelFilePath}: {e}")
+        self.updateTimeMarkersDict()
+        self.schedulePositionUpdate()
+    
+    def schedulePositionUpdate(self, delay=150):
+        """Recompute member positions once a burst of marker edits has settled."""
+        if self.positionUpdateJob is not None:
+            self.root.after_cancel(self.positionUpdateJob)
+        self.positionUpdateJob = self.root.after(delay, self.applyPositionUpdate)
+    
+    def applyPositionUpdate(self):
+        self.positionUpdateJob = None
+        fromChunk, self.dirtyFromChunk = self.dirtyFromChunk, None
+        self.initializePositions(fromChunk or 0)
              
     def removeLabelFromJSON(self, chunkIndex, markerType):
         """
-        Remove the label corresponding to the deleted marker and update the JSON file.
+        Remove the label corresponding to the deleted marker and queue the file update.
         """
-        fileNameWithoutExtension = os.path.splitext(os.path.basename(self.testSongPath))[0]
-        labelFilePath = f"./saved_labels/{self.selectedGroup}/{fileNameWithoutExtension}_labels.json" 
+        self.labelStore.removeWhere(
+            lambda label: (markerType == "start" and label[1] == chunkIndex) or (markerType == "end" and label[2] == chunkIndex)
+        )
+    
+    def onLabelsChanged(self, action, oldLabel, newLabel):
+        """
+        Keep the activity index and member timelines in step with label store edits. Nothing before the
+        earliest chunk an edit touches can change, so timelines are rebuilt from there and the earliest such
+        chunk is remembered for the next position update. For a move that is the earlier of the old and new
+        value of each boundary that moved, so dragging an end marker leaves everything before both ends alone.
+        """
+        if action == "add":
+            self.activityIndex.addLabel(*newLabel)
+            fromChunk = newLabel[1]
+        elif action == "move":
+            self.activityIndex.moveLabel(oldLabel, newLabel)
+            movedBoundaries = [min(old, new) for old, new in zip(oldLabel[1:], newLabel[1:]) if old != new]
+            if not movedBoundaries:
+                return
+            fromChunk = min(movedBoundaries)
+        elif action == "remove":
+            self.activityIndex.removeLabel(*oldLabel)
+            fromChunk = oldLabel[1]
+        else:
+            self.activityIndex.rebuild(self.labels)
+            fromChunk = 0
+        self.timelines.rebuild(fromChunk)
+        self.invalidateScene(fromChunk)
+        self.dirtyFromChunk = fromChunk if self.dirtyFromChunk is None else min(self.dirtyFromChunk, fromChunk)
+    
+    def undoLabelEdit(self, event=None):
+        self.applyLabelHistory(self.labelStore.undo())
+    
+    def redoLabelEdit(self, event=None):
+        self.applyLabelHistory(self.labelStore.redo())
+    
+    def applyLabelHistory(self, entries):
+        """Bring markers and positions in line after an undo or redo. Timelines follow the store's notifications."""
+        if not entries:
+            print("Nothing to undo/redo.")
+            return
         
-        try:
-            self.labels = [
-            label for label in self.labels
-            if not ((markerType == "start" and label[1] == chunkIndex) or
-                    (markerType == "end" and label[2] == chunkIndex))
-            ]
-            with open(labelFilePath, "w") as file:
-                json.dump(self.labels, file, indent=4)       
-        except Exception as e:
-            print(f"Error updating labels in {labelFilePath}: {e}")
-            
+        for entry in entries:
+            if entry["op"] == "move":
+                old, new = entry["old"], entry["new"]
+                for points, oldPoint, newPoint in ((self.startPoints, old[1], new[1]), (self.endPoints, old[2], new[2])):
+                    if oldPoint != newPoint:
+                        if oldPoint in points:
+                            points.remove(oldPoint)
+                        if newPoint not in points:
+                            points.append(newPoint)
+            elif entry["op"] in ("add", "remove"):
+                member, start, end = entry["label"]
+                if start not in self.startPoints:
+                    self.startPoints.append(start)
+                if end not in self.endPoints:
+                    self.endPoints.append(end)
+        
+        self.selectedMarker = None
+        self.selectedLabel = None
+        self.updateTimeMarkersDict()
+        self.schedulePositionUpdate()
+        self.renderScheduler.request(self.currentChunkIndex)
+    
+    def getLabelFilePath(self):
+        fileNameWithoutExtension = os.path.splitext(os.path.basename(self.testSongPath))[0]
+        return f"./saved_labels/{self.selectedGroup}/{fileNameWithoutExtension}_labels.json"
+    
+    def close(self):
+        """Write any pending label edits and the compiled scene, and stop background playback threads."""
+        self.labelStore.close()
+        self.saveScene()
+        self.renderScheduler.stop()
+        self.player.stop()
+        if hasattr(self, "videoTrackItem") and self.videoTrackItem:
+            self.videoTrackItem.pause()
+            self.videoTrackItem.stop()
                             
     def moveMarker(self, direction):
         """
         Move the selected marker left (-1) or right (+1) by one chunkIndex.
         """
-        def calculateX(chunkIndex):
-            chunksInView = self.zoomManager.currentChunksInView
-            return self.progressBarCanvas.winfo_x() + (chunkIndex % chunksInView / chunksInView) * self.progressBarWidth
-        # end calculateX 
-        
         if not self.selectedMarker:
             # print("No marker selected.")
             return
@@ -468,42 +576,29 @@ class VoiceDetectionApp:
         
         newChunkIndex = chunkIndex + direction
         # print(f"Old chunk index: {chunkIndex}, New: {newChunkIndex}")
-        if newChunkIndex < 0 or newChunkIndex >= len(self.chunks):
+        if not self.chunks.isValidChunk(newChunkIndex):
             print("Cannot move marker beyond bounds.")
             return
         
-        y = self.progressBarCanvas.winfo_y()
-        
-        if markerType == "start":
-            if chunkIndex in self.startPointMarkers:
-                self.canvas.delete(self.startPointMarkers[chunkIndex])
-                del self.startPointMarkers[chunkIndex]
-                if chunkIndex in self.startPoints:
-                    self.startPoints.remove(chunkIndex)
-            else:
-                print(f"Warning: Start marker at chunkIndex {chunkIndex} not found.")
+        # Move the existing line instead of recreating it
+        points = self.markerIndex.points(markerType)
+        markers = self.startPointMarkers if markerType == "start" else self.endPointMarkers
+        if chunkIndex in points:
+            points.move(chunkIndex, newChunkIndex)
+        else:
+            points.append(newChunkIndex)
         
-            self.startPointMarkers[newChunkIndex] = self.canvas.create_line(
-                calculateX(newChunkIndex), y - 20,
-                calculateX(newChunkIndex), y,
-                fill="green", width=4
-            )
-            self.startPoints.append(newChunkIndex)
-        elif markerType == "end":
-            if chunkIndex in self.endPointMarkers:
-                self.canvas.delete(self.endPointMarkers[chunkIndex])
-                del self.endPointMarkers[chunkIndex]
-                if chunkIndex in self.endPoints:
-                    self.endPoints.remove(chunkIndex)
+        if chunkIndex in markers:
+            marker = markers.pop(chunkIndex)
+            if newChunkIndex in markers:
+                # Another marker already sits there and now stands for both
+                self.retainedCanvas.release(marker)
             else:
-                print(f"Warning: End marker at chunkIndex {chunkIndex} not found.")
-            
-            self.endPointMarkers[newChunkIndex] = self.canvas.create_line(
-                calculateX(newChunkIndex), y - 20,
-                calculateX(newChunkIndex), y,
-                fill="red", width=4
-            )
-            self.endPoints.append(newChunkIndex)
+                markers[newChunkIndex] = marker
+                self.placeMarker(marker, newChunkIndex)
+        else:
+            print(f"Warning: {markerType.capitalize()} marker at chunkIndex {chunkIndex} not found.")
+            self.drawMarkers(self.progressBarHandle.currentSectionIndex)
             
         # Update label in self.labels if applicable
         if self.selectedLabel:
@@ -511,9 +606,9 @@ class VoiceDetectionApp:
             for label in self.labels:
                 if label == self.selectedLabel:
                     if markerType == "start":
-                        label[1] = newChunkIndex  # Update the start index
+                        self.labelStore.move(label, start=newChunkIndex)  # Update the start index
                     elif markerType == "end":
-                        label[2] = newChunkIndex  # Update the end index
+                        self.labelStore.move(label, end=newChunkIndex)  # Update the end index
                     self.selectedLabel = label  # Update the reference to the modified label
                     break
                 
@@ -579,7 +674,19 @@ class VoiceDetectionApp:
         
         self.progressBarCanvas.config(width=self.progressBarWidth)
         self.navigationArrows.updateArrows()
+        
+        # Resize events come in bursts while the window is dragged: show a cheap preview now and
+        # render the final size at full quality once the events stop
+        self.updateElementPositions(fast=True)
+        if self.resizeJob is not None:
+            self.root.after_cancel(self.resizeJob)
+        self.resizeJob = self.root.after(150, lambda: self.applyCanvasResize(newHeight))
+    
+    def applyCanvasResize(self, newHeight):
+        self.resizeJob = None
         self.updateElementPositions()
+        if self.lyricLayout.setBottom(self.lyricBottom()):
+            self.invalidateSceneLyrics()
         
         self.drawTimeMarkers()
         
@@ -587,8 +694,11 @@ class VoiceDetectionApp:
             # Adjust video height to fit canvas and maintain aspect ratio
             self.videoTrackItem.resize(newHeight)
     
-    def updateElementPositions(self):
-        """Update the position and size of all canvas elements based on the new scale."""
+    def updateElementPositions(self, fast=False):
+        """
+        Update the position and size of all canvas elements based on the new scale.
+        :param fast: Resize member images with nearest-neighbour sampling (used mid-drag).
+        """
         for member, trackItem in self.memberImages.items():
             # Get current placement ratios
             scaledX, scaledY = trackItem.position
@@ -598,32 +708,143 @@ class VoiceDetectionApp:
             
             effectiveScale = trackItem.scale * self.scaleX 
             
-            trackItem.resizeImages(effectiveScale)
+            trackItem.resizeImages(effectiveScale, fast=fast)
              
             # Update the canvas image and position
             imageId = self.memberImageIds[member]
             imageKey = trackItem.currentImageKey
             trackItem.setImageId(imageId)
-            self.canvas.itemconfig(imageId, image=trackItem.sourceImages[imageKey])
-            self.canvas.coords(imageId, newX, newY)
-        
-        self.initializePositions()
-        
-    def initializePositions(self):
-        """Initializes the positions each member should be at for a specific chunk index"""
-        for currentChunk in range(len(self.chunks)):
-            for trackItem in self.memberImages.values():
-                if currentChunk < len(self.chunks) - 4:
-                    trackItem.checkAndSwap(currentChunk)
-                    trackItem.updateAnimations(currentChunk)
-                else:
-                    trackItem.positionTimeline[currentChunk] = trackItem.positionTimeline[len(self.chunks) - 4]
+            self.retainedCanvas.itemconfig(imageId, image=trackItem.sourceImages[imageKey])
+            trackItem.moveImage(newX, newY)
+        
+        # Rankings do not depend on the canvas size, only their pixel positions do
+        if self.rankingEngine is None:
+            self.initializePositions()
+        else:
+            self.layoutPositions()
+        
+    def initializePositions(self, fromChunk=0):
+        """
+        Rank the members and lay out their swap animations. Runs after label edits.
+
+        :param fromChunk: Earliest chunk affected by the edits; rankings and positions before it are reused.
+        """
+        if not self.memberImages:
+            return
+        if self.rankingEngine is None and self.loadCachedScene():
+            return  # Same labels, lyrics and layout as a saved scene: nothing to recompute
+        memberNames = list(self.memberImages.keys())
+        if self.rankingEngine is None or self.rankingEngine.memberNames != memberNames:
+            self.rankingEngine = RankingEngine(memberNames)
+            fromChunk = 0
+        self.rankingEngine.rebuild(np.stack([self.timelines.timeline(name) for name in memberNames]), fromChunk)
+        self.layoutPositions(fromChunk)
+    
+    def layoutPositions(self, fromChunk=0):
+        """Convert the ranking's slot animations into each member's positionTimeline for the current scale."""
+        if self.rankingEngine is None:
+            # Positions came from a saved scene; a new layout needs the rankings after all
+            self.memberPositions = None
+            self.initializePositions()
+            return
+        slotYs = self.getSlotYs()
+        self.memberPositions = self.rankingEngine.slotsToY(slotYs, self.memberPositions, fromChunk)
+        self.bindPositions(self.memberPositions, slotYs)
+        self.invalidateScene(fromChunk)
+    
+    def getSlotYs(self):
+        """y of each leaderboard slot at the current scale, top first."""
+        return [int(trackItem.position[1] * self.scaleY * self.baseHeight) for trackItem in self.memberImages.values()]
+    
+    def bindPositions(self, positions, slotYs):
+        """Point each member's positionTimeline at its row of the (members x chunks) positions."""
+        heightOffset = (slotYs[1] - slotYs[0] if len(slotYs) > 1 else 0, slotYs[0])  # (scaledHeight, yOffset)
+        for row, trackItem in enumerate(self.memberImages.values()):
+            trackItem.positionTimeline = positions[row]
+            trackItem.heightOffset = heightOffset
+            if not hasattr(trackItem, "progressBarCanvasImage"):
+                trackItem.initializeProgressBar()
+    
+    def sceneInputs(self):
+        """Everything the compiled scene depends on, hashed into its cache key. Only hashed on save and load."""
+        return {
+            "labels": labelsHash(self.labels),
+            "lyrics": [
+                [startChunk, lyricBox.memberName, lyricBox.koreanLyric, lyricBox.romanization, lyricBox.englishTrans, lyricBox.language, lyricBox.totalHeight]
+                for startChunk, lyricBox in sorted(self.lyrics.items(), key=lambda item: (item[0] is None, item[0] or 0))
+            ],
+            "members": list(self.memberImages.keys()),
+            "slots": self.getSlotYs(),
+            "scale": self.sceneScale(),
+            "chunks": [len(self.chunks), self.chunk_duration]
+        }
+    
+    def loadCachedScene(self):
+        """Adopt the saved scene if it was compiled from the current inputs. Returns True on a hit."""
+        scene = Scene.load(getScenePath(self.selectedGroup, self.songTitle), sceneKey(self.sceneInputs()))
+        if scene is None or scene.memberNames != list(self.memberImages.keys()):
+            return False
+        print(f"Loaded compiled scene for {self.songTitle}")
+        self.scene = scene
+        self.sceneDirtyFrom = None
+        self.sceneLyricsDirty = False
+        self.memberPositions = scene.positions
+        self.bindPositions(scene.positions, self.getSlotYs())
+        return True
+    
+    def sceneScale(self):
+        """Canvas scale the scene was laid out for, rounded so the same window size always gives the same key."""
+        return [round(self.scaleX, 4), round(self.scaleY, 4)]
+    
+    def lyricBottom(self):
+        """y past which lyrics leave the screen, from the same scale the scene is keyed on."""
+        return self.baseHeight * self.sceneScale()[1]
+    
+    def invalidateScene(self, fromChunk=0):
+        """Mark the scene's member arrays stale from fromChunk on; getScene patches them on next use."""
+        self.sceneDirtyFrom = fromChunk if self.sceneDirtyFrom is None else min(self.sceneDirtyFrom, fromChunk)
+    
+    def invalidateSceneLyrics(self):
+        self.sceneLyricsDirty = True
+    
+    def getScene(self):
+        """
+        The compiled scene for the current state. Preview and export only index into it.
+        After edits only the stale part is recomputed: member arrays from the earliest edited chunk, and
+        the lyric arrays if lyrics changed.
+        """
+        memberNames = list(self.memberImages.keys())
+        positions = self.memberPositions
+        if positions is None:
+            positions = np.zeros((len(memberNames), len(self.chunks)), dtype=np.float32)
+        if self.scene is None or self.scene.memberNames != memberNames:
+            self.scene = compileScene(memberNames, self.timelines, positions, self.lyricLayout, len(self.chunks))
+        else:
+            if self.sceneDirtyFrom is not None:
+                self.scene.update(self.timelines, positions, self.sceneDirtyFrom)
+                self.scene.key = None
+            if self.sceneLyricsDirty:
+                self.scene.setLyrics(self.lyricLayout)
+                self.scene.key = None
+        self.sceneDirtyFrom = None
+        self.sceneLyricsDirty = False
+        return self.scene
+    
+    def saveScene(self):
+        """Write the compiled scene so the next launch or export can skip compiling it."""
+        if not self.memberImages:
+            return
+        try:
+            scene = self.getScene()
+            scene.key = sceneKey(self.sceneInputs())
+            scene.save(getScenePath(self.selectedGroup, self.songTitle))
+        except Exception as e:
+            print(f"Error saving scene for {self.songTitle}: {e}")
         
     def initializeMemberImages(self):
         initialOffset = int(400 / 1080 * self.baseHeight * self.scaleY)
         yOffset = initialOffset
         initialScale = 40
-        memberTimes = []
 
         for memberName, imgSet in self.images.items():
             darkImage = imgSet["dark"]
@@ -637,79 +858,71 @@ class VoiceDetectionApp:
                 scale=initialScale,
                 position=(0, yOffset),
                 sourceImages={'dark': darkImage, 'light': lightImage},
-                animations=[],
                 parent=self,
                 trackMember=memberName,
             )
             self.memberImages[memberName] = trackItem
             trackItem.resizeImages(initialScale)
             
-            imageId = self.canvas.create_image(
-                0, yOffset, image=trackItem.sourceImages["dark"], anchor="nw"
+            imageId = self.retainedCanvas.create(
+                "image", 0, yOffset, image=trackItem.sourceImages["dark"], anchor="nw"
             )
             
             trackItem.setImageId(imageId)
             self.memberImageIds[memberName] = imageId
             yOffset += scaledHeight
-            memberTimes.append(trackItem.timeline[len(self.chunks) - 1])
-        
-        for _, trackItem in self.memberImages.items():
-            trackItem.setMaxTime(max(memberTimes))
         #print(f"Max time: {self.maxTime} Member times:", memberTimes) 
         
     #end initializeMemberImages 
      
     def updateTimeMarkersDict(self):
-        self.timeMarkers = {}
-        for chunkIndex in self.startPoints:
-            sectionIndex = chunkIndex // self.zoomManager.currentChunksInView
-            if sectionIndex not in self.timeMarkers:
-                self.timeMarkers[sectionIndex] = []
-            self.timeMarkers[sectionIndex].append(("start", chunkIndex))
-
-        # Process endPointMarkers
-        for chunkIndex in self.endPoints:
-            sectionIndex = chunkIndex // self.zoomManager.currentChunksInView
-            if sectionIndex not in self.timeMarkers:
-                self.timeMarkers[sectionIndex] = []
-            self.timeMarkers[sectionIndex].append(("end", chunkIndex))
-        # Optionally redraw markers for the current section
+        """Follow the current zoom level and redraw the markers of the current section."""
+        self.markerIndex.setChunksPerSection(self.zoomManager.currentChunksInView)
         self.drawMarkers(self.progressBarHandle.currentSectionIndex)
      
     def loadSavedLabels(self):
         """Load saved labels from a JSON file and update markers"""
-        songName = os.path.basename(self.testSongPath).replace(".mp3", "")
-        labelFilePath = f"./saved_labels/{self.selectedGroup}/{songName}_labels.json"
-        
-        if not os.path.exists(labelFilePath):
-            print(f"No saved labels fround at {labelFilePath}.") 
-            return []
+        labelFilePath = self.labelStore.path
         
-        # Load json file
+        # Load json file (plus any edits left in the journal)
         try:
-            with open(labelFilePath, "r") as file:
-                savedLabels = json.load(file)
-                
-                for label in savedLabels:
-                    member, start, end = label  # Parse the JSON format
-                    if start not in self.startPoints:
-                        self.startPoints.append(start)
-                    if end not in self.endPoints:
-                        self.endPoints.append(end)
-                
-                # Update startPoints, endPoints, and markers
-                self.updateTimeMarkersDict()
-                self.drawTimeMarkers()
-                
-                self.canvas.update()
-                self.root.update_idletasks()
+            savedLabels = self.labelStore.load()
+            self.projectStore.markSynced(labelFilePath)  # The load wrote the labels through and folded any journal into the file
+            if not savedLabels and not os.path.exists(labelFilePath):
+                print(f"No saved labels fround at {labelFilePath}.") 
                 return savedLabels
+            
+            for label in savedLabels:
+                member, start, end = label  # Parse the JSON format
+                if start not in self.startPoints:
+                    self.startPoints.append(start)
+                if end not in self.endPoints:
+                    self.endPoints.append(end)
+            
+            # Update startPoints, endPoints, and markers
+            self.updateTimeMarkersDict()
+            self.drawTimeMarkers()
+            
+            self.canvas.update()
+            self.root.update_idletasks()
+            return savedLabels
         except Exception as e:
             print(f"Error loading labels from {labelFilePath}: {e}")
-            return []
+            return self.labelStore.labels
             
     # end loadSavedLabels        
     
+    def mirrorLabelEdit(self, action, oldLabel, newLabel):
+        """Label store listener writing each edit through to the project database."""
+        if action == "add":
+            self.projectStore.addLabel(self.selectedGroup, self.songTitle, newLabel)
+        elif action == "move":
+            self.projectStore.moveLabel(self.selectedGroup, self.songTitle, oldLabel, newLabel)
+        elif action == "remove":
+            self.projectStore.removeLabel(self.selectedGroup, self.songTitle, oldLabel)
+        else:
+            self.projectStore.replaceLabels(self.selectedGroup, self.songTitle, self.labelStore.labels)
+    
     def progressBarValueToTime(self, value):
         """Convert progress bar value to actual song time"""
         visibleDuration = self.zoomManager.currentChunksInView * self.chunk_duration
@@ -771,22 +984,15 @@ class VoiceDetectionApp:
         x = max(0, min(event.x, self.progressBarWidth))
         self.progressBarHandle.jump(x, self.currentSectionIndex)
         
-        pygame.mixer.music.pause()
-        if hasattr(self, "videoTrackItem"):
-            self.videoTrackItem.pause()
+        self.player.pause()
+        self.clock.pause()
         
         visibleDuration = self.zoomManager.currentChunksInView * self.chunk_duration
         
         progressRatio = x / self.progressBarWidth
         #print(f"Current progressRatio: {progressRatio }")
         newTimeMs = int(visibleDuration * (self.currentSectionIndex + progressRatio))
-        self.currentChunkIndex = int(newTimeMs / self.chunk_duration)
-        self.updateChunkText(self.currentChunkIndex)
-        self.updateProgressBarHandle(newTimeMs)
-        self.updateDisplayedTime(newTimeMs)
-        
-        if hasattr(self, "videoTrackItem"):
-            self.videoTrackItem.seek(newTimeMs)
+        self.clock.seek(newTimeMs)
         
         self.isManualUpdate = True
         
@@ -799,17 +1005,15 @@ class VoiceDetectionApp:
         # self.currentChunkIndex = min(self.currentSectionIndex * visibleChunks, totalChunks - visibleChunks)
         # self.currentChunks = self.chunks[self.currentChunkIndex: self.currentChunkIndex + visibleChunks]
         
-        playbackTime = self.playbackOffset + pygame.mixer.music.get_pos()
+        playbackTime = int(self.clock.positionMs())
         self.updateTimeMarkersDict()
         self.updateProgressBarHandle(playbackTime)
                     
     def drawTimeMarkers(self):
-        """Draw time markers for current section"""
+        """Draw time markers for current section. The 11 lines and labels are created once and then only moved and relabelled."""
         if hasattr(self, "uiHidden") and self.uiHidden:
             return  # Skip drawing if UI is hidden
         
-        self.canvas.delete("time_marker")
-        
         visibleDuration = self.zoomManager.currentChunksInView * self.chunk_duration
         
         # Determines start of current section
@@ -836,16 +1040,25 @@ class VoiceDetectionApp:
                 minutes += 1
                 seconds = 0
 
+            timestamp = f"{seconds:02}:{milliseconds:02}" if minutes == 0 else f"{minutes:01}:{seconds:02}:{milliseconds:02}"
+            if i < len(self.timeMarkerItems):
+                lineId, textId = self.timeMarkerItems[i]
+                self.retainedCanvas.coords(lineId, x, progressBarY - 20, x, progressBarY)
+                self.retainedCanvas.coords(textId, x, progressBarY - 30)
+                self.retainedCanvas.itemconfig(textId, text=timestamp)
+                continue
+            
             # Draw the time marker line
-            self.canvas.create_line(
+            lineId = self.retainedCanvas.create(
+                "line",
                 x, progressBarY - 20,
                 x, progressBarY,
                 fill="gray",
                 tags="time_marker"
             )
             # Draw the timestamp
-            timestamp = f"{seconds:02}:{milliseconds:02}" if minutes == 0 else f"{minutes:01}:{seconds:02}:{milliseconds:02}"
-            self.canvas.create_text(
+            textId = self.retainedCanvas.create(
+                "text",
                 x,
                 progressBarY - 30,
                 text=timestamp,
@@ -853,6 +1066,7 @@ class VoiceDetectionApp:
                 font=("Arial", 8),
                 tags="time_marker"
             )
+            self.timeMarkerItems.append((lineId, textId))
             
     def getMemberColor(self, name):
         for member in self.members:
@@ -944,13 +1158,9 @@ class VoiceDetectionApp:
                     member = memberVar.get()
                     if member:
                         label = [member, startPoint, endPoint]
-                        self.labels.append(label)
+                        self.labelStore.add(label)
                         selectedLabels.append(label)
                         print(f"Label saved: {label}")
-                        
-                        trackItem = self.memberImages[member]
-                        if trackItem:
-                            trackItem.initializeTimeline()
                 if selectedLabels:
                     self.saveLabels(self.selectedGroup, self.testSongPath)
                 labelMenu.destroy()
@@ -1124,23 +1334,14 @@ class VoiceDetectionApp:
             # membersData = members if len(members) > 1 else members[0]
             
             lyricBox = LyricBox(self.canvas, self, members, koreanLyric, romanization, englishTrans, startChunkValue, langVar.get())
-            self.lyrics[startChunk] = lyricBox
-            
-            self.lyricPositions = {}
-            self.initializeAllLyricPositions(self.lyrics)
-            
-            fileNameWithoutExtension = os.path.splitext(os.path.basename(self.testSongPath))[0]
-            lyricsPath = f"./saved_labels/{self.selectedGroup}/{fileNameWithoutExtension}_lyrics.json"
+            if startChunkValue in self.lyrics:
+                self.lyrics[startChunkValue].hide()  # Replaced by the new lyric
+                self.shownLyrics.pop(startChunkValue, None)
+            self.lyrics[startChunkValue] = lyricBox
             
-            os.makedirs(os.path.dirname(lyricsPath), exist_ok=True)
-            
-            existingLyrics = []
-            if os.path.exists(lyricsPath):
-                with codecs.open(lyricsPath, "r", encoding="utf-8", errors="ignore") as file:
-                    try:
-                        existingLyrics = json.load(file)
-                    except json.JSONDecodeError:
-                        existingLyrics = []    
+            # Only the new lyric and the ones on screen when it comes in are laid out again
+            self.lyricLayout.add(startChunkValue, lyricBox.totalHeight, lyricBox.stackHeight)
+            self.invalidateSceneLyrics()
             
             newLyricEntry = {
                 "language": langVar.get(),
@@ -1151,13 +1352,9 @@ class VoiceDetectionApp:
                 "startChunk": startChunkValue
             }
             
-            existingLyrics.append(newLyricEntry)
-            # Sort by startChunk
-            sortedLyrics = sorted(existingLyrics, key=lambda x: x["startChunk"])
-            
-            # Save back to JSON file
-            with codecs.open(lyricsPath, "w", encoding="utf-8") as file:
-                json.dump(sortedLyrics, file, ensure_ascii=False, indent=4)
+            # Replace the lyric at this chunk in the store and write the song's lyrics file from it
+            self.projectStore.setLyric(self.selectedGroup, self.songTitle, newLyricEntry)
+            saveSongLyrics(self.selectedGroup, self.songTitle)
             
             self.enableRootKeybinds()
             inputWindow.destroy()
@@ -1181,6 +1378,8 @@ class VoiceDetectionApp:
         self.canvas.unbind("<KeyPress-q>")
         self.canvas.unbind("<KeyPress-w>")
         self.canvas.unbind("<KeyPress-l>")
+        self.canvas.unbind("<Control-z>")
+        self.canvas.unbind("<Control-y>")
         self.canvas.unbind_all("<space>")
 
     def enableRootKeybinds(self):
@@ -1194,23 +1393,22 @@ class VoiceDetectionApp:
         self.canvas.bind("<KeyPress-q>", self.addStartPoint)
         self.canvas.bind("<KeyPress-w>", self.addEndPoint)
         self.canvas.bind("<KeyPress-l>", self.addLyricBox)
+        self.canvas.bind("<Control-z>", self.undoLabelEdit)
+        self.canvas.bind("<Control-y>", self.redoLabelEdit)
         self.canvas.bind_all("<space>", self.togglePlayPause)
         
     def loadLyricsFromFile(self):
-        """Loads lyrics from a JSON file and adds them to self.lyrics."""
-        fileNameWithoutExtension = os.path.splitext(os.path.basename(self.testSongPath))[0]
-        lyricsFilePath = f"./saved_labels/{self.selectedGroup}/{fileNameWithoutExtension}_lyrics.json"
-        
-        if not os.path.exists(lyricsFilePath):
-            print(f"Lyrics file not found: {lyricsFilePath}")
-            return
-        
+        """Loads lyrics from the project store (re-importing the song's JSON file if it changed) and adds them to self.lyrics."""
+        lyricsFilePath = f"./saved_labels/{self.selectedGroup}/{self.songTitle}_lyrics.json"
         try:
-            with codecs.open(lyricsFilePath, "r", encoding="utf-8", errors="ignore") as file:
-                lyricsData = json.load(file)
+            lyricsData = loadSongLyrics(self.selectedGroup, self.songTitle, lyricsFilePath)
         except json.JSONDecodeError:
             print(f"Error loading JSON file: {lyricsFilePath}")
             return
+        
+        if not lyricsData:
+            print(f"Lyrics file not found: {lyricsFilePath}")
+            return
 
         for lyric in lyricsData:
             language = lyric["language"]
@@ -1228,70 +1426,91 @@ class VoiceDetectionApp:
     
     def initializeAllLyricPositions(self, lyrics):
         """Precompute the positions for all lyric boxes before playback starts."""
-        if not hasattr(self, "lyricPositions"):
-            self.lyricPositions = {}  # Ensure lyricPositions exists
-        
-        for startChunk, lyricBox in lyrics.items():
-            lyricBox.initializeLyricPosition()
-        
-        # print('Lyric positions:', self.lyricPositions)
+        self.lyricLayout.rebuild(
+            [(startChunk, lyricBox.totalHeight, lyricBox.stackHeight) for startChunk, lyricBox in lyrics.items()],
+            bottom=self.lyricBottom()
+        )
+        self.invalidateSceneLyrics()
         
     def hideAllLyrics(self):
         """Hides all lyric box objects stored in self.lyrics."""
         for _, lyricBox in self.lyrics.items():
             lyricBox.hide()    
+        self.shownLyrics = {}
         
     def renderLyrics(self, chunkIndex):
-        """Render lyrics based on the most recent chunkIndex if the exact one is missing."""
-        if chunkIndex not in self.lyricPositions:
-            availableChunks = sorted(self.lyricPositions.keys())
-            recentChunk = max((c for c in availableChunks if c <= chunkIndex), default=None)
-            if recentChunk is None:
-                return  # No previous lyrics to display
-            chunkIndex = recentChunk  # Use the most recent chunkIndex
-        
-        currentLyrics = self.lyricPositions.get(chunkIndex, [])
-        if currentLyrics:
-            visibleStartChunks = set(startChunk for startChunk, _ in currentLyrics)
-
-            # Hide lyrics that are no longer visible
-            for startChunk in list(self.lyrics.keys()):
-                if startChunk not in visibleStartChunks:
-                    self.lyrics[startChunk].hide()
-
-            previousPositions = {startChunk: yPos for startChunk, yPos in self.lyricPositions.get(chunkIndex - 1, [])}
-            
-            # Show and reposition the correct lyrics
-            for startChunk, yPos in currentLyrics:
-                if startChunk in self.lyrics:
-                    lyricBox = self.lyrics[startChunk]
-                    lyricBox.show()
-                    if previousPositions.get(startChunk) != yPos:
-                        lyricBox.setPosition(yPos)
+        """Show the lyrics the compiled scene has at chunkIndex, moving only those whose y changed."""
+        visibleLyrics = dict(self.getScene().visibleLyrics(chunkIndex))
+        if not visibleLyrics:
+            return  # No lyrics yet
+        
+        # Hide lyrics that are no longer visible
+        for startChunk in self.shownLyrics.keys() - visibleLyrics.keys():
+            if startChunk in self.lyrics:
+                self.lyrics[startChunk].hide()
+        
+        # Show and reposition the correct lyrics
+        for startChunk, yPos in visibleLyrics.items():
+            if startChunk in self.lyrics:
+                lyricBox = self.lyrics[startChunk]
+                lyricBox.show()
+                if self.shownLyrics.get(startChunk) != yPos:
+                    lyricBox.setPosition(yPos)
+        self.shownLyrics = visibleLyrics
 
+    def onClockProgress(self, event, positionMs, chunkIndex):
+        """Move the chunk counter, progress bar handle and time display with the playback clock."""
+        if event not in ("tick", "seek", "play"):
+            return
+        timeMs = int(positionMs)
+        self.currentChunkIndex = chunkIndex
+        self.updateChunkText(chunkIndex)
+        self.updateProgressBarHandle(timeMs)
+        self.updateDisplayedTime(timeMs)
+    
+    def onClockFrame(self, event, positionMs, chunkIndex):
+        """Queue a redraw of member images, timers and lyrics for the clock's chunk."""
+        if event not in ("tick", "seek", "play"):
+            return
+        self.renderScheduler.request(self.chunks.timeToChunk(positionMs))
+    
+    def renderFrame(self, chunkIndex):
+        """Draw one preview frame. Called by the render scheduler at idle time."""
+        self.retainedCanvas.beginFrame()
+        self.updateCanvasForCurrentPosition(chunkIndex)
+        
+        # Update UI for voice detection
+        if len(self.detectionResults) > chunkIndex:
+            for member, trackItem in self.memberImages.items():
+                isVoiceDetected = self.detectionResults[chunkIndex].get(member, False)
+                if isVoiceDetected:
+                    trackItem.currentImageKey = "light"
+                else:
+                    trackItem.currentImageKey = "dark"
+                
+                # Update the canvas with the current image
+                imageId = self.memberImageIds[member]
+                self.retainedCanvas.itemconfig(imageId, image=trackItem.sourceImages[trackItem.currentImageKey])
+        
+        self.retainedCanvas.endFrame()
+    
     def updateCanvasForCurrentPosition(self, chunkIndex):
         """Highlight the corresponding member's image if their voice matches the current time."""
         if self.testOrVideo == "Video":
-            membersCurrentlySinging = set()
-        
-            for member, start, end in self.labels:
-                if start <= chunkIndex <= end:
-                    membersCurrentlySinging.add(member)
+            scene = self.getScene()
+            inScene = 0 <= chunkIndex < scene.numChunks
             
             # Update canvas for each member
             for member, trackItem in self.memberImages.items():
                 imageId = self.memberImageIds[member]
                 trackItem.updateAndDrawTimer(chunkIndex)
-                if chunkIndex > trackItem.lastUpdateChunk:
-                    trackItem.switchImage("clear")
-                elif member in membersCurrentlySinging:
-                    trackItem.switchImage("light")
-                else:
-                    trackItem.switchImage("dark")
+                row = scene.memberRows.get(member)
+                state = scene.states[row, chunkIndex] if inScene and row is not None else STATE_DARK
+                trackItem.switchImage(STATE_KEYS[state])
                     
-                self.canvas.itemconfig(imageId, image=trackItem.sourceImages[trackItem.currentImageKey]) 
+                self.retainedCanvas.itemconfig(imageId, image=trackItem.sourceImages[trackItem.currentImageKey])
             
-            if hasattr(self, "lyricPositions"):  
+            if self.lyricLayout:
                 self.renderLyrics(chunkIndex)
         else:
             voiceDetected = self.voiceDetectionResults[chunkIndex]
@@ -1303,9 +1522,7 @@ class VoiceDetectionApp:
             else:
                 memberTrackItem.switchImage("dark")
 
-            self.canvas.itemconfig(imageId, image=memberTrackItem.sourceImages[memberTrackItem.currentImageKey]) 
-            
-        self.canvas.update()
+            self.retainedCanvas.itemconfig(imageId, image=memberTrackItem.sourceImages[memberTrackItem.currentImageKey])
     # end
     
     def onProgressBarClick(self, event):
@@ -1321,22 +1538,13 @@ class VoiceDetectionApp:
         progressRatio = x / self.progressBarWidth
         newTimeMs = int(visibleDuration * (self.currentSectionIndex + progressRatio))
         
-        # Updates the chunk index
-        self.currentChunkIndex = int(newTimeMs / self.chunk_duration)
-        self.updateChunkText(self.currentChunkIndex)
         # print(f"Released at {newTimeMs}")
         
-        self.updateCurrentTime(newTimeMs)
-        # self.updateProgressBarHandle(newTimeMs)
         # Restart playback at the new position => This is normal
-        pygame.mixer.music.set_pos(newTimeMs / 1000)
-        if hasattr(self, "videoTrackItem"):
-            self.videoTrackItem.seek(newTimeMs)
+        self.player.seek(newTimeMs)
+        self.updateCurrentTime(newTimeMs)
             
         if not self.isPaused:
-            pygame.mixer.music.unpause()
-            if hasattr(self, "videoTrackItem"):
-                self.videoTrackItem.play()
             self.playWithSavedResults(newTimeMs) # Annoying issue
         # Sync music playback with the new chunk index
         
@@ -1347,21 +1555,15 @@ class VoiceDetectionApp:
         
         self.lastKeyPressTime = currentTime
         
-        newPlaybackTime = max(0, self.playbackOffset - 5000)
-        
-        self.currentChunkIndex = int(newPlaybackTime / self.chunk_duration)
+        # Snap to a chunk boundary so the audio lands exactly on the chunk that is displayed
+        self.currentChunkIndex = self.chunks.timeToChunk(max(0, self.clock.positionMs() - 5000))
+        newPlaybackTime = self.chunks.chunkToTime(self.currentChunkIndex)
         self.playbackOffset = newPlaybackTime
         print(f"Moved backward to chunk index: {self.currentChunkIndex}, Playback time: {newPlaybackTime}ms")
-        self.updateProgressBarHandle(newPlaybackTime)
-        self.updateProgressBar(newPlaybackTime)
-        self.updateCanvasForCurrentPosition()
         
-        if self.isPaused:
-            return
-        
-        # Update playback position
-        pygame.mixer.music.stop()
-        pygame.mixer.music.play(start=newPlaybackTime / 1000)
+        # Update playback position (kept as the resume point while paused)
+        self.player.seek(newPlaybackTime)
+        self.clock.seek(newPlaybackTime)
 
     def moveForwardByChunks(self, event):
         """Move forward by five chunks."""
@@ -1370,59 +1572,18 @@ class VoiceDetectionApp:
         
         self.lastKeyPressTime = currentTime
         
-        newPlaybackTime = min(self.totalDurationMs, self.playbackOffset + 5000)
-        
-        # Calculate the playback time
-        self.currentChunkIndex = int(newPlaybackTime / self.chunk_duration)
+        # Calculate the playback time, snapped to a chunk boundary
+        self.currentChunkIndex = self.chunks.timeToChunk(min(self.totalDurationMs, self.clock.positionMs() + 5000))
+        newPlaybackTime = self.chunks.chunkToTime(self.currentChunkIndex)
         self.playbackOffset = newPlaybackTime
         print(f"Moved forward to chunk index: {self.currentChunkIndex}, Playback time: {newPlaybackTime}ms")
 
-        # Update UI
-        self.updateProgressBar(newPlaybackTime)
-        self.updateProgressBarHandle(newPlaybackTime)
-        self.updateCanvasForCurrentPosition()
-        
-        if self.isPaused: return
-        
-        # Update playback position
-        pygame.mixer.music.stop()
-        pygame.mixer.music.play(start=newPlaybackTime / 1000)
+        # Update playback position (kept as the resume point while paused)
+        self.player.seek(newPlaybackTime)
+        self.clock.seek(newPlaybackTime)
     
     def getLabels(self):
-        matchedPoints = []
-        unmatchedStartPoints = []
-        
-        sortedStartPoints = sorted(self.startPoints)
-        sortedEndPoints = sorted(self.endPoints)
-        
-        usedEndIndices = set()
-        
-        for label in self.labels:
-            member, labelStart, labelEnd = label
-            if labelStart in sortedStartPoints and labelEnd in sortedEndPoints:
-                matchedPoints.append((member, labelStart, labelEnd))
-                usedEndIndices.add(sortedEndPoints.index(labelEnd))
-        
-        for startPoint in sortedStartPoints:
-            if any(startPoint == labelStart for _, labelStart, _ in matchedPoints):
-                continue  # Skip if already matched
-
-            closestEndIndex = None
-            for i, endPoint in enumerate(sortedEndPoints):
-                if i in usedEndIndices:
-                    continue
-                if endPoint > startPoint:
-                    closestEndIndex = i
-                    break
-            
-            if closestEndIndex is not None:
-                endPoint = sortedEndPoints[closestEndIndex]
-                matchedPoints.append((None, startPoint, endPoint))  # No member name found
-                usedEndIndices.add(closestEndIndex)
-            else:
-                unmatchedStartPoints.append(startPoint)
-                
-        matchedPoints.sort(key=lambda x: x[1])
+        matchedPoints, unmatchedStartPoints = matchLabels(self.labels, self.startPoints, self.endPoints)
         # print("Matched points:", matchedPoints)
         return matchedPoints
 
@@ -1473,46 +1634,61 @@ class VoiceDetectionApp:
         """
         # Remove all start markers
         for marker in self.startPointMarkers.values():
-            self.canvas.delete(marker)
+            self.retainedCanvas.release(marker)
         self.startPointMarkers.clear()
 
         # Remove all end markers
         for marker in self.endPointMarkers.values():
-            self.canvas.delete(marker)
+            self.retainedCanvas.release(marker)
         self.endPointMarkers.clear()
         
-    def drawMarkers(self, sectionIndex):
-        self.clearAllMarkers()
-        
-        if sectionIndex not in self.timeMarkers:
-            # print(f"No markers to draw for sectionIndex {sectionIndex}.")
-            return
+    def markerOrigin(self):
+        """Progress bar position and canvas scroll offset. Read from Tk once per redraw, not once per marker."""
+        return self.progressBarCanvas.winfo_x(), self.progressBarCanvas.winfo_y(), self.canvas.canvasx(0)
+    
+    def markerPosition(self, chunkIndex, origin=None):
+        """
+        Line coordinates for a marker on the progress bar.
         
+        :param origin: markerOrigin(), passed in when placing many markers at once.
+        """
+        barX, barY, scrollX = origin or self.markerOrigin()
         chunksInView = self.zoomManager.currentChunksInView
-        # print(f"Current chunks in view: {chunksInView}")
-        
-        for markerType, chunkIndex in self.timeMarkers[sectionIndex]:
-            relativeX = self.progressBarCanvas.winfo_x() + (chunkIndex % chunksInView / chunksInView) * self.progressBarWidth
-
-            x = self.canvas.canvasx(relativeX)
-            y = self.progressBarCanvas.winfo_y()
-        
-            if x < 0 or x > self.canvas.winfo_width():
-                print(f"Marker at chunk {chunkIndex} is out of bounds (x={x}).")
-                return
-        
-            if markerType == "start":
-                if chunkIndex not in self.startPointMarkers:
-                    marker = self.canvas.create_line(
-                        x, y - 20, 
-                        x, y, 
-                        fill="green", width=4
-                    )
-                    self.startPointMarkers[chunkIndex] = marker
-            elif markerType == "end":
-                if chunkIndex not in self.endPointMarkers:
-                    marker = self.canvas.create_line(x, y - 20, x, y, fill="red", width=4)
-                    self.endPointMarkers[chunkIndex] = marker
+        x = scrollX + barX + (chunkIndex % chunksInView / chunksInView) * self.progressBarWidth
+        return (x, barY - 20, x, barY)
+    
+    def placeMarker(self, marker, chunkIndex):
+        """Move a marker line. The retained canvas skips the Tk call when it is already in place."""
+        self.retainedCanvas.coords(marker, *self.markerPosition(chunkIndex))
+    
+    def drawMarkers(self, sectionIndex):
+        """
+        Show the markers of a section. Lines already on screen stay, lines that left the section are released
+        to the retained canvas's pool and reused for the ones that entered it, and only lines whose position
+        changed are moved.
+        """
+        self.markerIndex.setChunksPerSection(self.zoomManager.currentChunksInView)
+        origin = self.markerOrigin()
+        wanted = {"start": {}, "end": {}}  # chunkIndex -> line coords
+        canvasWidth = self.canvas.winfo_width()
+        for markerType, chunkIndex in self.markerIndex.section(sectionIndex):
+            coords = self.markerPosition(chunkIndex, origin)
+            if coords[0] < 0 or coords[0] > canvasWidth:
+                print(f"Marker at chunk {chunkIndex} is out of bounds (x={coords[0]}).")
+                continue
+            wanted[markerType][chunkIndex] = coords
+        
+        for markerType, fill in (("start", "green"), ("end", "red")):
+            markers = self.startPointMarkers if markerType == "start" else self.endPointMarkers
+            wantedCoords = wanted[markerType]
+            for chunkIndex in [chunkIndex for chunkIndex in markers if chunkIndex not in wantedCoords]:
+                self.retainedCanvas.release(markers.pop(chunkIndex))
+            
+            for chunkIndex, coords in wantedCoords.items():
+                if chunkIndex in markers:
+                    self.retainedCanvas.coords(markers[chunkIndex], *coords)
+                else:
+                    markers[chunkIndex] = self.retainedCanvas.create("line", *coords, fill=fill, width=4)
     # end drawMarkers
     
     def updateCurrentTime(self, newTimeMs):
@@ -1522,9 +1698,7 @@ class VoiceDetectionApp:
         self.playbackOffset = newTimeMs
         
         self.skipNextAutoUpdate = True
-        self.updateDisplayedTime(newTimeMs)
-        self.updateProgressBarHandle(newTimeMs)
-        self.updateCanvasForCurrentPosition(int(newTimeMs / self.chunk_duration))
+        self.clock.seek(newTimeMs)
     # end updateCurrentTime
             
     def play(self):
@@ -1534,29 +1708,23 @@ class VoiceDetectionApp:
         
         if self.isPlaying:
             if self.isPaused:
-                pygame.mixer.music.unpause()
+                self.player.resume()
+                self.clock.resume()
                 # print(f"Play Playback time: {playbackTime}\n Current chunk: {self.currentChunkIndex}")
                 self.isPaused = False
-                
-                if hasattr(self, "videoTrackItem"):
-                    currentAudioTimeMs = pygame.mixer.music.get_pos() + self.playbackOffset
-                    self.videoTrackItem.seek(self.currentChunkIndex * self.chunk_duration)
-                    self.videoTrackItem.play()
                 self.playWithSavedResults(self.currentChunkIndex * self.chunk_duration)
             return
         else:  
-            if hasattr(self, "videoTrackItem"):
-                self.videoTrackItem.seek(self.playbackOffset)
-                self.videoTrackItem.play()
             self.playWithSavedResults(self.playbackOffset)
         
     def pause(self):
         if self.isPlaying and not self.isPaused:
             self.isPaused = True
             #self.playbackOffset = self.currentChunkIndex * self.chunk_duration
-            pygame.mixer.music.pause()
-            if hasattr(self, "videoTrackItem"):
-                self.videoTrackItem.pause()
+            self.player.pause()
+            self.clock.pause()
+            self.renderScheduler.printStats()
+            self.retainedCanvas.printStats()
         
             # print(f"Current chunk index {self.currentChunkIndex}")
             
@@ -1564,17 +1732,19 @@ class VoiceDetectionApp:
         """Restart playback from the beginning."""
         self.currentChunkIndex = 0
         self.isPlaying = False
-        self.updateCanvasForCurrentPosition(0)
-        pygame.mixer.music.rewind()
+        self.player.seek(0)
+        self.clock.seek(0)
         
     def rewind(self):
         self.currentChunkIndex = max(0, self.currentChunkIndex - 1)
-        self.updateCanvasForCurrentPosition()
+        self.player.seek(self.chunks.chunkToTime(self.currentChunkIndex))
+        self.clock.seek(self.chunks.chunkToTime(self.currentChunkIndex))
         
     def forward(self):
         """Skip forward by one second (one chunk)."""
         self.currentChunkIndex = min(len(self.chunks) - 1, self.currentChunkIndex + 1)
-        self.updateCanvasForCurrentPosition()
+        self.player.seek(self.chunks.chunkToTime(self.currentChunkIndex))
+        self.clock.seek(self.chunks.chunkToTime(self.currentChunkIndex))
     
     def playWithSavedResults(self, startTimeMs):
         """Replay the audio with saved detection results synced to the audio."""
@@ -1584,112 +1754,51 @@ class VoiceDetectionApp:
         
         if not self.isPlaying or self.isManualUpdate:
             try:
-                if not self.isPlaying:
-                    pygame.mixer.music.load(self.testSongPath)
-                pygame.mixer.music.play(start=startTimeMs / 1000)
-            except pygame.error as e:
-                print(f"Error loading audio file: {e}")
+                self.player.play(startTimeMs)
+            except Exception as e:
+                print(f"Error starting playback: {e}")
                 self.isPlaying = False
                 return
 
             self.playbackOffset = startTimeMs
-            self.currentChunkIndex = int(startTimeMs / self.chunk_duration)
             self.isPlaying = True
             self.isPaused = False
             self.isManualUpdate = False
+            self.clock.play(startTimeMs)
         
-        def updateChunk():
-            if not self.isPlaying or self.isManualUpdate: 
-                return
-        
-            # Get current playback position in milliseconds
-            playbackPos = pygame.mixer.music.get_pos()
-            if playbackPos == -1:
-                print("Playback not started or stopped unexpectedly.")
-                self.isPlaying = False
-                return
-            playbackTime = self.playbackOffset + playbackPos
-            self.currentChunkIndex = int(playbackTime / self.chunk_duration)
-            self.updateChunkText(self.currentChunkIndex)
-            self.updateProgressBarHandle(playbackTime) # This was working
-            self.updateDisplayedTime(playbackTime)
-            self.updateCanvasForCurrentPosition(self.currentChunkIndex)
-            
-            # Update UI for voice detection
-            if len(self.detectionResults) > 0:
-                for member, trackItem in self.memberImages.items():
-                    isVoiceDetected = self.detectionResults[self.currentChunkIndex].get(member, False)
-                    if isVoiceDetected:
-                        trackItem.currentImageKey = "light"
-                    else:
-                        trackItem.currentImageKey = "dark"
-                    
-                    # Update the canvas with the current image
-                    imageId = self.memberImageIds[member]
-                    self.canvas.itemconfig(imageId, image=trackItem.sourceImages[trackItem.currentImageKey])
-                
-            if self.currentChunkIndex >= len(self.chunks):
-                self.pause()
-
-            # Schedule the next chunk update
-            self.root.after(self.chunk_duration, updateChunk)
-
-        # Start updating chunks
-        updateChunk()
+        # Start updating chunks, replacing any loop that is already scheduled
+        self.renderScheduler.start(self.playbackTick)
     # end playWIthSavedResults
     
+    def playbackTick(self):
+        """Advance the clock once. Returns False to stop the render loop."""
+        if not self.isPlaying or self.isPaused or self.isManualUpdate: 
+            return False
+    
+        if not self.player.isActive():
+            print("Playback not started or stopped unexpectedly.")
+            self.isPlaying = False
+            self.clock.pause()
+            return False
+        
+        # Subscribers queue a redraw when the clock reaches a new chunk; chunks missed while behind are skipped
+        self.clock.tick()
+            
+        if self.currentChunkIndex >= len(self.chunks):
+            self.pause()
+            return False
+        return True
+    
     def addMarkerToSection(self, chunkIndex, markerType):
         """
-        Add a single marker to the appropriate sectionIndex key in timeMarkers and update marker dictionaries.
+        Draw a newly added marker. Its point is already in startPoints/endPoints, so only the canvas line is needed.
         """
-        sectionIndex = chunkIndex // self.zoomManager.currentChunksInView
-        if sectionIndex not in self.timeMarkers:
-            self.timeMarkers[sectionIndex] = []
-            
-        self.timeMarkers[sectionIndex].append((markerType, chunkIndex))
-        
-        # Draw the marker and update the respective marker dictionary
-        if markerType == "start":
-            if chunkIndex not in self.startPointMarkers:
-                self.startPointMarkers[chunkIndex] = self.canvas.create_line(
-                    self.progressBarCanvas.winfo_x() + (chunkIndex % self.zoomManager.currentChunksInView / self.zoomManager.currentChunksInView) * self.progressBarWidth,
-                    self.progressBarCanvas.winfo_y() - 20,
-                    self.progressBarCanvas.winfo_x() + (chunkIndex % self.zoomManager.currentChunksInView / self.zoomManager.currentChunksInView) * self.progressBarWidth,
-                    self.progressBarCanvas.winfo_y(),
-                    fill="green",
-                    width=4,
-                )
-                print(f"Start marker added at chunk {chunkIndex}.")
-        elif markerType == "end":
-            if chunkIndex not in self.endPointMarkers:
-                self.endPointMarkers[chunkIndex] = self.canvas.create_line(
-                    self.progressBarCanvas.winfo_x() + (chunkIndex % self.zoomManager.currentChunksInView / self.zoomManager.currentChunksInView) * self.progressBarWidth,
-                    self.progressBarCanvas.winfo_y() - 20,
-                    self.progressBarCanvas.winfo_x() + (chunkIndex % self.zoomManager.currentChunksInView / self.zoomManager.currentChunksInView) * self.progressBarWidth,
-                    self.progressBarCanvas.winfo_y(),
-                    fill="red",
-                    width=4,
-                )
-                print(f"End marker added at chunk {chunkIndex}.")
+        markers = self.startPointMarkers if markerType == "start" else self.endPointMarkers
+        if chunkIndex not in markers:
+            coords = self.markerPosition(chunkIndex)
+            markers[chunkIndex] = self.retainedCanvas.create("line", *coords, fill="green" if markerType == "start" else "red", width=4)
+            print(f"{markerType.capitalize()} marker added at chunk {chunkIndex}.")
     
     def saveLabels(self, selectedGroup, testSongPath):
-        # Get file name without extension
-        fileNameWithoutExtension = os.path.splitext(os.path.basename(testSongPath))[0]
-        
-        labelFilePath = f"./saved_labels/{selectedGroup}/{fileNameWithoutExtension}_labels.json"
-        directory = os.path.dirname(labelFilePath)
-        if not os.path.exists(directory):
-            os.makedirs(directory)
-            
-        existingLabels = []
-        if os.path.exists(labelFilePath):
-            with open(labelFilePath, 'r') as f:
-                existingLabels = json.load(f)
-        
-        uniqueExistingLabels = {tuple(label) for label in existingLabels}
-        newLabels = [label for label in self.labels if tuple(label) not in uniqueExistingLabels]
-        combinedLabels = existingLabels + newLabels
-        combinedLabels = sorted(combinedLabels, key = lambda label: label[1])
-        
-        with open(labelFilePath, "w") as f:
-            json.dump(combinedLabels, f, indent=4)
\ No newline at end of file
+        """Fold the label journal into _labels.json now instead of waiting for the next background compaction."""
+        self.labelStore.flush()
\ No newline at end of file
@@ -0,0 +1,239 @@
+import math
+import multiprocessing
+import numpy as np
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+DEFAULT_SEED = 42
+
+# Column ranges of the feature blocks produced by audio_processing.segmentAndSaveAudio (13 MFCC + 128 mel + 12 chroma)
+SEGMENT_LAYOUT = {"mfcc": (0, 13), "mel": (13, 141), "chroma": (141, 153)}
+
+# Column ranges of the per-file vectors produced by voice_training.extractFeatures (13 MFCC + 12 chroma + 7 contrast)
+SUMMARY_LAYOUT = {"mfcc": (0, 13), "mel": None, "chroma": (13, 25)}
+
+DEFAULT_SETTINGS = {
+    "gainDb": 6.0,              # Random gain drawn from [-gainDb, gainDb]
+    "noiseProb": 0.5,           # Chance of adding a noise floor to a sample
+    "noiseDb": -30.0,           # Noise floor relative to the sample's mean power
+    "maxPitchShift": 1,         # Semitones, applied as mel/chroma bin shifts
+    "maxTimeShift": 2,          # Frames
+    "mixProb": 0.3,             # Chance of mixing a target sample with another member's segment
+    "mixGainDb": (-12.0, -6.0)  # Level of the mixed-in segment
+}
+
+MEL_BINS = 128  # librosa default used when the features were extracted
+
+def _dctMatrix(numMels, numMfcc):
+    """Orthonormal DCT-II rows, matching librosa.feature.mfcc."""
+    n = np.arange(numMels)
+    k = np.arange(numMfcc)[:, np.newaxis]
+    dct = np.cos(np.pi * k * (2 * n + 1) / (2 * numMels)) * np.sqrt(2.0 / numMels)
+    dct[0] /= np.sqrt(2.0)
+    return dct.astype(np.float32)
+
+def _powerToDb(power):
+    return 10.0 * np.log10(np.maximum(power, 1e-10))
+
+def batchRng(seed, epoch, batchIndex):
+    """Each batch gets its own generator so results do not depend on which worker builds it."""
+    return np.random.default_rng([seed, epoch, batchIndex])
+
+def _shiftAlongAxis(values, shifts, axis, wrap=False):
+    """Shift each sample along an axis by its own offset, clamping (or wrapping) at the edges."""
+    size = values.shape[axis]
+    positions = np.arange(size)[np.newaxis, :] - shifts[:, np.newaxis]
+    positions = positions % size if wrap else np.clip(positions, 0, size - 1)
+    indexShape = [len(shifts)] + [1] * (values.ndim - 1)
+    indexShape[axis] = size
+    return np.take_along_axis(values, positions.reshape(indexShape), axis=axis)
+
+def _augmentSegments(x, rng, layout, settings, partners, mixRows):
+    """Augment (N, T, F) segment features in the power domain and carry the change through to the MFCCs."""
+    n = len(x)
+    mfccLo, mfccHi = layout["mfcc"]
+    melLo, melHi = layout["mel"]
+    chromaLo, chromaHi = layout["chroma"]
+
+    mel = np.maximum(x[..., melLo:melHi], 0.0)
+    chroma = x[..., chromaLo:chromaHi]
+    originalDb = _powerToDb(mel)
+
+    # Gain (mel features are power spectra)
+    gain = 10.0 ** (rng.uniform(-settings["gainDb"], settings["gainDb"], n) / 10.0)
+    mel = mel * gain[:, np.newaxis, np.newaxis]
+
+    # Mix in other members' segments at a lower level; chroma is re-normalized per frame like chroma_stft
+    if partners is not None and len(mixRows):
+        lo, hi = settings["mixGainDb"]
+        mixGain = 10.0 ** (rng.uniform(lo, hi, len(mixRows)) / 10.0)[:, np.newaxis, np.newaxis]
+        mel[mixRows] += mixGain * np.maximum(partners[..., melLo:melHi], 0.0)
+        mixedChroma = chroma[mixRows] + np.sqrt(mixGain) * partners[..., chromaLo:chromaHi]
+        chroma = chroma.copy()
+        chroma[mixRows] = mixedChroma / np.maximum(mixedChroma.max(axis=-1, keepdims=True), 1e-10)
+
+    # Additive noise floor
+    noisy = rng.random(n) < settings["noiseProb"]
+    noisePower = mel.mean(axis=(1, 2)) * (10.0 ** (settings["noiseDb"] / 10.0)) * noisy
+    mel = mel + noisePower[:, np.newaxis, np.newaxis] * rng.exponential(1.0, mel.shape)
+
+    # Small pitch shift: one mel bin and one chroma bin per semitone
+    maxPitch = settings["maxPitchShift"]
+    if maxPitch > 0:
+        pitchShift = rng.integers(-maxPitch, maxPitch + 1, n)
+        mel = _shiftAlongAxis(mel, pitchShift, axis=2)
+        chroma = _shiftAlongAxis(chroma, pitchShift, axis=2, wrap=True)
+
+    # MFCCs are a DCT of the log-mel spectrum, so apply the same change in that domain
+    dct = _dctMatrix(melHi - melLo, mfccHi - mfccLo)
+    x[..., mfccLo:mfccHi] += (_powerToDb(mel) - originalDb) @ dct.T
+    x[..., melLo:melHi] = mel
+    x[..., chromaLo:chromaHi] = chroma
+
+    # Small time shift inside the segment
+    maxTime = settings["maxTimeShift"]
+    if maxTime > 0 and x.shape[1] > 1:
+        timeShift = rng.integers(-maxTime, maxTime + 1, n)
+        x = _shiftAlongAxis(x, timeShift, axis=1)
+    return x
+
+def _augmentSummaries(x, rng, layout, settings, partners, mixRows):
+    """Augment (N, F) summary vectors, which only keep mean MFCC/chroma values."""
+    n = len(x)
+    mfccLo, _ = layout["mfcc"]
+    chromaLo, chromaHi = layout["chroma"]
+
+    # A gain of d dB shifts every log-mel bin by d, which only moves the first (orthonormal) MFCC
+    gainDb = rng.uniform(-settings["gainDb"], settings["gainDb"], n)
+    x[:, mfccLo] += gainDb * np.sqrt(MEL_BINS)
+
+    if partners is not None and len(mixRows):
+        lo, hi = settings["mixGainDb"]
+        weight = 10.0 ** (rng.uniform(lo, hi, len(mixRows)) / 20.0)[:, np.newaxis]
+        x[mixRows] = (x[mixRows] + weight * partners) / (1.0 + weight)
+
+    noisy = rng.random(n) < settings["noiseProb"]
+    noiseScale = x.std(axis=0) * (10.0 ** (settings["noiseDb"] / 20.0)) if n > 1 else np.zeros(x.shape[1])
+    x += rng.standard_normal(x.shape) * noiseScale * noisy[:, np.newaxis]
+
+    maxPitch = settings["maxPitchShift"]
+    if maxPitch > 0:
+        pitchShift = rng.integers(-maxPitch, maxPitch + 1, n)
+        x[:, chromaLo:chromaHi] = _shiftAlongAxis(x[:, chromaLo:chromaHi], pitchShift, axis=1, wrap=True)
+    return x
+
+def augmentBatch(batch, rng, layout=SEGMENT_LAYOUT, settings=None, mixPool=None, mixMask=None, mixIndices=None):
+    """
+    Apply random gain, additive noise, small pitch/time shifts and mixing to a batch of features.
+    All operations are vectorized over the batch; the input is not modified.
+
+    :param batch: (N, T, F) segment features or (N, F) summary features.
+    :param rng: numpy Generator.
+    :param layout: Column ranges of the feature blocks (SEGMENT_LAYOUT or SUMMARY_LAYOUT).
+    :param settings: Overrides for DEFAULT_SETTINGS.
+    :param mixPool: Features that can be mixed into the batch (e.g. other members' segments).
+    :param mixMask: Boolean mask of batch samples allowed to receive a mix (e.g. positive samples only).
+    :param mixIndices: Optional rows of mixPool that may be mixed in. Only the sampled partners are gathered,
+                       so a whole training set can be passed as mixPool without copying its negatives.
+    :return: Augmented copy of the batch as float32.
+    """
+    settings = {**DEFAULT_SETTINGS, **(settings or {})}
+    x = np.array(batch, dtype=np.float32, copy=True)
+    n = len(x)
+
+    partners, mixRows = None, np.array([], dtype=int)
+    poolSize = len(mixIndices) if mixIndices is not None else len(mixPool) if mixPool is not None else 0
+    if poolSize > 0 and settings["mixProb"] > 0:
+        canMix = rng.random(n) < settings["mixProb"]
+        if mixMask is not None:
+            canMix &= np.asarray(mixMask, dtype=bool)
+        mixRows = np.flatnonzero(canMix)
+        partnerRows = np.sort(rng.integers(0, poolSize, len(mixRows)))
+        if mixIndices is not None:
+            partnerRows = mixIndices[partnerRows]
+        partners = np.asarray(mixPool[partnerRows], dtype=np.float32)
+
+    if layout["mel"] is not None and x.ndim == 3:
+        return _augmentSegments(x, rng, layout, settings, partners, mixRows)
+    return _augmentSummaries(x, rng, layout, settings, partners, mixRows)
+
+# State shared with worker processes, set once per worker by _initWorker
+_workerState = {}
+
+def _initWorker(x, y, layout, settings, mixSources, mixTargets, scaler):
+    _workerState.update(x=x, y=y, layout=layout, settings=settings, mixSources=mixSources, mixTargets=mixTargets, scaler=scaler)
+
+def _buildBatch(seed, epoch, batchIndex, indices):
+    state = _workerState
+    rng = batchRng(seed, epoch, batchIndex)
+    x, y = state["x"], state["y"]
+
+    # Partners are gathered from x by index inside augmentBatch: copying every mix source per batch cost more than the mixing
+    mixSources = state["mixSources"]
+    mixMask = state["mixTargets"][indices] if state["mixTargets"] is not None else None
+    xBatch = augmentBatch(
+        x[indices], rng, state["layout"], state["settings"], x if mixSources is not None else None, mixMask, mixSources
+    )
+
+    if state["scaler"] is not None:
+        xBatch = state["scaler"].transform(xBatch)
+    return xBatch, y[indices]
+
+class AugmentedBatchStream:
+    def __init__(self, x, y, batchSize=32, seed=DEFAULT_SEED, layout=SEGMENT_LAYOUT, settings=None,
+                 mixSources=None, mixTargets=None, scaler=None, workers=2, prefetch=4):
+        """
+        Shuffled, augmented training batches built in background worker processes.
+
+        :param x: Raw (unnormalized) features.
+        :param y: Labels, indexed alongside x.
+        :param seed: Makes the shuffling and augmentation reproducible. None picks a random seed.
+        :param mixSources: Indices into x that may be mixed into other samples (e.g. other members' segments).
+        :param mixTargets: Boolean mask over x of samples that may receive a mix.
+        :param scaler: Optional RunningScaler applied after augmentation.
+        :param workers: Number of worker processes. 0 builds batches in the calling process.
+        :param prefetch: Number of batches kept in flight ahead of the trainer.
+        """
+        self.x = x
+        self.y = y
+        self.batchSize = batchSize
+        self.seed = seed if seed is not None else int(np.random.SeedSequence().entropy % (2 ** 32))
+        self.layout = layout
+        self.settings = settings
+        self.mixSources = np.asarray(mixSources) if mixSources is not None else None
+        self.mixTargets = np.asarray(mixTargets, dtype=bool) if mixTargets is not None else None
+        self.scaler = scaler
+        self.workers = workers
+        self.prefetch = max(prefetch, 1)
+
+    def __len__(self):
+        return math.ceil(len(self.x) / self.batchSize)
+
+    def _jobs(self, epochs):
+        for epoch in range(epochs):
+            order = np.random.default_rng([self.seed, epoch]).permutation(len(self.x))
+            for batchIndex in range(len(self)):
+                indices = np.sort(order[batchIndex * self.batchSize:(batchIndex + 1) * self.batchSize])
+                yield epoch, batchIndex, indices
+
+    def batches(self, epochs):
+        """Yield (xBatch, yBatch) tuples for the given number of epochs, in a reproducible order."""
+        initArgs = (self.x, self.y, self.layout, self.settings, self.mixSources, self.mixTargets, self.scaler)
+
+        if self.workers <= 0:
+            _initWorker(*initArgs)
+            for epoch, batchIndex, indices in self._jobs(epochs):
+                yield _buildBatch(self.seed, epoch, batchIndex, indices)
+            return
+
+        # Spawn rather than fork: the trainer process already has TensorFlow threads running
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=self.workers, mp_context=context, initializer=_initWorker, initargs=initArgs) as executor:
+            pending = deque()
+            for epoch, batchIndex, indices in self._jobs(epochs):
+                pending.append(executor.submit(_buildBatch, self.seed, epoch, batchIndex, indices))
+                if len(pending) >= self.prefetch:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+# end AugmentedBatchStream
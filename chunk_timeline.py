@@ -0,0 +1,46 @@
+class ChunkTimeline:
+    def __init__(self, audio, chunkDuration=40):
+        """
+        Lightweight view of a song split into fixed-length chunks.
+        Only the chunk count is stored; audio slices are cut on demand.
+
+        :param audio: pydub AudioSegment of the song.
+        :param chunkDuration: Chunk length in milliseconds.
+        """
+        self.audio = audio
+        self.chunkDuration = chunkDuration
+        self.durationMs = len(audio)
+        self.chunkCount = -(-self.durationMs // chunkDuration)  # Ceiling division, same count as slicing every chunkDuration ms
+
+    def __len__(self):
+        return self.chunkCount
+
+    def __iter__(self):
+        for chunkIndex in range(self.chunkCount):
+            yield self[chunkIndex]
+
+    def __getitem__(self, index):
+        """Return the AudioSegment for a chunk index, or the joined audio for a slice of chunks."""
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self.chunkCount)
+            if step != 1:
+                return [self[i] for i in range(start, stop, step)]
+            return self.audio[self.chunkToTime(start):self.chunkToTime(stop)]
+
+        if index < 0:
+            index += self.chunkCount
+        if not 0 <= index < self.chunkCount:
+            raise IndexError(f"Chunk index {index} out of range (0-{self.chunkCount - 1})")
+        return self.audio[self.chunkToTime(index):self.chunkToTime(index + 1)]
+
+    def chunkToTime(self, chunkIndex):
+        """Start time of a chunk in milliseconds, capped at the end of the song."""
+        return min(chunkIndex * self.chunkDuration, self.durationMs)
+
+    def timeToChunk(self, timeMs):
+        """Chunk index containing the given time, clamped to the valid range."""
+        return max(0, min(int(timeMs // self.chunkDuration), self.chunkCount - 1))
+
+    def isValidChunk(self, chunkIndex):
+        return 0 <= chunkIndex < self.chunkCount
+# end ChunkTimeline
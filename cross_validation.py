@@ -0,0 +1,203 @@
+import os
+import csv
+import time
+import multiprocessing
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from audio_processing import CHUNK_DURATION, prepareSong, buildPerceptronModel
+from feature_scaler import RunningScaler
+from augmentation import AugmentedBatchStream, DEFAULT_SEED
+from project_store import loadSongLabels
+
+SEGMENT_DURATION = 200
+SEGMENT_CHUNKS = SEGMENT_DURATION // CHUNK_DURATION  # 40ms chunks per 200ms feature segment
+
+def labelsToSegmentTargets(labels, memberNames, numSegments, minCoverage=0.5):
+    """
+    Turn [member, startChunk, endChunk] labels into a (segments x members) boolean target matrix.
+    A segment counts as a member's line when at least minCoverage of its chunks are labeled.
+    """
+    numChunks = numSegments * SEGMENT_CHUNKS
+    memberRows = {name: i for i, name in enumerate(memberNames)}
+    chunkMask = np.zeros((len(memberNames), numChunks), dtype=bool)
+
+    for member, start, end in labels:
+        if member in memberRows:
+            chunkMask[memberRows[member], max(start, 0):min(end + 1, numChunks)] = True
+
+    coverage = chunkMask.reshape(len(memberNames), numSegments, SEGMENT_CHUNKS).mean(axis=2)
+    return (coverage >= minCoverage).T
+
+def loadSongDataset(selectedGroup, memberNames):
+    """
+    Collect every labeled song of a group with its cached segment features.
+    Features are extracted once per song and reused from ./training_data/<group>/<song>_vocals.npy.
+
+    :return: Dict of song name -> (features .npy path, (segments x members) target matrix).
+    """
+    labelsDir = f"./saved_labels/{selectedGroup}"
+    songData = {}
+
+    if not os.path.exists(labelsDir):
+        print(f"No labeled data found for {selectedGroup}.")
+        return songData
+
+    for labelFile in sorted(os.listdir(labelsDir)):
+        if not labelFile.endswith("_labels.json"):
+            continue
+
+        songName = labelFile.replace("_labels.json", "")
+        mp3Path = f"./training_data/{selectedGroup}/{songName}_vocals.mp3"
+        wavPath = f"./training_data/{selectedGroup}/{songName}_vocals.wav"
+        featuresPath = f"./training_data/{selectedGroup}/{songName}_vocals.npy"
+
+        if os.path.exists(mp3Path):
+            prepareSong(mp3Path, wavPath, featuresPath, segmentDuration=SEGMENT_DURATION)
+        elif not os.path.exists(featuresPath):
+            print(f"Skipping {songName} (missing vocals file).")
+            continue
+
+        labels = loadSongLabels(selectedGroup, songName, os.path.join(labelsDir, labelFile))
+
+        numSegments = len(np.load(featuresPath, mmap_mode="r"))
+        songData[songName] = (featuresPath, labelsToSegmentTargets(labels, memberNames, numSegments))
+
+    return songData
+
+def makeSongFolds(songNames, k=5, seed=DEFAULT_SEED):
+    """Split songs (not segments) into k folds so no song appears in both train and test."""
+    order = np.random.default_rng(seed).permutation(sorted(songNames))
+    k = max(2, min(k, len(order)))
+    return [fold.tolist() for fold in np.array_split(order, k)]
+
+def _stackSongs(songs, songData):
+    """Features and (segments x members) targets of the given songs, stacked in song order."""
+    features = [np.load(songData[song][0], mmap_mode="r") for song in songs]
+    targets = [songData[song][1] for song in songs]
+    return np.concatenate(features).astype(np.float32), np.concatenate(targets)
+
+def _limitThreads(threads):
+    """Keep parallel folds from oversubscribing the CPU."""
+    import tensorflow as tf
+    tf.config.threading.set_intra_op_parallelism_threads(threads)
+    tf.config.threading.set_inter_op_parallelism_threads(1)
+
+def trainFold(foldIndex, trainSongs, testSongs, songData, memberNames, epochs=50, threshold=0.8,
+              modelBuilder=buildPerceptronModel, augment=False, seed=DEFAULT_SEED, threads=None):
+    """Train one binary model per member on the training songs and score it on the held-out songs."""
+    if threads:
+        _limitThreads(threads)
+
+    # Features and normalization are the same for every member of a fold, only the targets differ
+    foldStart = time.perf_counter()
+    xTrain, trainTargets = _stackSongs(trainSongs, songData)
+    xTest, testTargets = _stackSongs(testSongs, songData)
+
+    # Normalization stats come from the training songs only
+    scaler = RunningScaler()
+    for song in trainSongs:
+        scaler.updateFromFile(songData[song][0])
+    xTestScaled = scaler.transform(xTest)
+    xTrainScaled = None
+    sharedTime = time.perf_counter() - foldStart  # Split evenly over the members in the report
+
+    results = []
+    for memberIndex, memberName in enumerate(memberNames):
+        startTime = time.perf_counter()
+
+        yTrain, yTest = trainTargets[:, memberIndex], testTargets[:, memberIndex]
+        if not yTrain.any():
+            print(f"Fold {foldIndex}: no training lines for {memberName}, skipping.")
+            continue
+
+        yTrainOneHot = np.stack([yTrain, ~yTrain], axis=1).astype(np.float32)
+        model = modelBuilder(xTrain.shape[1:], numMembers=2)
+
+        if augment:
+            stream = AugmentedBatchStream(
+                xTrain, yTrainOneHot, batchSize=32, seed=seed + foldIndex,
+                mixSources=np.flatnonzero(~yTrain), mixTargets=yTrain, scaler=scaler, workers=0
+            )
+            model.fit(stream.batches(epochs), steps_per_epoch=len(stream), epochs=epochs, verbose=0)
+        else:
+            if xTrainScaled is None:
+                xTrainScaled = scaler.transform(xTrain)
+            model.fit(xTrainScaled, yTrainOneHot, epochs=epochs, batch_size=32, verbose=0)
+
+        predicted = model.predict(xTestScaled, verbose=0)[:, 0] > threshold
+
+        truePositives = int(np.sum(predicted & yTest))
+        falsePositives = int(np.sum(predicted & ~yTest))
+        falseNegatives = int(np.sum(~predicted & yTest))
+        results.append({
+            "fold": foldIndex,
+            "member": memberName,
+            "testSongs": len(testSongs),
+            "testSegments": int(len(yTest)),
+            "precision": truePositives / (truePositives + falsePositives) if truePositives + falsePositives else 0.0,
+            "recall": truePositives / (truePositives + falseNegatives) if truePositives + falseNegatives else 0.0,
+            "wallTime": time.perf_counter() - startTime + sharedTime / len(memberNames)
+        })
+        print(f"Fold {foldIndex} {memberName}: precision {results[-1]['precision']:.3f}, recall {results[-1]['recall']:.3f}")
+
+    return results
+
+def printReport(results):
+    print(f"\n{'Fold':>4}  {'Member':<12}{'Precision':>10}{'Recall':>10}{'Time (s)':>10}")
+    for result in results:
+        print(f"{result['fold']:>4}  {result['member']:<12}{result['precision']:>10.3f}{result['recall']:>10.3f}{result['wallTime']:>10.1f}")
+
+    print("\nMean over folds:")
+    for member in dict.fromkeys(result["member"] for result in results):
+        memberResults = [result for result in results if result["member"] == member]
+        precision = np.mean([result["precision"] for result in memberResults])
+        recall = np.mean([result["recall"] for result in memberResults])
+        print(f"  {member:<12} precision {precision:.3f}, recall {recall:.3f} over {len(memberResults)} folds")
+
+def saveReport(results, reportPath):
+    os.makedirs(os.path.dirname(reportPath) or ".", exist_ok=True)
+    with open(reportPath, "w", newline="") as file:
+        writer = csv.DictWriter(file, fieldnames=["fold", "member", "testSongs", "testSegments", "precision", "recall", "wallTime"])
+        writer.writeheader()
+        writer.writerows(results)
+    print(f"Cross-validation report saved to {reportPath}")
+
+def runCrossValidation(selectedGroup, memberNames, k=5, workers=None, epochs=50, augment=False, seed=DEFAULT_SEED, reportPath=None):
+    """
+    Song-level k-fold cross-validation of the per-member models, one worker process per fold.
+
+    :return: List of per-fold, per-member result dicts (precision, recall, wall time).
+    :raises ValueError: If k is larger than the number of labeled songs.
+    """
+    songData = loadSongDataset(selectedGroup, memberNames)
+    if len(songData) < 2:
+        print(f"Need at least two labeled songs for cross-validation, found {len(songData)}.")
+        return []
+
+    if k > len(songData):
+        raise ValueError(f"Cannot make {k} folds from {len(songData)} labeled songs of {selectedGroup}.")
+
+    folds = makeSongFolds(songData.keys(), k, seed)
+    workers = workers or min(len(folds), os.cpu_count() or 1)
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    print(f"Running {len(folds)}-fold cross-validation on {len(songData)} songs with {workers} workers")
+
+    startTime = time.perf_counter()
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+        futures = []
+        for foldIndex, testSongs in enumerate(folds):
+            trainSongs = [song for song in songData if song not in testSongs]
+            futures.append(executor.submit(
+                trainFold, foldIndex, trainSongs, testSongs, songData, memberNames,
+                epochs=epochs, augment=augment, seed=seed, threads=threads
+            ))
+        results = [result for future in futures for result in future.result()]
+
+    printReport(results)
+    print(f"Total wall time: {time.perf_counter() - startTime:.1f}s")
+
+    if reportPath is None:
+        reportPath = f"./{selectedGroup}/cross_validation_report.csv"
+    saveReport(results, reportPath)
+    return results
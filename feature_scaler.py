@@ -0,0 +1,122 @@
+import os
+import numpy as np
+
+class RunningScaler:
+    def __init__(self, featureDim=None):
+        """
+        Online mean/variance accumulator (Welford / Chan et al.) for feature normalization.
+
+        :param featureDim: Size of the last (feature) axis. Inferred from the first batch if None.
+        """
+        self.count = 0
+        self.mean = None
+        self.m2 = None
+        self.sources = set()  # Keys of inputs already folded into the statistics
+        if featureDim is not None:
+            self._allocate(featureDim)
+
+    def _allocate(self, featureDim):
+        self.mean = np.zeros(featureDim, dtype=np.float64)
+        self.m2 = np.zeros(featureDim, dtype=np.float64)
+
+    def hasSource(self, source):
+        return source is not None and source in self.sources
+
+    def update(self, batch, source=None):
+        """
+        Fold a batch of features into the running statistics.
+        Every axis except the last is treated as a sample axis, so (N, 153) and (N, T, 153) both work.
+
+        :param batch: Array whose last axis is the feature axis.
+        :param source: Optional key (e.g. a file path). Batches from a source that was already folded in are skipped.
+        :return: True if the batch was added, False if it was skipped.
+        """
+        if self.hasSource(source):
+            return False
+
+        batch = np.asarray(batch, dtype=np.float64)
+        batch = batch.reshape(-1, batch.shape[-1])
+        batchCount = batch.shape[0]
+        if batchCount == 0:
+            return False
+
+        if self.mean is None:
+            self._allocate(batch.shape[1])
+
+        batchMean = batch.mean(axis=0)
+        batchM2 = ((batch - batchMean) ** 2).sum(axis=0)
+
+        # Chan's parallel merge of (count, mean, M2) pairs
+        total = self.count + batchCount
+        delta = batchMean - self.mean
+        self.mean = self.mean + delta * (batchCount / total)
+        self.m2 = self.m2 + batchM2 + delta ** 2 * (self.count * batchCount / total)
+        self.count = total
+
+        if source is not None:
+            self.sources.add(source)
+        return True
+
+    def updateFromFile(self, npyPath, blockSize=4096):
+        """Stream a saved .npy feature file into the statistics without loading it all at once."""
+        if self.hasSource(npyPath):
+            return False
+
+        features = np.load(npyPath, mmap_mode="r")
+        for i in range(0, len(features), blockSize):
+            self.update(features[i:i + blockSize])
+
+        self.sources.add(npyPath)
+        return True
+
+    @property
+    def variance(self):
+        if self.count == 0:
+            return None
+        return self.m2 / self.count
+
+    @property
+    def scale(self):
+        """Standard deviation per feature, with zero-variance features left unscaled (same as StandardScaler)."""
+        std = np.sqrt(self.variance)
+        std[std == 0.0] = 1.0
+        return std
+
+    def transform(self, features):
+        """Normalize features of any leading shape using the accumulated statistics."""
+        if self.count == 0:
+            raise ValueError("RunningScaler has not seen any data yet.")
+        features = np.asarray(features)
+        return ((features - self.mean) / self.scale).astype(np.float32)
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        np.savez(
+            path,
+            count=np.array(self.count),
+            mean=self.mean,
+            m2=self.m2,
+            sources=np.array(sorted(self.sources), dtype=str)
+        )
+
+    @classmethod
+    def load(cls, path):
+        scaler = cls()
+        with np.load(path) as data:
+            scaler.count = int(data["count"])
+            scaler.mean = data["mean"]
+            scaler.m2 = data["m2"]
+            scaler.sources = set(data["sources"].tolist())
+        return scaler
+
+    @classmethod
+    def loadOrCreate(cls, path):
+        if os.path.exists(path):
+            print(f"Loading normalization stats from {path}")
+            return cls.load(path)
+        return cls()
+# end RunningScaler
+
+def getScalerPath(dataPath, memberName):
+    """Scaler statistics live next to the member's model."""
+    return os.path.join(dataPath, f"{memberName}_scaler.npz")
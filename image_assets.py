@@ -0,0 +1,65 @@
+import os
+import json
+import hashlib
+import numpy as np
+from PIL import Image
+
+ASSET_CACHE_DIR = "./asset_cache"
+
+def hexToRGB(color):
+    color = color.lstrip('#')
+    return tuple(int(color[i:i+2], 16) for i in (0, 2, 4))
+
+def imageHash(image):
+    """Hash of an image's decoded pixels, so re-saved but identical PNGs share cache entries."""
+    digest = hashlib.sha1(f"{image.mode}{image.size}".encode("utf-8"))
+    digest.update(image.tobytes())
+    return digest.hexdigest()
+
+def chromaKey(image, keyColor):
+    """Make every pixel of keyColor fully transparent, using one array mask instead of a per-pixel loop."""
+    pixels = np.array(image.convert("RGBA"))
+    mask = (pixels[..., :3] == hexToRGB(keyColor)).all(axis=-1)
+    pixels[mask] = 0
+    return Image.fromarray(pixels, "RGBA")
+
+def lastColorX(image, color):
+    """Rightmost x in the first row whose pixel is color and not transparent, or None."""
+    firstRow = np.array(image.convert("RGBA"))[0]
+    matches = np.flatnonzero((firstRow[:, :3] == hexToRGB(color)).all(axis=-1) & (firstRow[:, 3] != 0))
+    return int(matches[-1]) if len(matches) else None
+
+def loadDerivedAssets(image, keyColor, barColor, cacheDir=ASSET_CACHE_DIR):
+    """
+    The chroma-keyed "clear" image and the progress bar start pixel for a member image.
+    Both are cached on disk keyed by the source pixels' hash and the colors, so later launches only read a PNG.
+
+    :param image: Source (dark) PIL image.
+    :param keyColor: Color made transparent in the clear image.
+    :param barColor: Member color searched for in the first row to find where the progress bar starts.
+    :return: (clearImage, startX or None)
+    """
+    key = f"{imageHash(image)}_{keyColor.lstrip('#').lower()}_{barColor.lstrip('#').lower()}"
+    imagePath = os.path.join(cacheDir, f"{key}.png")
+    infoPath = os.path.join(cacheDir, f"{key}.json")
+
+    if os.path.exists(imagePath) and os.path.exists(infoPath):
+        try:
+            with open(infoPath, "r") as file:
+                info = json.load(file)
+            clearImage = Image.open(imagePath)
+            clearImage.load()
+            return clearImage, info.get("startX")
+        except Exception as e:
+            print(f"Rebuilding cached image asset {key}: {e}")
+
+    clearImage = chromaKey(image, keyColor)
+    startX = lastColorX(image, barColor)
+    try:
+        os.makedirs(cacheDir, exist_ok=True)
+        clearImage.save(imagePath)
+        with open(infoPath, "w") as file:
+            json.dump({"startX": startX}, file)
+    except OSError as e:
+        print(f"Could not cache image asset {key}: {e}")
+    return clearImage, startX
@@ -0,0 +1,96 @@
+from bisect import bisect_right
+import numpy as np
+
+class KeyframeTrack:
+    def __init__(self, animations=()):
+        """
+        Linear animations of one value (e.g. a y position) over chunks, kept sorted by start chunk.
+        When animations overlap, the one that started last wins, and a finished animation holds its end
+        value until the next one starts. The value at a chunk is then a bisect, and baking a whole song
+        writes each animation's span once with numpy instead of checking every animation on every chunk.
+
+        :param animations: Optional (startValue, endValue, startChunk, endChunk) tuples.
+        """
+        self.animations = []  # (startChunk, order, endChunk, startValue, endValue), sorted
+        self.starts = []
+        self.added = 0
+        for animation in animations:
+            self.add(*animation)
+
+    def add(self, startValue, endValue, startChunk, endChunk):
+        """
+        Add an animation. Animations starting on the same chunk apply in the order they were added.
+
+        :param startValue: Value at startChunk, or None to continue from wherever the track is at startChunk - 1.
+        :param endValue: Value reached at endChunk and held afterwards.
+        """
+        startChunk, endChunk = int(startChunk), int(endChunk)
+        animation = (startChunk, self.added, endChunk, startValue, endValue)
+        self.added += 1
+        i = bisect_right(self.animations, animation)
+        self.animations.insert(i, animation)
+        self.starts.insert(i, startChunk)
+
+    def clear(self):
+        self.animations.clear()
+        self.starts.clear()
+
+    def __len__(self):
+        return len(self.animations)
+
+    def __repr__(self):
+        return f"KeyframeTrack({len(self.animations)} animations)"
+
+    @staticmethod
+    def interpolate(startValue, endValue, startChunk, endChunk, chunks):
+        """Vectorized linear interpolation at the given chunk indices, clamped to the end value."""
+        chunks = np.asarray(chunks, dtype=np.float64)
+        duration = endChunk - startChunk
+        if duration <= 0:
+            return np.full(chunks.shape, endValue, dtype=np.float64)
+        progress = np.clip((chunks - startChunk) / duration, 0.0, 1.0)
+        return startValue + (endValue - startValue) * progress
+
+    def valueAt(self, chunkIndex, default=None):
+        """
+        Value at a chunk, or default before any animation has started.
+        Animations starting from None are resolved against the ones before them.
+        """
+        i = bisect_right(self.starts, chunkIndex)
+        if not i:
+            return default
+        startChunk, _, endChunk, startValue, endValue = self.animations[i - 1]
+        if startValue is None:
+            startValue = self.valueAt(startChunk - 1, default)
+            if startValue is None:
+                return endValue
+        return float(self.interpolate(startValue, endValue, startChunk, endChunk, chunkIndex))
+
+    def bake(self, out, default=None, fromChunk=0):
+        """
+        Write the track into an array indexed by chunk. One sweep in start order: each animation fills the
+        span up to the next start, so the cost is O(chunks + animations).
+
+        :param out: Array to fill. Chunks before the first animation keep their value unless default is given.
+        :param default: Optional value for chunks before the first animation.
+        :param fromChunk: Only write chunks from here on; earlier values in out are trusted (and used by
+                          animations that continue from them).
+        :return: out
+        """
+        numChunks = len(out)
+        firstStart = self.starts[0] if self.starts else numChunks
+        if default is not None and fromChunk < firstStart:
+            out[fromChunk:firstStart] = default
+        for i in range(max(bisect_right(self.starts, fromChunk) - 1, 0), len(self.animations)):
+            startChunk, _, endChunk, startValue, endValue = self.animations[i]
+            if startChunk >= numChunks:
+                break
+            stop = min(self.starts[i + 1], numChunks) if i + 1 < len(self.animations) else numChunks
+            first = max(startChunk, fromChunk, 0)
+            if stop <= first:
+                continue  # Overridden by an animation starting on the same chunk
+            if startValue is None:
+                startValue = out[startChunk - 1] if startChunk > 0 else (default if default is not None else endValue)
+            out[first:stop] = self.interpolate(startValue, endValue, startChunk, endChunk, np.arange(first, stop))
+        return out
+# end KeyframeTrack
@@ -0,0 +1,70 @@
+from bisect import bisect_left, bisect_right
+
+class _FreeSlots:
+    def __init__(self, size):
+        """
+        Tracks used positions in a sorted list and finds the first unused position at or after an index.
+        Each position points at the next candidate; lookups compress the path (union-find style).
+        """
+        self.next = list(range(size + 1))  # Position `size` is a sentinel meaning "none left"
+        self.size = size
+
+    def find(self, index):
+        root = index
+        while self.next[root] != root:
+            root = self.next[root]
+        while self.next[index] != root:
+            self.next[index], index = root, self.next[index]
+        return root
+
+    def use(self, index):
+        self.next[index] = index + 1
+
+    def firstFreeFrom(self, index):
+        found = self.find(index)
+        return found if found < self.size else None
+# end _FreeSlots
+
+def matchLabels(labels, startPoints, endPoints):
+    """
+    Pair start and end markers into label ranges.
+    Saved labels whose start and end markers both exist keep their member. Every other start marker is
+    paired with the earliest unused end marker after it and gets no member.
+    Runs in O(n log n) for n markers.
+
+    :param labels: Saved [member, startChunk, endChunk] labels.
+    :param startPoints: Start marker chunk indices (may contain duplicates).
+    :param endPoints: End marker chunk indices (may contain duplicates).
+    :return: (matched (member, start, end) tuples sorted by start, unmatched start points)
+    """
+    sortedStartPoints = sorted(startPoints)
+    sortedEndPoints = sorted(endPoints)
+    startSet = set(sortedStartPoints)
+    endSet = set(sortedEndPoints)
+
+    matchedPoints = []
+    matchedStarts = set()
+    freeEnds = _FreeSlots(len(sortedEndPoints))
+
+    for member, labelStart, labelEnd in labels:
+        if labelStart in startSet and labelEnd in endSet:
+            matchedPoints.append((member, labelStart, labelEnd))
+            matchedStarts.add(labelStart)
+            # A saved label claims the first end marker with its value
+            freeEnds.use(bisect_left(sortedEndPoints, labelEnd))
+
+    unmatchedStartPoints = []
+    for startPoint in sortedStartPoints:
+        if startPoint in matchedStarts:
+            continue  # Skip if already matched
+
+        closestEndIndex = freeEnds.firstFreeFrom(bisect_right(sortedEndPoints, startPoint))
+        if closestEndIndex is not None:
+            matchedPoints.append((None, startPoint, sortedEndPoints[closestEndIndex]))  # No member name found
+            matchedStarts.add(startPoint)
+            freeEnds.use(closestEndIndex)
+        else:
+            unmatchedStartPoints.append(startPoint)
+
+    matchedPoints.sort(key=lambda x: x[1])
+    return matchedPoints, unmatchedStartPoints
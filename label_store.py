@@ -0,0 +1,301 @@
+import os
+import json
+import hashlib
+import threading
+
+def labelSortKey(label):
+    return (label[1], label[2], label[0])
+
+def serializeLabels(labels):
+    """Snapshot text for a label list. Fully sorted so the same labels always give the same text."""
+    return json.dumps(sorted((list(label) for label in labels), key=labelSortKey), indent=4)
+
+def labelsHash(labels):
+    return hashlib.sha1(serializeLabels(labels).encode("utf-8")).hexdigest()
+
+class LabelStore:
+    def __init__(self, path, compactEvery=200, onSnapshot=None):
+        """
+        In-memory, authoritative copy of a song's [member, startChunk, endChunk] labels.
+        Every edit is appended as one line to a journal next to the snapshot (<song>_labels.journal), so the
+        cost of saving an edit does not grow with the number of labels. Once the journal holds compactEvery
+        edits it is folded back into _labels.json by a background thread (temp file + os.replace).
+        On load the journal is replayed over the snapshot, which recovers edits made before a crash.
+
+        Each journal starts with a header holding the hash of the labels it was started from; a journal
+        is only replayed onto labels with that hash, so edits already folded into the snapshot are never
+        applied twice.
+
+        :param path: The song's _labels.json path.
+        :param compactEvery: Journal length that triggers a background compaction.
+        :param onSnapshot: Optional callback(labels) run after each snapshot write, e.g. to mirror into the project store.
+        """
+        self.path = path
+        self.journalPath = os.path.splitext(path)[0] + ".journal"
+        self.oldJournalPath = self.journalPath + ".old"
+        self.compactEvery = compactEvery
+        self.onSnapshot = onSnapshot
+        self.labels = []
+        self.listeners = []
+        self.lock = threading.RLock()
+        self.writeLock = threading.Lock()  # Serializes compactions
+        self.journal = None
+        self.journalLength = 0
+        self.compacting = False
+        self.undoStack = []
+        self.redoStack = []
+
+    # ---------------------------------------------------------------- loading
+
+    def load(self):
+        """Load the snapshot, replay any journals left behind and start a fresh journal."""
+        labels = []
+        if os.path.exists(self.path):
+            with open(self.path, "r") as file:
+                labels = json.load(file)
+
+        replayed = 0
+        for journalPath in (self.oldJournalPath, self.journalPath):
+            replayed += self._replayJournal(journalPath, labels)
+
+        with self.lock:
+            self._closeJournal()
+            self.labels[:] = labels
+            self.undoStack.clear()
+            self.redoStack.clear()
+        if replayed:
+            print(f"Recovered {replayed} label edits from {self.journalPath}")
+        self._notify("replace", None, None)
+
+        if replayed or os.path.exists(self.oldJournalPath):
+            self.compact()
+        return self.labels
+
+    def _replayJournal(self, journalPath, labels):
+        if not os.path.exists(journalPath):
+            return 0
+        with open(journalPath, "r") as file:
+            lines = [line for line in file.read().splitlines() if line.strip()]
+        if not lines:
+            return 0
+
+        try:
+            header = json.loads(lines[0])
+        except json.JSONDecodeError:
+            print(f"Ignoring {journalPath}: unreadable header")
+            return 0
+        if header.get("base") != labelsHash(labels):
+            # Already folded into the snapshot (or the snapshot was edited by hand)
+            return 0
+
+        count = 0
+        for line in lines[1:]:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                break  # Torn last line from a crash mid-write
+            self._applyTo(labels, entry)
+            count += 1
+        return count
+
+    # ---------------------------------------------------------------- listeners
+
+    def subscribe(self, listener):
+        """Register listener(action, oldLabel, newLabel) with action "add", "move", "remove" or "replace"."""
+        self.listeners.append(listener)
+        return listener
+
+    def _notify(self, action, oldLabel, newLabel):
+        for listener in list(self.listeners):
+            listener(action, oldLabel, newLabel)
+
+    # ---------------------------------------------------------------- edits
+
+    def add(self, label):
+        self._commit([{"op": "add", "label": list(label)}], label)
+
+    def move(self, label, start=None, end=None):
+        """Change a label's start and/or end chunk in place."""
+        newLabel = [label[0], label[1] if start is None else start, label[2] if end is None else end]
+        self._commit([{"op": "move", "old": list(label), "new": newLabel}], label)
+
+    def removeWhere(self, predicate):
+        """Remove every label for which predicate(label) is true. Returns the removed labels."""
+        with self.lock:
+            removed = [label for label in self.labels if predicate(label)]
+        if removed:
+            self._commit([{"op": "remove", "label": list(label)} for label in removed])
+        return removed
+
+    def replaceAll(self, labels):
+        with self.lock:
+            previous = [list(label) for label in self.labels]
+        self._commit([{"op": "replace", "old": previous, "labels": [list(label) for label in labels]}])
+
+    def undo(self):
+        """Revert the last edit. Returns the entries that were applied, or an empty list."""
+        return self._step(self.undoStack, self.redoStack, invert=True)
+
+    def redo(self):
+        return self._step(self.redoStack, self.undoStack, invert=False)
+
+    def canUndo(self):
+        return bool(self.undoStack)
+
+    def canRedo(self):
+        return bool(self.redoStack)
+
+    def _step(self, source, target, invert):
+        with self.lock:
+            if not source:
+                return []
+            entries = source.pop()
+            target.append(entries)
+            applied = [self._inverse(entry) for entry in reversed(entries)] if invert else entries
+        self._apply(applied)
+        return applied
+
+    def _commit(self, entries, target=None):
+        """Apply a user edit, journal it and make it undoable."""
+        with self.lock:
+            self.undoStack.append(entries)
+            self.redoStack.clear()
+        self._apply(entries, target)
+
+    def _apply(self, entries, target=None):
+        with self.lock:
+            if self.journal is None:
+                self._openJournal()  # Header must hash the labels before this edit
+            for entry in entries:
+                self._applyTo(self.labels, entry, target)
+                self._append(entry)
+        for entry in entries:
+            op = entry["op"]
+            if op == "add":
+                self._notify("add", None, self._find(entry["label"]) or entry["label"])
+            elif op == "move":
+                self._notify("move", entry["old"], self._find(entry["new"]) or entry["new"])
+            elif op == "remove":
+                self._notify("remove", entry["label"], None)
+            else:
+                self._notify("replace", None, None)
+        self._maybeCompact()
+
+    def _find(self, value):
+        for label in self.labels:
+            if label == value:
+                return label
+        return None
+
+    @staticmethod
+    def _applyTo(labels, entry, target=None):
+        """
+        Apply one journal entry to a label list. Labels are matched by value; target is the
+        label object being edited when the caller has it, so its identity is kept.
+        """
+        op = entry["op"]
+        if op == "add":
+            labels.append(target if target is not None else list(entry["label"]))
+        elif op == "move":
+            label = target if target is not None and target == entry["old"] else next((l for l in labels if l == entry["old"]), None)
+            if label is not None:
+                label[1], label[2] = entry["new"][1], entry["new"][2]
+        elif op == "remove":
+            for i, label in enumerate(labels):
+                if label == entry["label"]:
+                    del labels[i]
+                    break
+        elif op == "replace":
+            labels[:] = [list(label) for label in entry["labels"]]
+
+    @staticmethod
+    def _inverse(entry):
+        op = entry["op"]
+        if op == "add":
+            return {"op": "remove", "label": entry["label"]}
+        if op == "remove":
+            return {"op": "add", "label": entry["label"]}
+        if op == "move":
+            return {"op": "move", "old": entry["new"], "new": entry["old"]}
+        return {"op": "replace", "old": entry["labels"], "labels": entry["old"]}
+
+    # ---------------------------------------------------------------- journal
+
+    def _openJournal(self):
+        """Start a new journal based on the current labels. Caller holds the lock."""
+        directory = os.path.dirname(self.journalPath)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.journal = open(self.journalPath, "w")
+        self.journal.write(json.dumps({"base": labelsHash(self.labels)}) + "\n")
+        self.journal.flush()
+        self.journalLength = 0
+
+    def _closeJournal(self):
+        if self.journal:
+            self.journal.close()
+            self.journal = None
+
+    def _append(self, entry):
+        """One short line per edit. Caller holds the lock."""
+        self.journal.write(json.dumps(entry) + "\n")
+        self.journal.flush()
+        self.journalLength += 1
+
+    def _maybeCompact(self):
+        with self.lock:
+            if self.journalLength < self.compactEvery or self.compacting:
+                return
+            self.compacting = True
+        threading.Thread(target=self.compact, daemon=True).start()
+
+    def compact(self):
+        """
+        Fold the journal into the snapshot. The journal is rotated under the lock, so edits keep flowing
+        into a fresh journal while the snapshot is written.
+        """
+        with self.writeLock:
+            try:
+                with self.lock:
+                    if self.journal is None and not os.path.exists(self.journalPath):
+                        return  # Nothing edited since the snapshot was written
+                    snapshot = serializeLabels(self.labels)
+                    snapshotLabels = [list(label) for label in self.labels]
+                    self._closeJournal()
+                    if os.path.exists(self.journalPath):
+                        os.replace(self.journalPath, self.oldJournalPath)
+                    self._openJournal()
+
+                self._writeAtomic(snapshot)
+                if os.path.exists(self.oldJournalPath):
+                    os.remove(self.oldJournalPath)
+                if self.onSnapshot:
+                    self.onSnapshot(snapshotLabels)
+            except Exception as e:
+                print(f"Error saving labels to {self.path}: {e}")
+            finally:
+                self.compacting = False
+
+    def flush(self):
+        """Write everything into the snapshot now (e.g. for an explicit save)."""
+        self.compact()
+
+    def _writeAtomic(self, text):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tempPath = f"{self.path}.tmp"
+        with open(tempPath, "w") as file:
+            file.write(text)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tempPath, self.path)
+
+    def close(self):
+        """Compact and remove the journal so only the snapshot is left behind."""
+        self.compact()
+        with self.writeLock, self.lock:
+            self._closeJournal()
+            if os.path.exists(self.journalPath):
+                os.remove(self.journalPath)
+# end LabelStore
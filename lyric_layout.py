@@ -0,0 +1,137 @@
+import math
+from bisect import bisect_left, bisect_right
+import numpy as np
+from keyframes import KeyframeTrack
+
+class LyricLayout:
+    def __init__(self, duration=7, bottom=math.inf):
+        """
+        Stacked layout of the lyric boxes over the song. The newest lyric slides in at the top while every
+        lyric still on screen slides down by its stack height; a lyric is dropped once it has moved past
+        the bottom edge. Lyrics are kept sorted by start chunk with one KeyframeTrack of y positions each.
+
+        Since a lyric always sits below every newer one, lyrics leave the screen in start order, so the lyrics
+        visible at a chunk are a contiguous run found with two bisects (see visibleRange).
+
+        :param duration: Chunks a lyric takes to slide in (and the ones below it to make room).
+        :param bottom: y past which a lyric is no longer shown, e.g. the canvas height. Without one, lyrics never leave.
+        """
+        self.duration = duration
+        self.bottom = bottom
+        self.starts = []
+        self.heights = []  # Height each lyric slides in from above the top edge
+        self.shifts = []  # Distance the lyrics below move down when this one comes in
+        self.tracks = []
+        self.ends = []  # Last chunk each lyric is visible in (math.inf if it never leaves)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __repr__(self):
+        return f"LyricLayout({len(self.starts)} lyrics)"
+
+    def rebuild(self, lyrics, bottom=None):
+        """
+        Lay out every lyric from scratch in one sorted pass.
+
+        :param lyrics: (startChunk, height, shift) for each lyric.
+        :param bottom: y past which a lyric is no longer shown, e.g. the canvas height.
+        """
+        if bottom is not None:
+            self.bottom = bottom
+        entries = sorted((int(start), height, shift) for start, height, shift in lyrics)
+        self.starts = [start for start, _, _ in entries]
+        self.heights = [height for _, height, _ in entries]
+        self.shifts = [shift for _, _, shift in entries]
+        self.tracks = [None] * len(entries)
+        self.ends = [math.inf] * len(entries)
+        for i in range(len(entries)):
+            self._layoutLyric(i)
+
+    def setBottom(self, bottom):
+        """
+        Move the bottom edge (e.g. after a resize) and lay every lyric out again if it changed.
+
+        :return: True if the layout changed.
+        """
+        if bottom == self.bottom:
+            return False
+        self.bottom = bottom
+        for i in range(len(self.starts)):
+            self._layoutLyric(i)
+        return True
+
+    def add(self, startChunk, height, shift):
+        """
+        Add (or replace) the lyric starting at startChunk. Only the new lyric and the older lyrics still on
+        screen when it comes in are laid out again; lyrics that already left, and newer ones, are unaffected.
+        """
+        startChunk = int(startChunk)
+        i = bisect_left(self.starts, startChunk)
+        if i < len(self.starts) and self.starts[i] == startChunk:
+            self.heights[i], self.shifts[i] = height, shift
+        else:
+            self.starts.insert(i, startChunk)
+            self.heights.insert(i, height)
+            self.shifts.insert(i, shift)
+            self.tracks.insert(i, None)
+            self.ends.insert(i, math.inf)
+
+        for j in range(bisect_left(self.ends, startChunk, 0, i), i + 1):
+            self._layoutLyric(j)
+
+    def _layoutLyric(self, i):
+        """Build lyric i's track: slide in, then one slide down per newer lyric until it passes the bottom."""
+        start = self.starts[i]
+        track = KeyframeTrack([(-self.heights[i], 0, start, start + self.duration)])
+        end = math.inf
+        target = 0
+        for j in range(i + 1, len(self.starts)):
+            if self.starts[j] > end:
+                break  # Gone before this lyric comes in
+            target += self.shifts[j]
+            track.add(None, target, self.starts[j], self.starts[j] + self.duration)
+            if target > self.bottom:
+                # Shown up to and including the first chunk past the bottom edge. Every chunk before this
+                # slide started was still on screen, so the search can start there.
+                end = next(
+                    chunk for chunk in range(self.starts[j], self.starts[j] + self.duration + 1)
+                    if track.valueAt(chunk) > self.bottom
+                )
+        self.tracks[i] = track
+        self.ends[i] = end
+
+    def visibleRange(self, chunkIndex):
+        """(first, stop) indices of the lyrics shown at a chunk."""
+        stop = bisect_right(self.starts, chunkIndex)
+        return bisect_left(self.ends, chunkIndex, 0, stop), stop
+
+    def visibleLyrics(self, chunkIndex):
+        """(lyric startChunk, y) pairs shown at a chunk."""
+        first, stop = self.visibleRange(chunkIndex)
+        return [(self.starts[i], round(self.tracks[i].valueAt(chunkIndex), 1)) for i in range(first, stop)]
+
+    def table(self, numChunks):
+        """
+        Visible lyrics of every chunk in CSR form, as stored by Scene: the lyrics shown at chunk c are
+        lyricIds[offsets[c]:offsets[c + 1]] (indices into starts) at the matching ys.
+
+        :return: (offsets, lyricIds, ys)
+        """
+        chunks, lyricIds, ys = [], [], []
+        for i, start in enumerate(self.starts):
+            stop = int(min(self.ends[i] + 1, numChunks))
+            if stop <= start:
+                continue
+            span = self.tracks[i].bake(np.zeros(stop, dtype=np.float64), fromChunk=start)[start:]
+            chunks.append(np.arange(start, stop))
+            lyricIds.append(np.full(stop - start, i))
+            ys.append(np.round(span, 1))
+        if not chunks:
+            return np.zeros(numChunks + 1, dtype=np.int64), np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.float32)
+
+        chunks, lyricIds, ys = np.concatenate(chunks), np.concatenate(lyricIds), np.concatenate(ys)
+        order = np.lexsort((lyricIds, chunks))
+        offsets = np.searchsorted(chunks[order], np.arange(numChunks + 1)).astype(np.int64)
+        return offsets, lyricIds[order].astype(np.int32), ys[order].astype(np.float32)
+# end LyricLayout
@@ -2,6 +2,7 @@ from PIL import Image, ImageTk
 import tkinter as tk
 import os
 from matplotlib import font_manager
+from keyframes import KeyframeTrack
 
 class LyricBox:
     def __init__(self, canvas, parent, memberName, koreanLyric, romanization, englishTrans, startChunk, language, isAdLib=False, adLibDuration=0):
@@ -39,10 +40,9 @@ class LyricBox:
         self.font = (fontProperties.get_name(), self.fontSize, "bold")
         self.englishFont = (fontProperties.get_name(), self.fontSize + 2)
 
-        self.animations = []
+        self.animations = KeyframeTrack()  # y position over chunks
         
         self.lyricsPadding = 5
-        self.addLyricDuration = 7
         
         if isAdLib:
             self.createAdLibDisplay()
@@ -65,41 +65,11 @@ class LyricBox:
                 print(f"Warning: {imagePath} does not exist")
         return photos
     
-    def initializeLyricPosition(self):
-        chunkIndex = self.startChunk
-        baseY = self.endY # Base Position
-        
-        # Find most recent chunk index with lyriccs
-        recentChunkIndex = max(
-            (key for key in self.parent.lyrics if key < chunkIndex),
-            default=None
-        )
-        
-        if chunkIndex not in self.parent.lyricPositions:
-            if recentChunkIndex is not None and (recentChunkIndex + self.addLyricDuration) in self.parent.lyricPositions:
-                self.parent.lyricPositions[chunkIndex] = self.parent.lyricPositions[recentChunkIndex + self.addLyricDuration][:]
-            else:
-                self.parent.lyricPositions[chunkIndex] = []
-        
-        # Check if there exists a lyric at this chunk index
-        if len(self.parent.lyricPositions[chunkIndex]) > 0:
-            numMembers = 1 if isinstance(self.memberName, str) else len(self.memberNAme)
-            additionalHeight = max(
-                (self.photoY) * numMembers + self.lyricsPadding + 10, self.totalHeight + self.lyricsPadding
-            )
-            newY = additionalHeight
-        else:
-            newY = baseY
-
-        # Animate current text
-        self.animatePosition(
-            startY=-self.totalHeight,
-            endY=0,
-            startChunk=self.startChunk,
-            endChunk=self.startChunk + self.addLyricDuration
-        )
-        
-        self.animateExistingLyrics(chunkIndex, newY)
+    @property
+    def stackHeight(self):
+        """Distance the lyrics below this one move down when it comes in."""
+        numMembers = 1 if isinstance(self.memberName, str) else len(self.memberName)
+        return max(self.photoY * numMembers + self.lyricsPadding + 10, self.totalHeight + self.lyricsPadding)
         
     def animateAdLibPosition(self):
         """Animates ad-lib from bottom → mid-screen → disappear."""
@@ -134,19 +104,10 @@ class LyricBox:
     def animateAdLibLibPosition(self, startY, midY, endY, startChunk, duration):
         """Animates ad-lib from bottom → mid-screen → disappear."""
         fadeDuration = duration if duration > 0 else 10
-        
-        self.animations.append({
-            "startChunk": startChunk,
-            "endChunk": startChunk + fadeDuration,
-            "frames":{}
-        })
-        
         canvasHeight = self.canvas.winfo_height()
-        
-        for chunk in range(startChunk, startChunk + fadeDuration // 2):
-            progress = (chunk - startChunk) / (fadeDuration // 2)
-            interpolatedY = round(startY - progress * (startY - midY), 1)
-            self.animations[-1]["frames"][chunk] = max(0, min(interpolatedY, canvasHeight))
+        self.animations.add(
+            max(0, min(startY, canvasHeight)), max(0, min(midY, canvasHeight)), startChunk, startChunk + fadeDuration // 2
+        )
         
     
     def createLyricDisplay(self):
@@ -275,54 +236,4 @@ class LyricBox:
         """Hide the lyric box from the canvas."""
         for item in self.textItems:
             self.canvas.itemconfig(item, state="hidden")
-                 
-    def animatePosition(self, startY, endY, startChunk, endChunk):
-        """Precompute animation frames and store them per chunkIndex for smoother playback."""
-        duration = endChunk - startChunk
-        
-        self.animations.append({
-            "startChunk": startChunk,
-            "endChunk": endChunk,
-            "frames": {}
-        })
-        
-        canvasHeight = self.canvas.winfo_height()
-        removeFromFrame = False
-        
-        for chunk in range(startChunk, endChunk + 1):
-            if removeFromFrame:
-                # Stop storing Y positions after an overflow is detected
-                break
-                
-            progress = (chunk - startChunk) / duration           
-            
-            interpolatedY = round(startY + progress * (endY - startY), 1)
-            
-            if interpolatedY > canvasHeight:
-                removeFromFrame = True  # Flag to remove it from future frames
-            
-            # Store animation frame
-            self.animations[-1]["frames"][chunk] = interpolatedY
-            
-            if chunk not in self.parent.lyricPositions:
-                self.parent.lyricPositions[chunk] = []
-                
-            if any(entry[0] == self.startChunk for entry in self.parent.lyricPositions[chunk]):
-                    continue  # Skip adding duplicate entry
-            
-            self.parent.lyricPositions[chunk].append((self.startChunk, interpolatedY))
-              
-    def animateExistingLyrics(self, chunkIndex, newLyricY):
-        """Update animations for all existing lyrics when a new lyric is added."""
-        # Called infinitely
-        existingLyrics = list(self.parent.lyricPositions[chunkIndex])
-        for existingStartChunk, oldY in existingLyrics:
-            if existingStartChunk != self.startChunk:
-                lyricBox = self.parent.lyrics[existingStartChunk]
-                # print(f"Lyric box to change for {lyricBox.memberName}:", lyricBox.englishTrans)
-                lyricBox.animatePosition(
-                    startY=oldY,
-                    endY=oldY+newLyricY,
-                    startChunk=self.startChunk,
-                    endChunk = self.startChunk + self.addLyricDuration
-                )
\ No newline at end of file
+        self.isVisible = False
@@ -0,0 +1,139 @@
+from bisect import bisect_left, bisect_right, insort
+from itertools import chain
+
+class SortedPoints:
+    load = 64  # Target block length; a block is split in two once it holds twice this many points
+
+    def __init__(self, points=()):
+        """
+        Sorted multiset of marker chunk indices with list-like append/remove/in, stored as a list of short
+        sorted blocks plus the last point of each block. Every operation bisects the block maxima and then
+        works inside one block of at most 2 * load points, so lookups are O(log n) and inserts/removes are
+        O(log n) plus a bounded shift, instead of shifting the whole list. Splitting or dropping a block
+        shifts the block list, which is n / load entries long.
+        Duplicates are kept like the plain lists they replace.
+        """
+        points = sorted(points)
+        self.blocks = [points[i:i + self.load] for i in range(0, len(points), self.load)]
+        self.maxes = [block[-1] for block in self.blocks]
+        self.size = len(points)
+
+    def append(self, chunkIndex):
+        """Insert a point at its sorted position (after any equal ones)."""
+        if not self.blocks:
+            self.blocks.append([chunkIndex])
+            self.maxes.append(chunkIndex)
+            self.size = 1
+            return
+
+        i = min(bisect_right(self.maxes, chunkIndex), len(self.blocks) - 1)
+        block = self.blocks[i]
+        insort(block, chunkIndex)
+        self.maxes[i] = block[-1]
+        self.size += 1
+
+        if len(block) > 2 * self.load:
+            self.blocks.insert(i + 1, block[self.load:])
+            del block[self.load:]
+            self.maxes[i] = block[-1]
+            self.maxes.insert(i + 1, self.blocks[i + 1][-1])
+
+    def remove(self, chunkIndex):
+        i = bisect_left(self.maxes, chunkIndex)
+        if i < len(self.blocks):
+            block = self.blocks[i]
+            j = bisect_left(block, chunkIndex)
+            if block[j] == chunkIndex:
+                del block[j]
+                self.size -= 1
+                if block:
+                    self.maxes[i] = block[-1]
+                else:
+                    del self.blocks[i]
+                    del self.maxes[i]
+                return
+        raise ValueError(f"{chunkIndex} not in points")
+
+    def move(self, oldChunk, newChunk):
+        self.remove(oldChunk)
+        self.append(newChunk)
+
+    def clear(self):
+        self.blocks.clear()
+        self.maxes.clear()
+        self.size = 0
+
+    def _blocksFrom(self, chunkIndex):
+        """Blocks that may hold points >= chunkIndex, starting with the first such block."""
+        return self.blocks[bisect_left(self.maxes, chunkIndex):]
+
+    def between(self, firstChunk, lastChunk):
+        """Points in [firstChunk, lastChunk)."""
+        found = []
+        for block in self._blocksFrom(firstChunk):
+            if block[0] >= lastChunk:
+                break
+            found.extend(block[bisect_left(block, firstChunk):bisect_left(block, lastChunk)])
+        return found
+
+    def __contains__(self, chunkIndex):
+        i = bisect_left(self.maxes, chunkIndex)
+        if i == len(self.blocks):
+            return False
+        block = self.blocks[i]
+        return block[bisect_left(block, chunkIndex)] == chunkIndex
+
+    def __iter__(self):
+        return chain.from_iterable(self.blocks)
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, index):
+        """Point at a sorted position. Walks the blocks, so O(n / load)."""
+        if index < 0:
+            index += self.size
+        if not 0 <= index < self.size:
+            raise IndexError("SortedPoints index out of range")
+        for block in self.blocks:
+            if index < len(block):
+                return block[index]
+            index -= len(block)
+
+    def count(self, chunkIndex):
+        total = 0
+        for block in self._blocksFrom(chunkIndex):
+            if block[0] > chunkIndex:
+                break
+            total += bisect_right(block, chunkIndex) - bisect_left(block, chunkIndex)
+        return total
+# end SortedPoints
+
+class MarkerIndex:
+    def __init__(self, chunksPerSection):
+        """
+        Start and end markers keyed by chunk. Sections are not stored: a section's markers are a bisect
+        range query, so changing the zoom (chunks per section) costs nothing.
+
+        :param chunksPerSection: Chunks visible on the progress bar at once (zoomManager.currentChunksInView).
+        """
+        self.start = SortedPoints()
+        self.end = SortedPoints()
+        self.chunksPerSection = max(1, chunksPerSection)
+
+    def setChunksPerSection(self, chunksPerSection):
+        self.chunksPerSection = max(1, chunksPerSection)
+
+    def points(self, markerType):
+        return self.start if markerType == "start" else self.end
+
+    def sectionOf(self, chunkIndex):
+        return chunkIndex // self.chunksPerSection
+
+    def section(self, sectionIndex):
+        """(markerType, chunkIndex) pairs in a section, start markers first."""
+        firstChunk = sectionIndex * self.chunksPerSection
+        lastChunk = firstChunk + self.chunksPerSection
+        return [("start", chunk) for chunk in self.start.between(firstChunk, lastChunk)] + \
+               [("end", chunk) for chunk in self.end.between(firstChunk, lastChunk)]
+# end MarkerIndex
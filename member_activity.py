@@ -0,0 +1,121 @@
+import numpy as np
+
+class MemberActivityIndex:
+    def __init__(self, memberNames, numChunks, labels=None):
+        """
+        Precomputed "who is singing" lookup per chunk.
+        counts[m, c] is how many labels of member m cover chunk c (labels may overlap); MemberTimelines and
+        the compiled Scene derive everything else from it.
+
+        :param memberNames: Member names in row order. Unknown names found in labels are appended.
+        :param numChunks: Number of chunks in the song.
+        :param labels: Optional [member, startChunk, endChunk] labels (end inclusive) to build from.
+        """
+        self.memberNames = list(memberNames)
+        self.memberRows = {name: i for i, name in enumerate(self.memberNames)}
+        self.numChunks = numChunks
+        self.counts = np.zeros((len(self.memberNames), numChunks), dtype=np.int32)
+        if labels:
+            self.rebuild(labels)
+
+    def _row(self, member):
+        """Row of a member, growing the arrays for names that were not known up front."""
+        if member not in self.memberRows:
+            self.memberRows[member] = len(self.memberNames)
+            self.memberNames.append(member)
+            self.counts = np.vstack([self.counts, np.zeros((1, self.numChunks), dtype=np.int32)])
+        return self.memberRows[member]
+
+    def _clip(self, start, end):
+        return max(int(start), 0), min(int(end) + 1, self.numChunks)
+
+    def rebuild(self, labels):
+        """Rebuild from scratch with one vectorized range fill (difference array + cumulative sum)."""
+        ranges = [(self._row(member), *self._clip(start, end)) for member, start, end in labels]
+        ranges = np.array([r for r in ranges if r[1] < r[2]], dtype=np.intp).reshape(-1, 3)
+        self.counts = np.zeros((len(self.memberNames), self.numChunks), dtype=np.int32)
+
+        if len(ranges):
+            diff = np.zeros((len(self.memberNames), self.numChunks + 1), dtype=np.int32)
+            np.add.at(diff, (ranges[:, 0], ranges[:, 1]), 1)
+            np.add.at(diff, (ranges[:, 0], ranges[:, 2]), -1)
+            self.counts = np.cumsum(diff[:, :-1], axis=1, dtype=np.int32)
+
+    def addLabel(self, member, start, end):
+        start, stop = self._clip(start, end)
+        if start < stop:
+            row = self._row(member)
+            self.counts[row, start:stop] += 1
+
+    def removeLabel(self, member, start, end):
+        start, stop = self._clip(start, end)
+        if start < stop and member in self.memberRows:
+            row = self.memberRows[member]
+            self.counts[row, start:stop] = np.maximum(self.counts[row, start:stop] - 1, 0)
+
+    def moveLabel(self, oldLabel, newLabel):
+        """Apply an edited label, e.g. after a marker was nudged by one chunk."""
+        self.removeLabel(*oldLabel)
+        self.addLabel(*newLabel)
+# end MemberActivityIndex
+
+class MemberTimelines:
+    def __init__(self, activityIndex, chunkDuration):
+        """
+        Cumulative singing time of every member at every chunk, built for the whole group at once from an
+        activity index: times[m, c] is the seconds member m has sung up to and including chunk c.
+        The ranking engine and the compiled Scene (timers, progress bars) read rows of this array.
+
+        A chunk counts once per member even when several of that member's labels overlap it. The old per-label
+        builder added overlapping labels of the same member twice, so such songs get lower (correct) totals.
+
+        :param activityIndex: MemberActivityIndex the timelines are derived from.
+        :param chunkDuration: Chunk length in milliseconds.
+        """
+        self.activityIndex = activityIndex
+        self.secondsPerChunk = chunkDuration / 1000
+        self.chunkCounts = np.zeros((0, activityIndex.numChunks), dtype=np.int32)  # Active chunks so far
+        self.times = np.zeros((0, activityIndex.numChunks), dtype=np.float64)
+        self.lastActive = np.zeros(0, dtype=np.intp)
+        self.rebuild()
+
+    def rebuild(self, fromChunk=0):
+        """
+        Recompute the timelines from fromChunk on: one cumulative sum over the activity mask, continuing
+        from the stored totals at fromChunk - 1. Everything before an edited label is left as it is.
+        """
+        active = self.activityIndex.counts > 0
+        if self.times.shape != active.shape:
+            self.chunkCounts = np.zeros(active.shape, dtype=np.int32)
+            self.times = np.zeros(active.shape, dtype=np.float64)
+            fromChunk = 0
+
+        fromChunk = min(max(int(fromChunk), 0), active.shape[1])
+        counts = self.chunkCounts[:, fromChunk:]
+        np.cumsum(active[:, fromChunk:], axis=1, out=counts)
+        if fromChunk > 0:
+            counts += self.chunkCounts[:, fromChunk - 1:fromChunk]
+        np.multiply(counts, self.secondsPerChunk, out=self.times[:, fromChunk:])
+
+        # Last chunk each member sings in (0 for members without labels)
+        numChunks = active.shape[1]
+        lastActive = numChunks - 1 - np.argmax(active[:, ::-1], axis=1) if numChunks else np.zeros(len(active), dtype=np.intp)
+        self.lastActive = np.where(active.any(axis=1), lastActive, 0)
+
+    def timeline(self, member):
+        """Row view of a member's timeline. Members without a row get zeros."""
+        row = self.activityIndex.memberRows.get(member)
+        if row is None or row >= len(self.times):
+            return np.zeros(self.activityIndex.numChunks, dtype=np.float64)
+        return self.times[row]
+
+    def lastUpdateChunk(self, member):
+        row = self.activityIndex.memberRows.get(member)
+        if row is None or row >= len(self.lastActive):
+            return 0
+        return int(self.lastActive[row])
+
+    def maxTime(self):
+        """Longest total singing time in the group."""
+        return float(self.times[:, -1].max()) if self.times.size else 0.0
+# end MemberTimelines
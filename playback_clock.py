@@ -0,0 +1,100 @@
+import time
+
+class PlaybackClock:
+    def __init__(self, chunkDuration=40, audioSource=None, timeSource=time.monotonic, resyncThresholdMs=30):
+        """
+        Single source of truth for the playback position.
+        The position is interpolated from a monotonic clock between updates and only re-anchored to the
+        audio engine when they drift apart, so every consumer sees the same smooth time.
+
+        :param chunkDuration: Chunk length in milliseconds.
+        :param audioSource: Optional object with getPositionMs() and isActive() (e.g. a PlaybackEngine) to resync against.
+        :param timeSource: Callable returning seconds. Inject a fake for deterministic tests.
+        :param resyncThresholdMs: Drift from the audio position tolerated before re-anchoring.
+        """
+        self.chunkDuration = chunkDuration
+        self.audioSource = audioSource
+        self.timeSource = timeSource
+        self.resyncThresholdMs = resyncThresholdMs
+
+        self.anchorMs = 0.0
+        self.anchorTime = timeSource()
+        self.running = False
+        self.lastChunk = None
+        self.subscribers = []
+
+    def subscribe(self, callback):
+        """
+        Register callback(event, positionMs, chunkIndex).
+        Events: "play", "pause", "resume", "seek" and "tick" (the chunk changed while running).
+        """
+        if callback not in self.subscribers:
+            self.subscribers.append(callback)
+        return callback
+
+    def unsubscribe(self, callback):
+        if callback in self.subscribers:
+            self.subscribers.remove(callback)
+
+    def _notify(self, event):
+        positionMs = self.positionMs()
+        chunkIndex = self.toChunk(positionMs)
+        self.lastChunk = chunkIndex
+        for callback in list(self.subscribers):
+            callback(event, positionMs, chunkIndex)
+
+    def _anchor(self, positionMs):
+        self.anchorMs = float(max(positionMs, 0))
+        self.anchorTime = self.timeSource()
+
+    def toChunk(self, positionMs):
+        return int(positionMs // self.chunkDuration)
+
+    def positionMs(self):
+        if not self.running:
+            return self.anchorMs
+        return self.anchorMs + (self.timeSource() - self.anchorTime) * 1000.0
+
+    def chunkIndex(self):
+        return self.toChunk(self.positionMs())
+
+    def play(self, positionMs=None):
+        """Start running, optionally from a new position."""
+        self._anchor(self.positionMs() if positionMs is None else positionMs)
+        self.running = True
+        self._notify("play")
+
+    def pause(self):
+        if self.running:
+            self._anchor(self.positionMs())
+            self.running = False
+            self._notify("pause")
+
+    def resume(self):
+        if not self.running:
+            self._anchor(self.anchorMs)
+            self.running = True
+            self._notify("resume")
+
+    def seek(self, positionMs):
+        """Jump to a position, keeping the running/paused state."""
+        self._anchor(positionMs)
+        self._notify("seek")
+
+    def tick(self):
+        """
+        Advance consumers to the current position. Call regularly from the UI loop.
+        Subscribers are only notified when the chunk index changes.
+
+        :return: The current chunk index.
+        """
+        if self.running and self.audioSource is not None and self.audioSource.isActive():
+            audioMs = self.audioSource.getPositionMs()
+            if abs(audioMs - self.positionMs()) > self.resyncThresholdMs:
+                self._anchor(audioMs)
+
+        chunkIndex = self.chunkIndex()
+        if chunkIndex != self.lastChunk:
+            self._notify("tick")
+        return chunkIndex
+# end PlaybackClock
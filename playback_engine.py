@@ -0,0 +1,198 @@
+import os
+from abc import ABC, abstractmethod
+import time
+import threading
+import pygame
+from pydub import AudioSegment
+
+class PlaybackEngine(ABC):
+    """
+    Interface the app uses for audio playback. Positions are absolute song times in milliseconds.
+    """
+    @abstractmethod
+    def load(self, path):
+        """Decode a song and make it the current one, stopped at 0."""
+
+    @abstractmethod
+    def play(self, startMs=0):
+        """Start playing from startMs."""
+
+    @abstractmethod
+    def pause(self):
+        """Hold the current position until resume."""
+
+    @abstractmethod
+    def resume(self):
+        """Continue from where pause stopped."""
+
+    @abstractmethod
+    def stop(self):
+        """Stop playback; isActive becomes False."""
+
+    @abstractmethod
+    def seek(self, timeMs):
+        """Move to timeMs. Keeps playing if playing, otherwise only moves the paused position."""
+
+    @abstractmethod
+    def getPositionMs(self):
+        """Current position of the audio actually heard."""
+
+    @abstractmethod
+    def isActive(self):
+        """True while a song is playing or paused (i.e. not stopped or finished)."""
+# end PlaybackEngine
+
+class PcmPlaybackEngine(PlaybackEngine):
+    def __init__(self, frequency=44100, channels=2, blockMs=100, driver=None):
+        """
+        Plays a song from decoded PCM held in memory. Seeking only moves a sample cursor, so it costs
+        the same anywhere in the song and lands on the exact sample (no re-scan of the compressed stream).
+        Audio is fed to a reserved pygame channel in small blocks by a background pump thread.
+
+        :param frequency: Mixer sample rate.
+        :param channels: Mixer channel count.
+        :param blockMs: Length of each queued block. Smaller blocks react faster but need more pumping.
+        :param driver: SDL audio driver override, e.g. "dummy" for running without a sound device.
+        """
+        if driver:
+            os.environ["SDL_AUDIODRIVER"] = driver
+        if not pygame.mixer.get_init():
+            pygame.mixer.init(frequency=frequency, size=-16, channels=channels)
+        self.frequency, _, self.channels = pygame.mixer.get_init()
+        self.frameBytes = 2 * self.channels  # 16-bit samples
+        self.blockFrames = max(1, self.frequency * blockMs // 1000)
+
+        pygame.mixer.set_reserved(1)
+        self.channel = pygame.mixer.Channel(0)
+
+        self.pcm = None
+        self.totalFrames = 0
+        self.durationMs = 0
+
+        self.lock = threading.RLock()
+        self.playing = False
+        self.paused = False
+        self.cursorFrame = 0          # Next frame to be queued
+        self.blockStartFrame = 0      # First frame of the block currently audible
+        self.blockStartTime = 0.0     # time.monotonic() when that block started
+        self.queuedStartFrame = None  # First frame of the block waiting in the channel queue
+        self.stoppedFrame = 0         # Position reported while paused or stopped
+        self.pumpThread = None
+
+    def load(self, path):
+        """Decode the whole song once into raw PCM matching the mixer format."""
+        audio = AudioSegment.from_file(path)
+        audio = audio.set_frame_rate(self.frequency).set_channels(self.channels).set_sample_width(2)
+        with self.lock:
+            self.stop()
+            self.pcm = memoryview(audio.raw_data)
+            self.totalFrames = len(self.pcm) // self.frameBytes
+            self.durationMs = self.framesToMs(self.totalFrames)
+            self.stoppedFrame = 0
+
+    def msToFrames(self, timeMs):
+        return max(0, min(round(timeMs * self.frequency / 1000), self.totalFrames))
+
+    def framesToMs(self, frames):
+        return frames * 1000 / self.frequency
+
+    def _makeBlock(self, startFrame):
+        endFrame = min(startFrame + self.blockFrames, self.totalFrames)
+        return pygame.mixer.Sound(buffer=self.pcm[startFrame * self.frameBytes:endFrame * self.frameBytes]), endFrame
+
+    def _startAt(self, frame):
+        """(Re)start output at a frame. Only one block is built, so this is O(1) in the song length."""
+        self.channel.stop()
+        self.cursorFrame = frame
+        self.queuedStartFrame = None
+        if frame >= self.totalFrames:
+            self.playing = False
+            self.stoppedFrame = self.totalFrames
+            return
+
+        block, self.cursorFrame = self._makeBlock(frame)
+        self.channel.play(block)
+        self.blockStartFrame = frame
+        self.blockStartTime = time.monotonic()
+        self.playing = True
+        self.paused = False
+        self._queueNext()
+
+        if not self.pumpThread or not self.pumpThread.is_alive():
+            self.pumpThread = threading.Thread(target=self._pump, daemon=True)
+            self.pumpThread.start()
+
+    def _queueNext(self):
+        if self.queuedStartFrame is None and self.cursorFrame < self.totalFrames:
+            block, endFrame = self._makeBlock(self.cursorFrame)
+            self.channel.queue(block)
+            self.queuedStartFrame = self.cursorFrame
+            self.cursorFrame = endFrame
+
+    def _pump(self):
+        while True:
+            with self.lock:
+                if not self.playing:
+                    return
+                if self.queuedStartFrame is not None and self.channel.get_queue() is None:
+                    # The queued block became audible; advance the reference point by the previous block's length
+                    self.blockStartTime += (self.queuedStartFrame - self.blockStartFrame) / self.frequency
+                    self.blockStartFrame = self.queuedStartFrame
+                    self.queuedStartFrame = None
+                    self._queueNext()
+                elif self.queuedStartFrame is None and not self.channel.get_busy():
+                    # Reached the end of the song
+                    self.playing = False
+                    self.stoppedFrame = self.totalFrames
+                    return
+            time.sleep(0.005)
+
+    def _currentFrame(self):
+        if not self.playing:
+            return self.stoppedFrame
+        elapsedFrames = int((time.monotonic() - self.blockStartTime) * self.frequency)
+        blockEnd = self.queuedStartFrame if self.queuedStartFrame is not None else self.cursorFrame
+        return min(self.blockStartFrame + max(elapsedFrames, 0), blockEnd)
+
+    def play(self, startMs=0):
+        if self.pcm is None:
+            raise RuntimeError("No song loaded.")
+        with self.lock:
+            self._startAt(self.msToFrames(startMs))
+
+    def pause(self):
+        with self.lock:
+            if self.playing:
+                self.stoppedFrame = self._currentFrame()
+                self.playing = False
+                self.paused = True
+                self.channel.stop()
+
+    def resume(self):
+        with self.lock:
+            if self.paused:
+                self._startAt(self.stoppedFrame)
+
+    def stop(self):
+        with self.lock:
+            self.playing = False
+            self.paused = False
+            self.stoppedFrame = 0
+            self.channel.stop()
+
+    def seek(self, timeMs):
+        """Jump to an absolute time. Keeps playing if playing, otherwise just moves the paused position."""
+        with self.lock:
+            frame = self.msToFrames(timeMs)
+            if self.playing:
+                self._startAt(frame)
+            else:
+                self.stoppedFrame = frame
+
+    def getPositionMs(self):
+        with self.lock:
+            return self.framesToMs(self._currentFrame())
+
+    def isActive(self):
+        return self.playing or self.paused
+# end PcmPlaybackEngine
@@ -0,0 +1,29 @@
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+def prefetchMap(function, items, ahead=1, workers=1):
+    """
+    Call function(*item) for each item in a background worker process, keeping `ahead` items prepared
+    beyond the one currently being consumed. Results are yielded in order as (item, result, error).
+
+    :param function: Top-level (picklable) function.
+    :param items: Iterable of picklable argument tuples.
+    :param ahead: How many items to prepare beyond the current one.
+    :param workers: Number of worker processes.
+    """
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+        pending = deque()
+        for item in items:
+            pending.append((item, executor.submit(function, *item)))
+            if len(pending) > ahead:
+                yield _result(*pending.popleft())
+        while pending:
+            yield _result(*pending.popleft())
+
+def _result(item, future):
+    try:
+        return item, future.result(), None
+    except Exception as e:
+        return item, None, e
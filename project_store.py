@@ -0,0 +1,450 @@
+import os
+import json
+import codecs
+import sqlite3
+import threading
+
+DEFAULT_DB_PATH = "./project.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS songs (
+    id INTEGER PRIMARY KEY,
+    group_name TEXT NOT NULL,
+    title TEXT NOT NULL,
+    UNIQUE (group_name, title)
+);
+CREATE TABLE IF NOT EXISTS labels (
+    id INTEGER PRIMARY KEY,
+    song_id INTEGER NOT NULL REFERENCES songs(id) ON DELETE CASCADE,
+    member TEXT NOT NULL,
+    start_chunk INTEGER NOT NULL,
+    end_chunk INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS labels_by_song ON labels (song_id, start_chunk);
+CREATE INDEX IF NOT EXISTS labels_by_member ON labels (member, song_id, start_chunk);
+CREATE TABLE IF NOT EXISTS lyrics (
+    id INTEGER PRIMARY KEY,
+    song_id INTEGER NOT NULL REFERENCES songs(id) ON DELETE CASCADE,
+    start_chunk INTEGER NOT NULL,
+    member TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS lyrics_by_song ON lyrics (song_id, start_chunk);
+CREATE TABLE IF NOT EXISTS detections (
+    song_id INTEGER NOT NULL REFERENCES songs(id) ON DELETE CASCADE,
+    source TEXT NOT NULL,
+    chunk INTEGER NOT NULL,
+    value INTEGER NOT NULL,
+    PRIMARY KEY (song_id, source, chunk)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS song_history (
+    group_name TEXT NOT NULL,
+    title TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    PRIMARY KEY (group_name, title)
+);
+CREATE INDEX IF NOT EXISTS song_history_order ON song_history (group_name, position);
+CREATE TABLE IF NOT EXISTS sources (
+    path TEXT PRIMARY KEY,
+    stamp TEXT NOT NULL
+);
+"""
+
+class ProjectStore:
+    def __init__(self, dbPath=DEFAULT_DB_PATH, importRoot="."):
+        """
+        Embedded SQLite store for labels, lyrics, detection results and song history.
+        Writes run in transactions and reads are indexed by song, member and chunk.
+        A new database is filled from the JSON files under importRoot on first use.
+
+        The JSON files stay the on-disk format the editor and other tools write. The sources table records
+        the stamp (mtime and size) of every file the database was last synced with, and the load* helpers
+        below re-import a file whose stamp changed, so rows are never preferred over a newer file.
+
+        :param dbPath: SQLite database file.
+        :param importRoot: Project folder holding saved_labels/, audio_extraction/ and <group>/saved_songs.json.
+        """
+        self.dbPath = dbPath
+        self.lock = threading.RLock()  # One connection shared by the UI and the label writer thread
+        isNew = not os.path.exists(dbPath)
+        if os.path.dirname(dbPath):
+            os.makedirs(os.path.dirname(dbPath), exist_ok=True)
+        self.connection = sqlite3.connect(dbPath, check_same_thread=False)
+        self.connection.execute("PRAGMA foreign_keys = ON")
+        self.connection.execute("PRAGMA journal_mode = WAL")
+        self.connection.execute("PRAGMA synchronous = NORMAL")  # Each label edit is one small transaction
+        self.connection.executescript(SCHEMA)
+        if isNew and importRoot:
+            self.importJson(importRoot)
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
+
+    def songId(self, groupName, title, create=True):
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT id FROM songs WHERE group_name = ? AND title = ?", (groupName, title)
+            ).fetchone()
+            if row:
+                return row[0]
+            if not create:
+                return None
+            with self.connection:
+                return self.connection.execute(
+                    "INSERT INTO songs (group_name, title) VALUES (?, ?)", (groupName, title)
+                ).lastrowid
+
+    def listSongs(self, groupName):
+        with self.lock:
+            return [row[0] for row in self.connection.execute(
+                "SELECT title FROM songs WHERE group_name = ? ORDER BY title", (groupName,)
+            )]
+
+    # ---------------------------------------------------------------- file sync
+
+    def isSynced(self, path):
+        """True if the database holds the current contents of a JSON file."""
+        stamp = fileStamp(path)
+        with self.lock:
+            row = self.connection.execute("SELECT stamp FROM sources WHERE path = ?", (_sourceKey(path),)).fetchone()
+        return row is not None and row[0] == stamp
+
+    def markSynced(self, path):
+        """Record that the database matches a JSON file as it is now (after importing or writing it)."""
+        stamp = fileStamp(path)
+        if stamp is None:
+            return
+        with self.lock, self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO sources (path, stamp) VALUES (?, ?)", (_sourceKey(path), stamp)
+            )
+
+    # ---------------------------------------------------------------- labels
+
+    def hasLabels(self, groupName, title):
+        songId = self.songId(groupName, title, create=False)
+        if songId is None:
+            return False
+        with self.lock:
+            return self.connection.execute("SELECT 1 FROM labels WHERE song_id = ? LIMIT 1", (songId,)).fetchone() is not None
+
+    def getLabels(self, groupName, title, startChunk=None, endChunk=None, member=None):
+        """
+        [member, startChunk, endChunk] labels of a song sorted by start.
+        With startChunk/endChunk only labels overlapping that chunk range are returned.
+        """
+        songId = self.songId(groupName, title, create=False)
+        if songId is None:
+            return []
+        query = "SELECT member, start_chunk, end_chunk FROM labels WHERE song_id = ?"
+        params = [songId]
+        if member is not None:
+            query += " AND member = ?"
+            params.append(member)
+        if endChunk is not None:
+            query += " AND start_chunk <= ?"
+            params.append(endChunk)
+        if startChunk is not None:
+            query += " AND end_chunk >= ?"
+            params.append(startChunk)
+        query += " ORDER BY start_chunk, end_chunk"
+        with self.lock:
+            return [list(row) for row in self.connection.execute(query, params)]
+
+    def replaceLabels(self, groupName, title, labels):
+        """Swap a song's labels in one transaction."""
+        songId = self.songId(groupName, title)
+        with self.lock, self.connection:
+            self.connection.execute("DELETE FROM labels WHERE song_id = ?", (songId,))
+            self.connection.executemany(
+                "INSERT INTO labels (song_id, member, start_chunk, end_chunk) VALUES (?, ?, ?, ?)",
+                [(songId, member, int(start), int(end)) for member, start, end in labels]
+            )
+
+    def addLabel(self, groupName, title, label):
+        songId = self.songId(groupName, title)
+        member, start, end = label
+        with self.lock, self.connection:
+            self.connection.execute(
+                "INSERT INTO labels (song_id, member, start_chunk, end_chunk) VALUES (?, ?, ?, ?)",
+                (songId, member, int(start), int(end))
+            )
+
+    def moveLabel(self, groupName, title, oldLabel, newLabel):
+        """Move one row matching oldLabel to newLabel's start and end."""
+        songId = self.songId(groupName, title)
+        member, start, end = oldLabel
+        with self.lock, self.connection:
+            self.connection.execute(
+                f"UPDATE labels SET start_chunk = ?, end_chunk = ? WHERE id = {LABEL_ROW}",
+                (int(newLabel[1]), int(newLabel[2]), songId, member, int(start), int(end))
+            )
+
+    def removeLabel(self, groupName, title, label):
+        """Remove one row matching label (duplicates are removed one at a time, like the label list)."""
+        songId = self.songId(groupName, title)
+        member, start, end = label
+        with self.lock, self.connection:
+            self.connection.execute(f"DELETE FROM labels WHERE id = {LABEL_ROW}", (songId, member, int(start), int(end)))
+
+    def memberLines(self, groupName, member, title=None):
+        """
+        Every line of a member across the group's catalog, e.g. all of Liz's lines in one song.
+
+        :return: List of (title, startChunk, endChunk).
+        """
+        query = ("SELECT songs.title, labels.start_chunk, labels.end_chunk FROM labels "
+                 "JOIN songs ON songs.id = labels.song_id WHERE labels.member = ? AND songs.group_name = ?")
+        params = [member, groupName]
+        if title is not None:
+            query += " AND songs.title = ?"
+            params.append(title)
+        query += " ORDER BY songs.title, labels.start_chunk"
+        with self.lock:
+            return [tuple(row) for row in self.connection.execute(query, params)]
+
+    # ---------------------------------------------------------------- lyrics
+
+    def getLyrics(self, groupName, title):
+        """Lyric entries (the dicts stored in *_lyrics.json) sorted by startChunk."""
+        songId = self.songId(groupName, title, create=False)
+        if songId is None:
+            return []
+        with self.lock:
+            return [json.loads(row[0]) for row in self.connection.execute(
+                "SELECT data FROM lyrics WHERE song_id = ? ORDER BY start_chunk, id", (songId,)
+            )]
+
+    def setLyric(self, groupName, title, lyric):
+        """Store a lyric, replacing any lyric that starts on the same chunk (the editor keeps one per chunk)."""
+        songId = self.songId(groupName, title)
+        with self.lock, self.connection:
+            self.connection.execute(
+                "DELETE FROM lyrics WHERE song_id = ? AND start_chunk = ?", (songId, int(lyric["startChunk"]))
+            )
+            self._insertLyric(songId, lyric)
+
+    def replaceLyrics(self, groupName, title, lyrics):
+        songId = self.songId(groupName, title)
+        with self.lock, self.connection:
+            self.connection.execute("DELETE FROM lyrics WHERE song_id = ?", (songId,))
+            for lyric in lyrics:
+                self._insertLyric(songId, lyric)
+
+    def _insertLyric(self, songId, lyric):
+        member = lyric.get("memberName")
+        self.connection.execute(
+            "INSERT INTO lyrics (song_id, start_chunk, member, data) VALUES (?, ?, ?, ?)",
+            (songId, int(lyric["startChunk"]), member if isinstance(member, str) else json.dumps(member, ensure_ascii=False),
+             json.dumps(lyric, ensure_ascii=False))
+        )
+
+    # ---------------------------------------------------------------- detections
+
+    def getDetections(self, groupName, title, source, startChunk=0, endChunk=None):
+        """Per-chunk 0/1 detection values of a source (member name or e.g. "vocals")."""
+        songId = self.songId(groupName, title, create=False)
+        if songId is None:
+            return []
+        query = "SELECT value FROM detections WHERE song_id = ? AND source = ? AND chunk >= ?"
+        params = [songId, source, startChunk]
+        if endChunk is not None:
+            query += " AND chunk <= ?"
+            params.append(endChunk)
+        with self.lock:
+            return [row[0] for row in self.connection.execute(query + " ORDER BY chunk", params)]
+
+    def saveDetections(self, groupName, title, source, values):
+        songId = self.songId(groupName, title)
+        with self.lock, self.connection:
+            self.connection.execute("DELETE FROM detections WHERE song_id = ? AND source = ?", (songId, source))
+            self.connection.executemany(
+                "INSERT INTO detections (song_id, source, chunk, value) VALUES (?, ?, ?, ?)",
+                [(songId, source, chunk, int(value)) for chunk, value in enumerate(values)]
+            )
+
+    # ---------------------------------------------------------------- song history
+
+    def getSongHistory(self, groupName):
+        """Song titles, most recently used first."""
+        with self.lock:
+            return [row[0] for row in self.connection.execute(
+                "SELECT title FROM song_history WHERE group_name = ? ORDER BY position", (groupName,)
+            )]
+
+    def setSongHistory(self, groupName, titles):
+        with self.lock, self.connection:
+            self.connection.execute("DELETE FROM song_history WHERE group_name = ?", (groupName,))
+            self.connection.executemany(
+                "INSERT INTO song_history (group_name, title, position) VALUES (?, ?, ?)",
+                [(groupName, title, position) for position, title in enumerate(dict.fromkeys(titles))]
+            )
+
+    # ---------------------------------------------------------------- JSON import/export
+
+    def importJson(self, root="."):
+        """Load the existing JSON layout into the database (labels, lyrics, detections, song history)."""
+        labelsRoot = os.path.join(root, "saved_labels")
+        if os.path.isdir(labelsRoot):
+            for groupName in sorted(os.listdir(labelsRoot)):
+                groupDir = os.path.join(labelsRoot, groupName)
+                if not os.path.isdir(groupDir):
+                    continue
+                for fileName in sorted(os.listdir(groupDir)):
+                    path = os.path.join(groupDir, fileName)
+                    try:
+                        if fileName.endswith("_labels.json"):
+                            self.replaceLabels(groupName, fileName[:-len("_labels.json")], _readJson(path))
+                            self.markSynced(path)
+                        elif fileName.endswith("_lyrics.json"):
+                            self.replaceLyrics(groupName, fileName[:-len("_lyrics.json")], _readJson(path))
+                            self.markSynced(path)
+                    except (ValueError, KeyError, TypeError) as e:
+                        print(f"Skipping {path}: {e}")
+
+        # Song history of every group folder, whether or not the group has saved labels yet
+        for groupName in sorted(os.listdir(root or ".")):
+            historyPath = os.path.join(root, groupName, "saved_songs.json")
+            if os.path.isfile(historyPath):
+                try:
+                    self.setSongHistory(groupName, _readJson(historyPath))
+                    self.markSynced(historyPath)
+                except ValueError as e:
+                    print(f"Skipping {historyPath}: {e}")
+
+        extractionDir = os.path.join(root, "audio_extraction")
+        if os.path.isdir(extractionDir):
+            for fileName in sorted(os.listdir(extractionDir)):
+                if fileName.endswith("_vocals.json"):
+                    # These files are not grouped on disk, so they are stored under an empty group name
+                    path = os.path.join(extractionDir, fileName)
+                    try:
+                        self.saveDetections("", fileName[:-len("_vocals.json")], "vocals", _readJson(path))
+                        self.markSynced(path)
+                    except (ValueError, TypeError) as e:
+                        print(f"Skipping {path}: {e}")
+
+    def exportJson(self, root="."):
+        """Write the database back out in the JSON layout the rest of the tools read."""
+        with self.lock:
+            songs = self.connection.execute("SELECT group_name, title FROM songs ORDER BY group_name, title").fetchall()
+            groups = [row[0] for row in self.connection.execute("SELECT DISTINCT group_name FROM song_history")]
+
+        for groupName, title in songs:
+            groupDir = os.path.join(root, "saved_labels", groupName) if groupName else None
+            labels = self.getLabels(groupName, title)
+            lyrics = self.getLyrics(groupName, title)
+            if groupDir and labels:
+                self._export(os.path.join(groupDir, f"{title}_labels.json"), labels)
+            if groupDir and lyrics:
+                self._export(os.path.join(groupDir, f"{title}_lyrics.json"), lyrics)
+            vocals = self.getDetections(groupName, title, "vocals")
+            if vocals and not groupName:
+                self._export(os.path.join(root, "audio_extraction", f"{title}_vocals.json"), vocals)
+
+        for groupName in groups:
+            self._export(os.path.join(root, groupName, "saved_songs.json"), self.getSongHistory(groupName))
+
+    def _export(self, path, data):
+        _writeJson(path, data)
+        self.markSynced(path)
+# end ProjectStore
+
+LABEL_ROW = "(SELECT id FROM labels WHERE song_id = ? AND member = ? AND start_chunk = ? AND end_chunk = ? LIMIT 1)"
+
+def fileStamp(path):
+    """mtime and size of a file, or None if it does not exist."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return f"{stat.st_mtime_ns}:{stat.st_size}"
+
+def _sourceKey(path):
+    return os.path.normcase(os.path.abspath(path))
+
+def _readJson(path):
+    with codecs.open(path, "r", encoding="utf-8", errors="ignore") as file:
+        return json.load(file)
+
+def _writeJson(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tempPath = f"{path}.tmp"
+    with codecs.open(tempPath, "w", encoding="utf-8") as file:
+        json.dump(data, file, ensure_ascii=False, indent=4)
+    os.replace(tempPath, path)
+
+_stores = {}
+
+def getProjectStore(dbPath=DEFAULT_DB_PATH):
+    """Shared store per database file (one connection per process)."""
+    if dbPath not in _stores:
+        _stores[dbPath] = ProjectStore(dbPath)
+    return _stores[dbPath]
+
+def getLabelsPath(groupName, title):
+    return f"./saved_labels/{groupName}/{title}_labels.json"
+
+def getLyricsPath(groupName, title):
+    return f"./saved_labels/{groupName}/{title}_lyrics.json"
+
+def getSongHistoryPath(groupName):
+    return f"./{groupName}/saved_songs.json"
+
+def getVocalsPath(title):
+    return f"./audio_extraction/{title}_vocals.json"
+
+def loadSongLabels(groupName, title, jsonPath=None, startChunk=None, endChunk=None, member=None):
+    """
+    Labels of a song from the project store, optionally only a member's and/or those overlapping a chunk range.
+    The song's _labels.json is (re)imported first if it is new or changed since the store last saw it.
+    Edits made in an open editor are written through to the store as they happen.
+    """
+    store = getProjectStore()
+    jsonPath = jsonPath or getLabelsPath(groupName, title)
+    if os.path.exists(jsonPath) and not store.isSynced(jsonPath):
+        store.replaceLabels(groupName, title, _readJson(jsonPath))
+        store.markSynced(jsonPath)
+    return store.getLabels(groupName, title, startChunk=startChunk, endChunk=endChunk, member=member)
+
+def loadSongLyrics(groupName, title, jsonPath=None):
+    """Lyric entries of a song, re-importing its _lyrics.json if it changed since the store last saw it."""
+    store = getProjectStore()
+    jsonPath = jsonPath or getLyricsPath(groupName, title)
+    if os.path.exists(jsonPath) and not store.isSynced(jsonPath):
+        store.replaceLyrics(groupName, title, _readJson(jsonPath))
+        store.markSynced(jsonPath)
+    return store.getLyrics(groupName, title)
+
+def saveSongLyrics(groupName, title, jsonPath=None):
+    """Write a song's lyrics from the store back to its _lyrics.json so the file never goes stale."""
+    store = getProjectStore()
+    store._export(jsonPath or getLyricsPath(groupName, title), store.getLyrics(groupName, title))
+
+def loadSongHistory(groupName, jsonPath=None):
+    """Song titles of a group, most recently used first, re-importing saved_songs.json if it changed."""
+    store = getProjectStore()
+    jsonPath = jsonPath or getSongHistoryPath(groupName)
+    if os.path.exists(jsonPath) and not store.isSynced(jsonPath):
+        store.setSongHistory(groupName, _readJson(jsonPath))
+        store.markSynced(jsonPath)
+    return store.getSongHistory(groupName)
+
+def loadSongVocals(title, jsonPath=None, startChunk=0, endChunk=None):
+    """
+    Per-chunk vocal detections of a song from audio_extraction/<title>_vocals.json, re-imported whenever the
+    extraction step rewrote the file. Stored under an empty group name, since these files are not grouped on disk.
+    """
+    store = getProjectStore()
+    jsonPath = jsonPath or getVocalsPath(title)
+    if os.path.exists(jsonPath) and not store.isSynced(jsonPath):
+        store.saveDetections("", title, "vocals", _readJson(jsonPath))
+        store.markSynced(jsonPath)
+    return store.getDetections("", title, "vocals", startChunk=startChunk, endChunk=endChunk)
+
+def saveSongHistory(groupName, titles, jsonPath=None):
+    """Store a group's song history and write it to saved_songs.json."""
+    store = getProjectStore()
+    store.setSongHistory(groupName, titles)
+    store._export(jsonPath or getSongHistoryPath(groupName), store.getSongHistory(groupName))
@@ -0,0 +1,113 @@
+import numpy as np
+from keyframes import KeyframeTrack
+
+class RankingEngine:
+    def __init__(self, memberNames, baseDuration=12, idleDuration=10, stagger=2):
+        """
+        Leaderboard order of the members at every chunk and the swap animations between orders.
+        Ranks come from one sort over the cumulative time matrix. Each rank change becomes an animation
+        between slots, written straight into per-member slot arrays. Slots are layout independent, so a
+        resize only maps slots to pixels (slotsToY) and never re-runs the ranking.
+
+        :param memberNames: Members in their starting (display) order. Ties are broken by this order.
+        :param baseDuration: Chunks a swap takes when the passed member has already sung.
+        :param idleDuration: Chunks a swap takes when the passed member has not sung yet.
+        :param stagger: Extra chunks per additional member passed, and delay between passed members.
+        """
+        self.memberNames = list(memberNames)
+        self.memberRows = {name: i for i, name in enumerate(self.memberNames)}
+        self.baseDuration = baseDuration
+        self.idleDuration = idleDuration
+        self.stagger = stagger
+        self.ranks = np.zeros((len(self.memberNames), 0), dtype=np.intp)
+        self.lastChange = np.zeros((len(self.memberNames), 0), dtype=np.intp)
+        self.slots = np.zeros((len(self.memberNames), 0), dtype=np.float32)
+        self.events = [[] for _ in self.memberNames]  # Per member: (triggerChunk, startChunk, duration, targetSlot)
+
+    def computeRanks(self, times, fromChunk=0):
+        """
+        Rank of every member at every chunk from fromChunk on (0 is the top), stored in self.ranks.
+        Order is by time (descending), then by the chunk the member last sang in (who got there first stays
+        ahead), then by starting order. Ranks before fromChunk are reused as they are.
+
+        :param times: (members x chunks) cumulative singing times, rows in memberNames order.
+        """
+        numMembers, numChunks = times.shape
+        window = times[:, fromChunk:]
+        if fromChunk > 0:
+            active = np.diff(times[:, fromChunk - 1:], axis=1) > 0
+        else:
+            active = np.diff(window, axis=1, prepend=0) > 0
+        lastChange = np.where(active, np.arange(fromChunk, numChunks), -1)
+        if fromChunk > 0 and lastChange.shape[1]:
+            lastChange[:, 0] = np.maximum(lastChange[:, 0], self.lastChange[:, fromChunk - 1])
+        np.maximum.accumulate(lastChange, axis=1, out=lastChange)
+        initialOrder = np.broadcast_to(np.arange(numMembers)[:, None], window.shape)
+
+        order = np.lexsort((initialOrder, lastChange, -window), axis=0)  # order[r, c] is the member at rank r
+        np.put_along_axis(self.ranks[:, fromChunk:], order, initialOrder, axis=0)
+        self.lastChange[:, fromChunk:] = lastChange
+
+    def rebuild(self, times, fromChunk=0):
+        """
+        Recompute ranks and the animated slot positions for new timelines.
+
+        :param fromChunk: Earliest chunk whose times changed. Ranks, swap events and slots before it are kept.
+        """
+        numMembers, numChunks = times.shape
+        if self.ranks.shape != times.shape:
+            self.ranks = np.zeros(times.shape, dtype=np.intp)
+            self.lastChange = np.zeros(times.shape, dtype=np.intp)
+            self.slots = np.zeros(times.shape, dtype=np.float32)
+            fromChunk = 0
+        fromChunk = min(max(int(fromChunk), 0), numChunks)
+        self.computeRanks(times, fromChunk)
+
+        # Swaps triggered before fromChunk stay, including ones whose staggered start lies after it
+        firstTrigger = max(fromChunk, 1)
+        self.events = [[event for event in memberEvents if event[0] < firstTrigger] for memberEvents in self.events]
+        changed = np.flatnonzero((self.ranks[:, firstTrigger:] != self.ranks[:, firstTrigger - 1:-1]).any(axis=0)) + firstTrigger
+        for chunk in changed:
+            oldRanks = self.ranks[:, chunk - 1]
+            newRanks = self.ranks[:, chunk]
+            movedDown = np.flatnonzero(newRanks > oldRanks)
+            passedSang = bool((times[movedDown, chunk] > 0).any())
+            duration = self.baseDuration if passedSang else self.idleDuration
+
+            for member in np.flatnonzero(newRanks != oldRanks):
+                if newRanks[member] < oldRanks[member]:
+                    # Climbing past k members takes longer the more members are passed
+                    climbed = oldRanks[member] - newRanks[member]
+                    self.events[member].append((chunk, chunk, duration + self.stagger * (climbed - 1), newRanks[member]))
+                else:
+                    # Passed members step down one after another, nearest to the climber first
+                    delay = self.stagger * int((oldRanks[movedDown] > oldRanks[member]).sum())
+                    ownDuration = self.baseDuration if times[member, chunk] > 0 else self.idleDuration
+                    self.events[member].append((chunk, chunk + delay, ownDuration, newRanks[member]))
+
+        for member in range(numMembers):
+            self._bakeEvents(member, fromChunk)
+
+    def _bakeEvents(self, member, fromChunk):
+        """Write a member's swap animations into its slot row. A later animation takes over from wherever the earlier one had got to."""
+        track = KeyframeTrack((None, target, start, start + duration) for _, start, duration, target in self.events[member])
+        track.bake(self.slots[member], default=self.ranks[member, 0], fromChunk=fromChunk)
+
+    def slotsToY(self, slotYs, out=None, fromChunk=0):
+        """
+        Pixel positions for every member and chunk.
+
+        :param slotYs: y coordinate of each rank's slot, top slot first.
+        :param out: Optional (members x chunks) array to update in place from fromChunk on.
+        :return: (members x chunks) float array.
+        """
+        if out is None or out.shape != self.slots.shape:
+            out = np.zeros(self.slots.shape, dtype=np.float32)
+            fromChunk = 0
+        slotYs = np.asarray(slotYs, dtype=np.float32)
+        if len(slotYs) == 1:
+            out[:, fromChunk:] = slotYs[0]
+        else:
+            out[:, fromChunk:] = np.interp(self.slots[:, fromChunk:], np.arange(len(slotYs)), slotYs)
+        return out
+# end RankingEngine
@@ -0,0 +1,100 @@
+import time
+from collections import deque
+import numpy as np
+
+class RenderScheduler:
+    def __init__(self, root, clock, draw, historySize=500):
+        """
+        Keeps the live preview locked to the playback clock.
+        Ticks are timed to the clock's next chunk boundary instead of a fixed delay after the previous
+        frame, and redraw requests are coalesced into a single idle-time flush that only draws the latest
+        chunk. When drawing falls behind, the chunks in between are skipped and counted as dropped.
+
+        :param root: Tk root used for scheduling.
+        :param clock: PlaybackClock to follow.
+        :param draw: Callable(chunkIndex) that renders one frame.
+        :param historySize: Number of recent frame times kept for the stats.
+        """
+        self.root = root
+        self.clock = clock
+        self.draw = draw
+        self.tickCallback = None
+        self.tickJob = None
+        self.flushJob = None
+        self.pendingChunk = None
+        self.lastDrawnChunk = None
+        self.frameTimes = deque(maxlen=historySize)
+        self.droppedFrames = 0
+
+    def request(self, chunkIndex):
+        """Ask for a redraw. Several requests before the next idle period produce one draw."""
+        self.pendingChunk = chunkIndex
+        if self.flushJob is None:
+            self.flushJob = self.root.after_idle(self.flush)
+
+    def flush(self):
+        self.flushJob = None
+        if self.pendingChunk is None:
+            return
+        chunkIndex, self.pendingChunk = self.pendingChunk, None
+
+        if self.clock.running and self.lastDrawnChunk is not None and chunkIndex > self.lastDrawnChunk + 1:
+            self.droppedFrames += chunkIndex - self.lastDrawnChunk - 1
+
+        startTime = time.perf_counter()
+        self.draw(chunkIndex)
+        self.frameTimes.append((time.perf_counter() - startTime) * 1000)
+        self.lastDrawnChunk = chunkIndex
+
+    def start(self, tickCallback):
+        """
+        Run tickCallback on every chunk boundary of the clock until it returns False or stop() is called.
+        The callback should advance the clock (clock.tick()), which in turn requests redraws.
+        """
+        self.stop()
+        self.tickCallback = tickCallback
+        self._loop()
+
+    def stop(self):
+        if self.tickJob is not None:
+            self.root.after_cancel(self.tickJob)
+            self.tickJob = None
+        self.tickCallback = None
+
+    def isRunning(self):
+        return self.tickCallback is not None
+
+    def _loop(self):
+        self.tickJob = None
+        if self.tickCallback is None:
+            return
+        if self.tickCallback() is False:
+            self.tickCallback = None
+            return
+
+        # Wake up right at the next chunk boundary, however long this tick took
+        chunkDuration = self.clock.chunkDuration
+        delay = chunkDuration - self.clock.positionMs() % chunkDuration
+        self.tickJob = self.root.after(max(1, int(delay)), self._loop)
+
+    def stats(self):
+        """Mean and 95th percentile draw time in milliseconds, plus the dropped frame count."""
+        if not self.frameTimes:
+            return {"frames": 0, "meanMs": 0.0, "p95Ms": 0.0, "dropped": self.droppedFrames}
+        times = np.fromiter(self.frameTimes, dtype=np.float64)
+        return {
+            "frames": len(times),
+            "meanMs": float(times.mean()),
+            "p95Ms": float(np.percentile(times, 95)),
+            "dropped": self.droppedFrames
+        }
+
+    def printStats(self):
+        stats = self.stats()
+        print(f"Render: {stats['frames']} frames, mean {stats['meanMs']:.1f}ms, p95 {stats['p95Ms']:.1f}ms, {stats['dropped']} dropped")
+
+    def resetStats(self):
+        self.frameTimes.clear()
+        self.droppedFrames = 0
+        self.lastDrawnChunk = None
+# end RenderScheduler
@@ -0,0 +1,152 @@
+from collections import deque
+import numpy as np
+
+class RetainedCanvas:
+    def __init__(self, canvas, historySize=500):
+        """
+        Retained-mode layer over a tk.Canvas. It remembers the coords and options last sent for each item
+        it manages and only issues coords/itemconfig when a value really changes. Released items are hidden
+        and pooled, so the next create of the same type and tags reconfigures one of them instead of
+        allocating a new item. Every Tk call made (and every one skipped) is counted, per frame when the
+        caller brackets its drawing with beginFrame/endFrame.
+
+        Items it manages must only be moved or reconfigured through it, otherwise its copy goes stale.
+
+        :param canvas: The tk.Canvas to draw on.
+        :param historySize: Number of recent frames whose call counts are kept for the stats.
+        """
+        self.canvas = canvas
+        self.items = {}  # itemId -> {"coords": tuple or None, "options": {}, "pool": key}
+        self.pools = {}  # (itemType, tags) -> hidden item ids ready for reuse
+        self.calls = 0
+        self.skipped = 0
+        self.frameStart = None
+        self.frameCalls = deque(maxlen=historySize)
+
+    @staticmethod
+    def _poolKey(itemType, options):
+        tags = options.get("tags", ())
+        return (itemType, (tags,) if isinstance(tags, str) else tuple(tags))
+
+    def create(self, itemType, *coords, **options):
+        """
+        Create a canvas item ("line", "text", "image", ...), reusing a released one of the same type and tags.
+
+        :return: The item id.
+        """
+        pool = self.pools.get(self._poolKey(itemType, options))
+        if pool:
+            itemId = pool.pop()
+            self.coords(itemId, *coords)
+            self.itemconfig(itemId, state="normal", **options)
+            return itemId
+
+        itemId = getattr(self.canvas, f"create_{itemType}")(*coords, **options)
+        self.calls += 1
+        self.items[itemId] = {"coords": tuple(coords), "options": dict(options), "pool": self._poolKey(itemType, options)}
+        return itemId
+
+    def track(self, itemId, itemType):
+        """Manage an item created directly on the canvas. Its coords are read back on first use."""
+        self.items.setdefault(itemId, {"coords": None, "options": {}, "pool": self._poolKey(itemType, {})})
+        return itemId
+
+    def getCoords(self, itemId):
+        """Last coords of an item, asking Tk only if they are not known."""
+        item = self.items.get(itemId)
+        if item is None or item["coords"] is None:
+            coords = tuple(self.canvas.coords(itemId))
+            self.calls += 1
+            if item is not None:
+                item["coords"] = coords
+            return coords
+        return item["coords"]
+
+    def coords(self, itemId, *coords):
+        """Move an item, skipping the Tk call when it is already there."""
+        item = self.items.get(itemId)
+        if item is not None and item["coords"] == coords:
+            self.skipped += 1
+            return False
+        self.canvas.coords(itemId, *coords)
+        self.calls += 1
+        if item is not None:
+            item["coords"] = coords
+        return True
+
+    def itemconfig(self, itemId, **options):
+        """Configure an item, sending only the options whose value changed."""
+        item = self.items.get(itemId)
+        if item is None:
+            self.canvas.itemconfig(itemId, **options)
+            self.calls += 1
+            return True
+
+        known = item["options"]
+        changed = {key: value for key, value in options.items() if key not in known or known[key] != value}
+        if not changed:
+            self.skipped += 1
+            return False
+        self.canvas.itemconfig(itemId, **changed)
+        self.calls += 1
+        known.update(changed)
+        return True
+
+    def release(self, itemId):
+        """Hide an item and keep it for the next create of the same type and tags."""
+        item = self.items.get(itemId)
+        if item is None:
+            self.delete(itemId)
+            return
+        self.itemconfig(itemId, state="hidden")
+        self.pools.setdefault(item["pool"], []).append(itemId)
+
+    def delete(self, itemId):
+        """Delete an item for good."""
+        item = self.items.pop(itemId, None)
+        if item is not None:
+            pool = self.pools.get(item["pool"])
+            if pool and itemId in pool:
+                pool.remove(itemId)
+        self.canvas.delete(itemId)
+        self.calls += 1
+
+    def forget(self, itemId):
+        """Stop managing an item that was deleted directly on the canvas."""
+        self.items.pop(itemId, None)
+        for pool in self.pools.values():
+            if itemId in pool:
+                pool.remove(itemId)
+
+    # ---------------------------------------------------------------- stats
+
+    def beginFrame(self):
+        self.frameStart = self.calls
+
+    def endFrame(self):
+        if self.frameStart is not None:
+            self.frameCalls.append(self.calls - self.frameStart)
+            self.frameStart = None
+
+    def stats(self):
+        """Mean and maximum Tk calls per frame, plus the totals issued and skipped."""
+        if not self.frameCalls:
+            return {"frames": 0, "meanCalls": 0.0, "maxCalls": 0, "calls": self.calls, "skipped": self.skipped}
+        calls = np.fromiter(self.frameCalls, dtype=np.int64)
+        return {
+            "frames": len(calls),
+            "meanCalls": float(calls.mean()),
+            "maxCalls": int(calls.max()),
+            "calls": self.calls,
+            "skipped": self.skipped
+        }
+
+    def printStats(self):
+        stats = self.stats()
+        print(f"Canvas: {stats['meanCalls']:.1f} Tk calls per frame (max {stats['maxCalls']}), {stats['calls']} issued, {stats['skipped']} skipped")
+
+    def resetStats(self):
+        self.frameCalls.clear()
+        self.calls = 0
+        self.skipped = 0
+# end RetainedCanvas
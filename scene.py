@@ -0,0 +1,152 @@
+import os
+import json
+import hashlib
+import numpy as np
+
+SCENE_VERSION = 2
+STATE_KEYS = ("dark", "light", "clear")  # Member image shown for each state value
+STATE_DARK, STATE_LIGHT, STATE_CLEAR = range(3)
+
+def sceneKey(inputs):
+    """Hash of everything a compiled scene depends on (labels, lyrics, layout, canvas scale)."""
+    text = json.dumps({"version": SCENE_VERSION, **inputs}, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+def getScenePath(group, songTitle):
+    return f"./saved_labels/{group}/{songTitle}_scene.npz"
+
+class Scene:
+    def __init__(self, key, memberNames, positions, timers, progress, states, lyricStarts, lyricOffsets, lyricIds, lyricYs):
+        """
+        Everything the preview and the exporter draw, precompiled per chunk.
+        Member arrays are (members x chunks). Visible lyrics are stored CSR style: the lyrics shown at chunk c
+        are lyricIds[lyricOffsets[c]:lyricOffsets[c + 1]] (indices into lyricStarts) at the matching lyricYs.
+
+        :param key: sceneKey of the inputs the scene was compiled from, or None until it is saved.
+        :param positions: Leaderboard y of each member's image.
+        :param timers: Cumulative singing time shown by each member's timer.
+        :param progress: Timer as a fraction of the longest total time (progress bar width).
+        :param states: Index into STATE_KEYS for each member's image.
+        """
+        self.key = key
+        self.memberNames = list(memberNames)
+        self.memberRows = {name: i for i, name in enumerate(self.memberNames)}
+        self.positions = positions
+        self.timers = timers
+        self.progress = progress
+        self.states = states
+        self.lyricStarts = lyricStarts
+        self.lyricOffsets = lyricOffsets
+        self.lyricIds = lyricIds
+        self.lyricYs = lyricYs
+        self.maxTime = None  # Longest total time progress was last divided by (unknown for loaded scenes)
+
+    @property
+    def numChunks(self):
+        return self.states.shape[1]
+
+    def update(self, timelines, positions, fromChunk=0):
+        """
+        Recompute the member arrays from fromChunk on after label edits or a new layout; earlier chunks are
+        kept. States also change between either last active chunk and the old one, since the image turns
+        clear after a member's last line. Progress is redone for every chunk only when the longest total changed.
+
+        :param timelines: MemberTimelines, already rebuilt from fromChunk.
+        :param positions: (members x chunks) leaderboard y, already laid out from fromChunk.
+        """
+        numChunks = self.numChunks
+        fromChunk = max(0, min(int(fromChunk), numChunks))
+        activityIndex = timelines.activityIndex
+        self.positions[:, fromChunk:] = np.asarray(positions)[:, fromChunk:numChunks]
+        for i, name in enumerate(self.memberNames):
+            row = activityIndex.memberRows.get(name)
+            known = row is not None and row < len(timelines.times)
+            oldLast = int(np.count_nonzero(self.states[i] != STATE_CLEAR)) - 1  # Clear chunks are a suffix
+            newLast = int(timelines.lastActive[row]) if known else 0
+            start = min(fromChunk, min(oldLast, newLast) + 1)
+            if known:
+                self.timers[i, fromChunk:] = timelines.times[row, fromChunk:numChunks]
+                active = activityIndex.counts[row, start:numChunks] > 0
+            else:
+                self.timers[i, fromChunk:] = 0
+                active = np.zeros(numChunks - start, dtype=bool)
+            states = np.where(active, STATE_LIGHT, STATE_DARK).astype(np.uint8)
+            states[np.arange(start, numChunks) > newLast] = STATE_CLEAR
+            self.states[i, start:] = states
+
+        maxTime = timelines.maxTime()
+        if maxTime != self.maxTime:
+            fromChunk = 0  # Every bar is a fraction of the longest total
+            self.maxTime = maxTime
+        if maxTime > 0:
+            self.progress[:, fromChunk:] = self.timers[:, fromChunk:] / maxTime
+        else:
+            self.progress[:, fromChunk:] = 0
+
+    def setLyrics(self, lyricLayout):
+        """Replace the lyric arrays after lyrics were added or laid out again."""
+        self.lyricStarts = np.array(lyricLayout.starts, dtype=np.int32)
+        self.lyricOffsets, self.lyricIds, self.lyricYs = lyricLayout.table(self.numChunks)
+
+    def visibleLyrics(self, chunkIndex):
+        """(lyric startChunk, y) pairs shown at a chunk."""
+        if not 0 <= chunkIndex < self.numChunks:
+            return []
+        first, last = self.lyricOffsets[chunkIndex], self.lyricOffsets[chunkIndex + 1]
+        return list(zip(self.lyricStarts[self.lyricIds[first:last]].tolist(), self.lyricYs[first:last].tolist()))
+
+    def save(self, path):
+        """Write the scene as one compressed .npz next to the song's labels."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tempPath = f"{path}.tmp.npz"
+        np.savez_compressed(
+            tempPath,
+            key=np.array(self.key),
+            memberNames=np.array(self.memberNames, dtype=str),
+            positions=self.positions,
+            timers=self.timers,
+            progress=self.progress,
+            states=self.states,
+            lyricStarts=self.lyricStarts,
+            lyricOffsets=self.lyricOffsets,
+            lyricIds=self.lyricIds,
+            lyricYs=self.lyricYs
+        )
+        os.replace(tempPath, path)
+
+    @classmethod
+    def load(cls, path, key=None):
+        """Load a saved scene, or return None if it is missing, unreadable or was compiled from other inputs."""
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path) as data:
+                if key is not None and str(data["key"]) != key:
+                    return None
+                return cls(
+                    str(data["key"]), data["memberNames"].tolist(), data["positions"], data["timers"],
+                    data["progress"], data["states"], data["lyricStarts"], data["lyricOffsets"],
+                    data["lyricIds"], data["lyricYs"]
+                )
+        except Exception as e:
+            print(f"Ignoring scene cache {path}: {e}")
+            return None
+# end Scene
+
+def compileScene(memberNames, timelines, positions, lyricLayout, numChunks, key=None):
+    """
+    Build a Scene from the app's derived state. Later edits are applied with Scene.update and Scene.setLyrics.
+
+    :param memberNames: Members in display order (rows of positions).
+    :param timelines: MemberTimelines; its activity index gives who is singing.
+    :param positions: (members x chunks) leaderboard y, from the ranking engine.
+    :param lyricLayout: LyricLayout giving the lyrics visible at each chunk.
+    """
+    shape = (len(memberNames), numChunks)
+    scene = Scene(
+        key, memberNames, np.zeros(shape, dtype=np.float32), np.zeros(shape, dtype=np.float32),
+        np.zeros(shape, dtype=np.float32), np.full(shape, STATE_DARK, dtype=np.uint8), None, None, None, None
+    )
+    scene.update(timelines, positions)
+    scene.setLyrics(lyricLayout)
+    return scene
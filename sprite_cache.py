@@ -0,0 +1,37 @@
+from collections import OrderedDict
+
+class SpriteCache:
+    def __init__(self, maxSize=256):
+        """
+        Least-recently-used cache for rendered images (PIL images or Tk PhotoImages).
+        Callers keep their own reference to the sprite they are displaying, so evicting it here never
+        blanks a canvas item.
+
+        :param maxSize: Sprites kept before the least recently used one is dropped.
+        """
+        self.maxSize = maxSize
+        self.sprites = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, create):
+        """Return the sprite for key, calling create() to render it on a miss."""
+        sprite = self.sprites.get(key)
+        if sprite is not None:
+            self.sprites.move_to_end(key)
+            self.hits += 1
+            return sprite
+
+        self.misses += 1
+        sprite = create()
+        self.sprites[key] = sprite
+        if len(self.sprites) > self.maxSize:
+            self.sprites.popitem(last=False)
+        return sprite
+
+    def clear(self):
+        self.sprites.clear()
+
+    def __len__(self):
+        return len(self.sprites)
+# end SpriteCache
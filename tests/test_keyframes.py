@@ -0,0 +1,91 @@
+import random
+import numpy as np
+import pytest
+from keyframes import KeyframeTrack
+
+def randomTrack(rng, numChunks):
+    track = KeyframeTrack()
+    for _ in range(rng.randint(1, 12)):
+        startChunk = rng.randrange(numChunks)
+        startValue = None if rng.random() < 0.3 else rng.uniform(-50, 50)
+        track.add(startValue, rng.uniform(-50, 50), startChunk, startChunk + rng.randint(0, 15))
+    return track
+
+def test_latest_start_wins_when_animations_overlap():
+    track = KeyframeTrack()
+    track.add(100, 200, 5, 15)  # Added first but starts later
+    track.add(0, 10, 0, 10)
+    assert track.valueAt(4) == pytest.approx(4)
+    assert track.valueAt(5) == pytest.approx(100)
+    assert track.valueAt(10) == pytest.approx(150)
+    assert track.valueAt(30) == pytest.approx(200)
+
+def test_finished_animation_holds_its_end_value():
+    track = KeyframeTrack([(0, 10, 0, 5), (50, 60, 20, 30)])
+    assert track.valueAt(12) == pytest.approx(10)
+    assert track.valueAt(19) == pytest.approx(10)
+
+def test_same_start_applies_in_added_order():
+    track = KeyframeTrack([(0, 10, 5, 15), (100, 100, 5, 15)])
+    assert track.valueAt(5) == pytest.approx(100)
+    assert track.valueAt(15) == pytest.approx(100)
+
+def test_value_before_first_animation_is_default():
+    track = KeyframeTrack([(0, 10, 5, 15)])
+    assert track.valueAt(4) is None
+    assert track.valueAt(4, default=-1) == -1
+
+def test_none_start_continues_from_previous_value():
+    track = KeyframeTrack([(0, 10, 0, 10), (None, 0, 5, 10)])
+    assert track.valueAt(5) == pytest.approx(4)  # Where the first animation was at chunk 4
+    assert track.valueAt(7) == pytest.approx(4 * 0.6)
+    assert track.valueAt(10) == pytest.approx(0)
+
+def test_none_start_without_previous_value_jumps_to_end():
+    track = KeyframeTrack([(None, 30, 5, 10)])
+    assert track.valueAt(5) == pytest.approx(30)
+    assert track.valueAt(5, default=0) == pytest.approx(0)
+    assert track.valueAt(10, default=0) == pytest.approx(30)
+
+def test_chained_none_starts():
+    track = KeyframeTrack([(0, 100, 0, 10), (None, 0, 5, 10), (None, 50, 8, 10)])
+    middle = 40 * (1 - 2 / 5)  # Second animation (from 40 at chunk 4) at chunk 7
+    assert track.valueAt(8) == pytest.approx(middle)
+    assert track.valueAt(9) == pytest.approx(middle + (50 - middle) / 2)
+
+@pytest.mark.parametrize("seed", range(20))
+def test_bake_matches_value_at(seed):
+    rng = random.Random(seed)
+    numChunks = 80
+    track = randomTrack(rng, numChunks)
+    baked = track.bake(np.zeros(numChunks), default=0.0)
+    expected = [track.valueAt(chunk, default=0.0) for chunk in range(numChunks)]
+    np.testing.assert_allclose(baked, expected)
+
+@pytest.mark.parametrize("seed", range(20))
+def test_bake_from_chunk_matches_full_bake(seed):
+    rng = random.Random(seed)
+    numChunks = 80
+    track = randomTrack(rng, numChunks)
+    full = track.bake(np.zeros(numChunks), default=0.0)
+
+    fromChunk = rng.randrange(numChunks)
+    out = full.copy()
+    out[fromChunk:] = np.nan
+    track.bake(out, default=0.0, fromChunk=fromChunk)
+    np.testing.assert_allclose(out, full)
+
+def test_bake_from_chunk_leaves_prefix_alone():
+    track = KeyframeTrack([(0, 10, 0, 10), (20, 30, 12, 20)])
+    out = np.full(30, -1.0)
+    track.bake(out, default=0.0, fromChunk=8)
+    assert (out[:8] == -1).all()
+    np.testing.assert_allclose(out[8:], [track.valueAt(chunk) for chunk in range(8, 30)])
+
+def test_bake_from_chunk_continues_from_trusted_prefix():
+    track = KeyframeTrack([(0, 10, 0, 10), (None, 0, 5, 15)])
+    out = np.zeros(20)
+    out[4] = 40  # Continuation reads the stored value, not the track's
+    track.bake(out, fromChunk=6)
+    assert out[10] == pytest.approx(40 * 0.5)
+    assert out[5] == 0
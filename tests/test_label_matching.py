@@ -0,0 +1,69 @@
+import random
+import pytest
+from label_matching import matchLabels
+
+def referenceLabels(labels, startPoints, endPoints):
+    """The editor's original getLabels, kept as the reference for matchLabels."""
+    matchedPoints = []
+    unmatchedStartPoints = []
+
+    sortedStartPoints = sorted(startPoints)
+    sortedEndPoints = sorted(endPoints)
+
+    usedEndIndices = set()
+
+    for label in labels:
+        member, labelStart, labelEnd = label
+        if labelStart in sortedStartPoints and labelEnd in sortedEndPoints:
+            matchedPoints.append((member, labelStart, labelEnd))
+            usedEndIndices.add(sortedEndPoints.index(labelEnd))
+
+    for startPoint in sortedStartPoints:
+        if any(startPoint == labelStart for _, labelStart, _ in matchedPoints):
+            continue
+
+        closestEndIndex = None
+        for i, endPoint in enumerate(sortedEndPoints):
+            if i in usedEndIndices:
+                continue
+            if endPoint > startPoint:
+                closestEndIndex = i
+                break
+
+        if closestEndIndex is not None:
+            matchedPoints.append((None, startPoint, sortedEndPoints[closestEndIndex]))
+            usedEndIndices.add(closestEndIndex)
+        else:
+            unmatchedStartPoints.append(startPoint)
+
+    matchedPoints.sort(key=lambda x: x[1])
+    return matchedPoints, unmatchedStartPoints
+
+def randomCase(rng):
+    span = rng.choice([10, 50, 500])
+    startPoints = [rng.randrange(span) for _ in range(rng.randrange(0, 25))]
+    endPoints = [rng.randrange(span) for _ in range(rng.randrange(0, 25))]
+    labels = []
+    for _ in range(rng.randrange(0, 15)):
+        # Mostly labels that sit on existing markers, some that point at removed ones
+        start = rng.choice(startPoints) if startPoints and rng.random() < 0.8 else rng.randrange(span)
+        end = rng.choice(endPoints) if endPoints and rng.random() < 0.8 else rng.randrange(span)
+        labels.append([rng.choice(["Yeji", "Lia", "Ryujin"]), start, end])
+    return labels, startPoints, endPoints
+
+@pytest.mark.parametrize("seed", range(20))
+def test_matches_reference_on_random_markers(seed):
+    rng = random.Random(seed)
+    for _ in range(500):
+        labels, startPoints, endPoints = randomCase(rng)
+        assert matchLabels(labels, startPoints, endPoints) == referenceLabels(labels, startPoints, endPoints)
+
+def test_saved_label_keeps_member():
+    matched, unmatched = matchLabels([["Lia", 10, 20]], [10, 30], [20, 40])
+    assert matched == [("Lia", 10, 20), (None, 30, 40)]
+    assert unmatched == []
+
+def test_start_without_later_end_is_unmatched():
+    matched, unmatched = matchLabels([], [50, 5], [10])
+    assert matched == [(None, 5, 10)]
+    assert unmatched == [50]
@@ -0,0 +1,92 @@
+import math
+import random
+import numpy as np
+import pytest
+from lyric_layout import LyricLayout
+
+NUM_CHUNKS = 200
+BOTTOM = 120
+
+def randomLyric(rng):
+    return rng.randrange(NUM_CHUNKS), rng.randint(10, 30), rng.randint(20, 50)
+
+def assertLayoutsEqual(layout, expected):
+    assert layout.starts == expected.starts
+    assert layout.ends == expected.ends
+    for chunkIndex in range(NUM_CHUNKS):
+        assert layout.visibleLyrics(chunkIndex) == expected.visibleLyrics(chunkIndex)
+
+def rebuilt(lyrics, bottom):
+    layout = LyricLayout()
+    layout.rebuild(lyrics.values(), bottom=bottom)
+    return layout
+
+@pytest.mark.parametrize("seed", range(20))
+def test_incremental_add_matches_rebuild(seed):
+    rng = random.Random(seed)
+    lyrics = {}
+    for _ in range(rng.randint(0, 6)):
+        startChunk, height, shift = randomLyric(rng)
+        lyrics[startChunk] = (startChunk, height, shift)
+    layout = rebuilt(lyrics, BOTTOM)
+
+    for _ in range(10):
+        startChunk, height, shift = randomLyric(rng)
+        if lyrics and rng.random() < 0.3:
+            startChunk = rng.choice(list(lyrics))  # Replace an existing lyric
+        lyrics[startChunk] = (startChunk, height, shift)
+        layout.add(startChunk, height, shift)
+        assertLayoutsEqual(layout, rebuilt(lyrics, BOTTOM))
+
+@pytest.mark.parametrize("seed", range(10))
+def test_lyrics_added_without_a_lyrics_file_still_leave(seed):
+    # No lyrics file: rebuild is never called, so the bottom has to come from the constructor
+    rng = random.Random(seed)
+    layout = LyricLayout(bottom=BOTTOM)
+    lyrics = {}
+    for startChunk in sorted(rng.sample(range(0, NUM_CHUNKS, 5), 12)):
+        lyrics[startChunk] = (startChunk, 20, 40)
+        layout.add(startChunk, 20, 40)
+    assert math.isfinite(layout.ends[0])
+    assert max(len(layout.visibleLyrics(chunkIndex)) for chunkIndex in range(NUM_CHUNKS)) <= 5  # 4 shifts of 40 pass 120
+    assertLayoutsEqual(layout, rebuilt(lyrics, BOTTOM))
+
+def test_no_bottom_never_drops_lyrics():
+    layout = LyricLayout()
+    for startChunk in range(0, 100, 10):
+        layout.add(startChunk, 20, 40)
+    assert layout.ends == [math.inf] * 10
+    assert len(layout.visibleLyrics(NUM_CHUNKS - 1)) == 10
+
+@pytest.mark.parametrize("seed", range(10))
+def test_set_bottom_matches_rebuild(seed):
+    rng = random.Random(seed)
+    lyrics = {}
+    for _ in range(10):
+        startChunk, height, shift = randomLyric(rng)
+        lyrics[startChunk] = (startChunk, height, shift)
+    layout = rebuilt(lyrics, BOTTOM)
+
+    assert not layout.setBottom(BOTTOM)
+    assert layout.setBottom(BOTTOM * 2)
+    assertLayoutsEqual(layout, rebuilt(lyrics, BOTTOM * 2))
+    assert layout.setBottom(BOTTOM / 2)
+    assertLayoutsEqual(layout, rebuilt(lyrics, BOTTOM / 2))
+
+@pytest.mark.parametrize("seed", range(10))
+def test_table_matches_visible_lyrics(seed):
+    rng = random.Random(seed)
+    layout = LyricLayout(bottom=BOTTOM)
+    for _ in range(10):
+        layout.add(*randomLyric(rng))
+    offsets, lyricIds, ys = layout.table(NUM_CHUNKS)
+    for chunkIndex in range(NUM_CHUNKS):
+        rows = range(offsets[chunkIndex], offsets[chunkIndex + 1])
+        expected = layout.visibleLyrics(chunkIndex)
+        assert [layout.starts[lyricIds[row]] for row in rows] == [start for start, _ in expected]
+        np.testing.assert_allclose([ys[row] for row in rows], [y for _, y in expected], atol=1e-3)
+
+def test_empty_table():
+    offsets, lyricIds, ys = LyricLayout(bottom=BOTTOM).table(10)
+    assert (offsets == 0).all() and len(offsets) == 11
+    assert len(lyricIds) == len(ys) == 0
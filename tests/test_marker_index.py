@@ -0,0 +1,62 @@
+import random
+import pytest
+from marker_index import MarkerIndex, SortedPoints
+
+@pytest.mark.parametrize("load", [1, 2, 5, 64])
+@pytest.mark.parametrize("seed", range(10))
+def test_sorted_points_match_a_sorted_list(load, seed):
+    rng = random.Random(seed)
+    expected = sorted(rng.randrange(50) for _ in range(rng.randrange(30)))
+    points = SortedPoints(expected)
+    points.load = load  # Small blocks so splits and emptied blocks are exercised
+
+    for _ in range(300):
+        chunkIndex = rng.randrange(50)
+        if rng.random() < 0.55:
+            points.append(chunkIndex)
+            expected.append(chunkIndex)
+            expected.sort()
+        elif chunkIndex in expected:
+            points.remove(chunkIndex)
+            expected.remove(chunkIndex)
+        else:
+            with pytest.raises(ValueError):
+                points.remove(chunkIndex)
+
+        first, last = sorted((rng.randrange(55), rng.randrange(55)))
+        assert list(points) == expected
+        assert len(points) == len(expected)
+        assert points.between(first, last) == [point for point in expected if first <= point < last]
+        assert (chunkIndex in points) == (chunkIndex in expected)
+        assert points.count(chunkIndex) == expected.count(chunkIndex)
+        if expected:
+            index = rng.randrange(-len(expected), len(expected))
+            assert points[index] == expected[index]
+
+def test_blocks_stay_bounded():
+    points = SortedPoints()
+    points.load = 4
+    for chunkIndex in range(100):
+        points.append(chunkIndex)
+    assert all(len(block) <= 2 * points.load for block in points.blocks)
+    assert points.maxes == [block[-1] for block in points.blocks]
+
+def test_move_and_empty_block():
+    points = SortedPoints([1, 2, 3])
+    points.move(2, 10)
+    assert list(points) == [1, 3, 10]
+    for chunkIndex in (1, 3, 10):
+        points.remove(chunkIndex)
+    assert len(points) == 0 and 3 not in points and points.between(0, 100) == []
+    with pytest.raises(IndexError):
+        points[0]
+
+def test_sections_follow_chunks_per_section():
+    index = MarkerIndex(10)
+    for chunkIndex in (3, 12, 19, 25):
+        index.start.append(chunkIndex)
+    index.end.append(15)
+    assert index.section(1) == [("start", 12), ("start", 19), ("end", 15)]
+    index.setChunksPerSection(20)
+    assert index.section(0) == [("start", 3), ("start", 12), ("start", 19), ("end", 15)]
+    assert index.sectionOf(25) == 1
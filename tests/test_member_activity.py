@@ -0,0 +1,74 @@
+import random
+import numpy as np
+import pytest
+from member_activity import MemberActivityIndex, MemberTimelines
+
+MEMBERS = ["A", "B", "C"]
+NUM_CHUNKS = 100
+CHUNK_DURATION = 40
+
+def randomLabel(rng, members=MEMBERS):
+    start = rng.randrange(-5, NUM_CHUNKS)
+    return [rng.choice(members), start, start + rng.randrange(0, 25)]
+
+def naiveTimes(labels, member):
+    """Seconds sung up to and including each chunk, counting every chunk one by one."""
+    times, total = [], 0.0
+    for chunk in range(NUM_CHUNKS):
+        if any(name == member and start <= chunk <= end for name, start, end in labels):
+            total += CHUNK_DURATION / 1000
+        times.append(total)
+    return times
+
+def naiveLastActive(labels, member):
+    chunks = [chunk for chunk in range(NUM_CHUNKS) for name, start, end in labels if name == member and start <= chunk <= end]
+    return max(chunks, default=0)
+
+def assertMatchesNaive(timelines, labels):
+    for member in MEMBERS:
+        np.testing.assert_allclose(timelines.timeline(member), naiveTimes(labels, member), err_msg=member)
+        assert timelines.lastUpdateChunk(member) == naiveLastActive(labels, member)
+    expectedMax = max((naiveTimes(labels, member)[-1] for member in MEMBERS), default=0.0)
+    assert timelines.maxTime() == pytest.approx(expectedMax)
+
+@pytest.mark.parametrize("seed", range(20))
+def test_rebuild_matches_naive_count(seed):
+    rng = random.Random(seed)
+    labels = [randomLabel(rng) for _ in range(rng.randint(0, 12))]  # Overlaps included
+    activityIndex = MemberActivityIndex(MEMBERS, NUM_CHUNKS, labels)
+    assertMatchesNaive(MemberTimelines(activityIndex, CHUNK_DURATION), labels)
+
+@pytest.mark.parametrize("seed", range(20))
+def test_incremental_edits_match_naive_count(seed):
+    rng = random.Random(seed)
+    labels = [randomLabel(rng) for _ in range(5)]
+    activityIndex = MemberActivityIndex(MEMBERS, NUM_CHUNKS, labels)
+    timelines = MemberTimelines(activityIndex, CHUNK_DURATION)
+
+    for _ in range(15):
+        action = rng.choice(["add", "move", "remove"]) if labels else "add"
+        if action == "add":
+            label = randomLabel(rng)
+            labels.append(label)
+            activityIndex.addLabel(*label)
+            fromChunk = label[1]
+        elif action == "move":
+            i = rng.randrange(len(labels))
+            oldLabel, newLabel = labels[i], [labels[i][0], *randomLabel(rng)[1:]]
+            activityIndex.moveLabel(oldLabel, newLabel)
+            labels[i] = newLabel
+            fromChunk = min(oldLabel[1], newLabel[1])
+        else:
+            label = labels.pop(rng.randrange(len(labels)))
+            activityIndex.removeLabel(*label)
+            fromChunk = label[1]
+        timelines.rebuild(fromChunk)
+        assertMatchesNaive(timelines, labels)
+
+def test_unknown_member_in_labels_gets_a_row():
+    labels = [["D", 10, 19]]
+    activityIndex = MemberActivityIndex(MEMBERS, NUM_CHUNKS, labels)
+    timelines = MemberTimelines(activityIndex, CHUNK_DURATION)
+    assert timelines.timeline("D")[-1] == pytest.approx(10 * CHUNK_DURATION / 1000)
+    assert timelines.lastUpdateChunk("D") == 19
+    assert not timelines.timeline("E").any()
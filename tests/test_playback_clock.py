@@ -0,0 +1,112 @@
+import pytest
+from playback_clock import PlaybackClock
+
+class FakeTime:
+    def __init__(self, seconds=100.0):
+        self.seconds = seconds
+
+    def __call__(self):
+        return self.seconds
+
+    def advance(self, ms):
+        self.seconds += ms / 1000
+
+class FakeAudio:
+    def __init__(self, positionMs=0.0, active=True):
+        self.positionMs = positionMs
+        self.active = active
+
+    def getPositionMs(self):
+        return self.positionMs
+
+    def isActive(self):
+        return self.active
+
+@pytest.fixture
+def timeSource():
+    return FakeTime()
+
+@pytest.fixture
+def clock(timeSource):
+    return PlaybackClock(chunkDuration=40, timeSource=timeSource)
+
+def test_position_holds_until_played(clock, timeSource):
+    timeSource.advance(500)
+    assert clock.positionMs() == 0
+    assert not clock.running
+
+def test_play_from_offset_advances_with_time(clock, timeSource):
+    clock.play(1000)
+    timeSource.advance(250)
+    assert clock.positionMs() == pytest.approx(1250)
+    assert clock.chunkIndex() == 31
+
+def test_pause_and_resume_keep_offset(clock, timeSource):
+    clock.play(1000)
+    timeSource.advance(500)
+    clock.pause()
+    timeSource.advance(2000)  # Time spent paused does not count
+    assert clock.positionMs() == pytest.approx(1500)
+
+    clock.resume()
+    timeSource.advance(100)
+    assert clock.positionMs() == pytest.approx(1600)
+
+def test_seek_while_paused_stays_paused(clock, timeSource):
+    clock.seek(2040)
+    timeSource.advance(300)
+    assert clock.positionMs() == 2040
+    assert clock.chunkIndex() == 51
+    assert not clock.running
+
+def test_seek_while_running_keeps_running(clock, timeSource):
+    clock.play(0)
+    timeSource.advance(400)
+    clock.seek(5000)
+    timeSource.advance(40)
+    assert clock.running
+    assert clock.positionMs() == pytest.approx(5040)
+
+def test_seek_clamps_negative_positions(clock):
+    clock.seek(-120)
+    assert clock.positionMs() == 0
+
+def test_events_and_ticks_only_on_chunk_change(clock, timeSource):
+    events = []
+    clock.subscribe(lambda event, positionMs, chunkIndex: events.append((event, chunkIndex)))
+    clock.play(0)
+    timeSource.advance(10)
+    clock.tick()  # Still chunk 0
+    timeSource.advance(35)
+    clock.tick()
+    clock.pause()
+    clock.seek(400)
+    assert events == [("play", 0), ("tick", 1), ("pause", 1), ("seek", 10)]
+
+def test_resync_to_audio_beyond_threshold(timeSource):
+    audio = FakeAudio()
+    clock = PlaybackClock(chunkDuration=40, audioSource=audio, timeSource=timeSource, resyncThresholdMs=30)
+    clock.play(0)
+    timeSource.advance(1000)
+    audio.positionMs = 950  # 50 ms behind the clock
+    clock.tick()
+    assert clock.positionMs() == pytest.approx(950)
+    timeSource.advance(100)
+    assert clock.positionMs() == pytest.approx(1050)
+
+def test_small_drift_is_not_resynced(timeSource):
+    audio = FakeAudio()
+    clock = PlaybackClock(chunkDuration=40, audioSource=audio, timeSource=timeSource, resyncThresholdMs=30)
+    clock.play(0)
+    timeSource.advance(1000)
+    audio.positionMs = 980
+    clock.tick()
+    assert clock.positionMs() == pytest.approx(1000)
+
+def test_inactive_audio_is_ignored(timeSource):
+    audio = FakeAudio(positionMs=0, active=False)
+    clock = PlaybackClock(chunkDuration=40, audioSource=audio, timeSource=timeSource)
+    clock.play(0)
+    timeSource.advance(500)
+    clock.tick()
+    assert clock.positionMs() == pytest.approx(500)
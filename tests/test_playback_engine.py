@@ -0,0 +1,66 @@
+import wave
+import numpy as np
+import pytest
+
+pytest.importorskip("pygame")
+pytest.importorskip("pydub")
+from playback_engine import PcmPlaybackEngine
+
+CHUNK_DURATION = 40
+
+@pytest.fixture
+def engine(tmp_path):
+    """Engine on SDL's dummy driver with a 3 second stereo ramp loaded, so every frame is distinguishable."""
+    path = tmp_path / "ramp.wav"
+    frequency, seconds = 44100, 3
+    samples = (np.arange(frequency * seconds) % 32768).astype(np.int16)
+    with wave.open(str(path), "wb") as file:
+        file.setnchannels(2)
+        file.setsampwidth(2)
+        file.setframerate(frequency)
+        file.writeframes(np.repeat(samples, 2).tobytes())
+
+    engine = PcmPlaybackEngine(frequency=frequency, driver="dummy")
+    engine.load(str(path))
+    yield engine
+    engine.stop()
+
+def test_load_decodes_whole_song(engine):
+    assert engine.totalFrames == engine.frequency * 3
+    assert engine.durationMs == pytest.approx(3000)
+
+@pytest.mark.parametrize("chunkIndex", [0, 1, 17, 74])
+def test_seek_while_stopped_lands_on_chunk_boundary(engine, chunkIndex):
+    engine.seek(chunkIndex * CHUNK_DURATION)
+    assert engine.stoppedFrame == chunkIndex * CHUNK_DURATION * engine.frequency // 1000
+    assert engine.getPositionMs() == chunkIndex * CHUNK_DURATION
+
+def test_seek_rounds_to_nearest_sample(engine):
+    engine.seek(1234.567)
+    assert engine.stoppedFrame == round(1234.567 * engine.frequency / 1000)
+
+def test_seek_is_clamped_to_song(engine):
+    engine.seek(-50)
+    assert engine.getPositionMs() == 0
+    engine.seek(10_000)
+    assert engine.stoppedFrame == engine.totalFrames
+
+def test_seek_while_playing_restarts_at_exact_frame(engine):
+    engine.play(0)
+    engine.seek(1000)
+    targetFrame = engine.frequency  # 1000 ms
+    assert engine.playing
+    assert engine.blockStartFrame == targetFrame
+    # The queued audio starts with the sample at the target frame
+    first = np.frombuffer(engine.pcm[targetFrame * engine.frameBytes:(targetFrame + 1) * engine.frameBytes], dtype=np.int16)
+    assert first.tolist() == [targetFrame % 32768] * 2
+    assert engine.getPositionMs() >= 1000
+
+def test_pause_keeps_position_and_resume_continues(engine):
+    engine.play(2000)
+    engine.pause()
+    pausedMs = engine.getPositionMs()
+    assert 2000 <= pausedMs < 2500
+    assert engine.isActive() and not engine.playing
+    engine.resume()
+    assert engine.blockStartFrame == engine.msToFrames(pausedMs)
@@ -0,0 +1,130 @@
+import os
+import json
+import pytest
+import project_store
+from project_store import (
+    ProjectStore, getProjectStore, loadSongLabels, loadSongLyrics, saveSongLyrics, loadSongHistory,
+    saveSongHistory, loadSongVocals
+)
+
+LABELS = [["Yeji", 0, 10], ["Lia", 5, 20], ["Yeji", 30, 40]]
+LYRICS = [
+    {"language": "English", "memberName": ["Yeji"], "korean": "", "romanization": "", "english": "Hi", "startChunk": 0},
+    {"language": "English", "memberName": "Lia", "korean": "", "romanization": "", "english": "Yo", "startChunk": 8}
+]
+
+def writeJson(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(data, file)
+
+def touch(path, offsetNs):
+    """Give a rewritten file a distinct mtime, as a later save would have."""
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + offsetNs))
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    """A project folder with one group's JSON files, as the cwd, and a fresh store cache."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(project_store, "_stores", {})
+    writeJson("saved_labels/ITZY/Dalla Dalla_labels.json", LABELS)
+    writeJson("saved_labels/ITZY/Dalla Dalla_lyrics.json", LYRICS)
+    writeJson("ITZY/saved_songs.json", ["Dalla Dalla", "Wannabe"])
+    writeJson("IVE/saved_songs.json", ["Love Dive"])  # Group without saved labels
+    writeJson("audio_extraction/Dalla Dalla_vocals.json", [0, 1, 1, 0])
+    store = getProjectStore()
+    yield store
+    store.close()
+
+def test_new_database_imports_every_json_file(project):
+    assert project.getLabels("ITZY", "Dalla Dalla") == sorted(LABELS, key=lambda label: label[1])
+    assert project.getLyrics("ITZY", "Dalla Dalla") == LYRICS
+    assert project.getSongHistory("ITZY") == ["Dalla Dalla", "Wannabe"]
+    assert project.getSongHistory("IVE") == ["Love Dive"]
+    assert project.getDetections("", "Dalla Dalla", "vocals") == [0, 1, 1, 0]
+    for path in ("saved_labels/ITZY/Dalla Dalla_labels.json", "ITZY/saved_songs.json", "IVE/saved_songs.json",
+                 "audio_extraction/Dalla Dalla_vocals.json"):
+        assert project.isSynced(path)
+
+def test_export_round_trip(project, tmp_path):
+    exportRoot = tmp_path / "export"
+    project.exportJson(str(exportRoot))
+    copy = ProjectStore(str(tmp_path / "copy.db"), importRoot=str(exportRoot))
+    try:
+        assert copy.getLabels("ITZY", "Dalla Dalla") == project.getLabels("ITZY", "Dalla Dalla")
+        assert copy.getLyrics("ITZY", "Dalla Dalla") == LYRICS
+        assert copy.getSongHistory("IVE") == ["Love Dive"]
+        assert copy.getDetections("", "Dalla Dalla", "vocals") == [0, 1, 1, 0]
+    finally:
+        copy.close()
+
+def test_changed_file_is_stale_and_reimported(project):
+    path = "saved_labels/ITZY/Dalla Dalla_labels.json"
+    project.addLabel("ITZY", "Dalla Dalla", ["Ryujin", 50, 60])  # Editor write-through, file untouched
+    assert project.isSynced(path)
+    assert ["Ryujin", 50, 60] in loadSongLabels("ITZY", "Dalla Dalla")
+
+    writeJson(path, [["Chaeryeong", 1, 2]])
+    touch(path, 1000)
+    assert not project.isSynced(path)
+    assert loadSongLabels("ITZY", "Dalla Dalla") == [["Chaeryeong", 1, 2]]
+    assert project.isSynced(path)
+
+def test_missing_file_is_never_synced(project):
+    assert not project.isSynced("saved_labels/ITZY/Missing_labels.json")
+    project.markSynced("saved_labels/ITZY/Missing_labels.json")
+    assert not project.isSynced("saved_labels/ITZY/Missing_labels.json")
+
+def test_label_filters(project):
+    assert loadSongLabels("ITZY", "Dalla Dalla", member="Yeji") == [["Yeji", 0, 10], ["Yeji", 30, 40]]
+    assert loadSongLabels("ITZY", "Dalla Dalla", startChunk=11, endChunk=29) == [["Lia", 5, 20]]
+
+def test_move_and_remove_touch_one_duplicate(project):
+    project.replaceLabels("ITZY", "Wannabe", [["Lia", 0, 5], ["Lia", 0, 5]])
+    project.moveLabel("ITZY", "Wannabe", ["Lia", 0, 5], ["Lia", 2, 9])
+    assert project.getLabels("ITZY", "Wannabe") == [["Lia", 0, 5], ["Lia", 2, 9]]
+
+    project.addLabel("ITZY", "Wannabe", ["Lia", 0, 5])
+    project.removeLabel("ITZY", "Wannabe", ["Lia", 0, 5])
+    assert project.getLabels("ITZY", "Wannabe") == [["Lia", 0, 5], ["Lia", 2, 9]]
+
+    project.removeLabel("ITZY", "Wannabe", ["Yuna", 0, 5])  # No match: nothing removed
+    assert len(project.getLabels("ITZY", "Wannabe")) == 2
+
+def test_set_lyric_replaces_the_lyric_at_its_chunk(project):
+    replacement = {**LYRICS[1], "english": "Changed"}
+    project.setLyric("ITZY", "Dalla Dalla", replacement)
+    project.setLyric("ITZY", "Dalla Dalla", {**LYRICS[0], "startChunk": 20})
+    assert [lyric["startChunk"] for lyric in project.getLyrics("ITZY", "Dalla Dalla")] == [0, 8, 20]
+    assert project.getLyrics("ITZY", "Dalla Dalla")[1]["english"] == "Changed"
+
+    saveSongLyrics("ITZY", "Dalla Dalla")
+    assert project.isSynced("saved_labels/ITZY/Dalla Dalla_lyrics.json")
+    assert loadSongLyrics("ITZY", "Dalla Dalla") == project.getLyrics("ITZY", "Dalla Dalla")
+
+def test_member_lines_across_the_catalog(project):
+    project.replaceLabels("ITZY", "Wannabe", [["Yeji", 3, 4], ["Lia", 6, 7]])
+    assert project.memberLines("ITZY", "Yeji") == [("Dalla Dalla", 0, 10), ("Dalla Dalla", 30, 40), ("Wannabe", 3, 4)]
+    assert project.memberLines("ITZY", "Yeji", title="Wannabe") == [("Wannabe", 3, 4)]
+    assert project.memberLines("IVE", "Yeji") == []
+
+def test_song_history_writes_the_json_file(project):
+    saveSongHistory("ITZY", ["Wannabe", "Dalla Dalla", "Wannabe"])
+    with open("ITZY/saved_songs.json", encoding="utf-8") as file:
+        assert json.load(file) == ["Wannabe", "Dalla Dalla"]
+    assert project.isSynced("ITZY/saved_songs.json")
+
+    writeJson("ITZY/saved_songs.json", ["Icy"])
+    touch("ITZY/saved_songs.json", 1000)
+    assert loadSongHistory("ITZY") == ["Icy"]
+
+def test_vocals_written_after_first_launch_are_picked_up(project):
+    assert loadSongVocals("Wannabe") == []
+    writeJson("audio_extraction/Wannabe_vocals.json", [1, 0, 1])
+    assert loadSongVocals("Wannabe") == [1, 0, 1]
+    assert loadSongVocals("Wannabe", startChunk=1, endChunk=1) == [0]
+
+    writeJson("audio_extraction/Wannabe_vocals.json", [1, 1, 1, 1])
+    touch("audio_extraction/Wannabe_vocals.json", 1000)
+    assert loadSongVocals("Wannabe") == [1, 1, 1, 1]
@@ -0,0 +1,63 @@
+import random
+import numpy as np
+import pytest
+from lyric_layout import LyricLayout
+from member_activity import MemberActivityIndex, MemberTimelines
+from scene import compileScene
+
+MEMBERS = ["A", "B", "C"]
+NUM_CHUNKS = 120
+
+def randomLabel(rng):
+    start = rng.randrange(NUM_CHUNKS - 1)
+    return [rng.choice(MEMBERS), start, rng.randrange(start, min(start + 30, NUM_CHUNKS))]
+
+def assertScenesEqual(scene, expected):
+    for name in ("positions", "timers", "progress", "states"):
+        np.testing.assert_allclose(getattr(scene, name), getattr(expected, name), err_msg=name)
+
+@pytest.mark.parametrize("seed", range(20))
+def test_update_after_edits_matches_full_compile(seed):
+    rng = random.Random(seed)
+    labels = [randomLabel(rng) for _ in range(rng.randint(0, 8))]
+    activityIndex = MemberActivityIndex(MEMBERS, NUM_CHUNKS, labels)
+    timelines = MemberTimelines(activityIndex, 40)
+    positions = np.zeros((len(MEMBERS), NUM_CHUNKS))
+    scene = compileScene(MEMBERS, timelines, positions, LyricLayout(), NUM_CHUNKS)
+
+    for _ in range(10):
+        action = rng.choice(["add", "move", "remove"]) if labels else "add"
+        if action == "add":
+            label = randomLabel(rng)
+            labels.append(label)
+            activityIndex.addLabel(*label)
+            fromChunk = label[1]
+        elif action == "move":
+            oldLabel = rng.choice(labels)
+            newLabel = [oldLabel[0], *sorted(randomLabel(rng)[1:])]
+            activityIndex.moveLabel(list(oldLabel), newLabel)
+            fromChunk = min(oldLabel[1], newLabel[1])
+            oldLabel[:] = newLabel
+        else:
+            label = labels.pop(rng.randrange(len(labels)))
+            activityIndex.removeLabel(*label)
+            fromChunk = label[1]
+        timelines.rebuild(fromChunk)
+        positions[:, fromChunk:] = rng.random()
+        scene.update(timelines, positions, fromChunk)
+
+        assertScenesEqual(scene, compileScene(MEMBERS, timelines, positions, LyricLayout(), NUM_CHUNKS))
+
+def test_set_lyrics_matches_full_compile():
+    activityIndex = MemberActivityIndex(MEMBERS, NUM_CHUNKS)
+    timelines = MemberTimelines(activityIndex, 40)
+    positions = np.zeros((len(MEMBERS), NUM_CHUNKS))
+    layout = LyricLayout()
+    scene = compileScene(MEMBERS, timelines, positions, layout, NUM_CHUNKS)
+
+    for startChunk in (10, 40, 25):
+        layout.add(startChunk, 30, 40)
+    scene.setLyrics(layout)
+    expected = compileScene(MEMBERS, timelines, positions, layout, NUM_CHUNKS)
+    for chunkIndex in range(NUM_CHUNKS):
+        assert scene.visibleLyrics(chunkIndex) == expected.visibleLyrics(chunkIndex)
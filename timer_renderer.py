@@ -0,0 +1,70 @@
+from PIL import Image, ImageDraw, ImageFont, ImageTk
+from matplotlib import font_manager
+from sprite_cache import SpriteCache
+
+TIMER_GLYPHS = "0123456789."
+
+def findFontPath(family):
+    """Path of an installed font family, or None if only a substitute would be found."""
+    try:
+        return font_manager.findfont(font_manager.FontProperties(family=family), fallback_to_default=False)
+    except Exception:
+        return None
+
+class TimerRenderer:
+    def __init__(self, canvas, family="Digital-7", size=25, color="white"):
+        """
+        Timer text drawn from a glyph atlas: each digit and the decimal point are rendered once with PIL,
+        and every distinct timer value is composed from them into one cached PhotoImage. A member's timer is
+        then a single canvas image item whose image is swapped only when the shown value changes.
+        When the font file cannot be located, canvas text items are used instead (see available).
+
+        :param canvas: Canvas the timers are drawn on (used for point-to-pixel conversion).
+        :param family: Font family, as used for the Tk font.
+        :param size: Font size in points, as for the Tk font.
+        """
+        self.canvas = canvas
+        self.family = family
+        self.size = size
+        self.color = color
+        self.fontPath = findFontPath(family)
+        self.glyphs = {}
+        self.values = SpriteCache(maxSize=2048)  # Timer text -> PhotoImage
+        if self.fontPath:
+            self.buildAtlas()
+        else:
+            print(f"Font '{family}' not found, timers fall back to canvas text.")
+
+    @property
+    def available(self):
+        return bool(self.glyphs)
+
+    def buildAtlas(self):
+        """Render every glyph the timer can show at the font's pixel size."""
+        pixelSize = max(1, round(self.size * self.canvas.winfo_fpixels("1p")))
+        font = ImageFont.truetype(self.fontPath, pixelSize)
+        ascent, descent = font.getmetrics()
+        self.glyphHeight = ascent + descent
+        self.glyphs = {}
+        for glyph in TIMER_GLYPHS:
+            width = max(1, round(font.getlength(glyph)))
+            image = Image.new("RGBA", (width, self.glyphHeight), (0, 0, 0, 0))
+            ImageDraw.Draw(image).text((0, 0), glyph, font=font, fill=self.color)
+            self.glyphs[glyph] = image
+        self.values.clear()
+
+    def image(self, text):
+        """PhotoImage for a timer text, composed from the atlas on first use. None for empty text."""
+        if not text or not self.available:
+            return None
+        return self.values.get(text, lambda: ImageTk.PhotoImage(self._compose(text)))
+
+    def _compose(self, text):
+        glyphs = [self.glyphs[glyph] for glyph in text if glyph in self.glyphs]
+        image = Image.new("RGBA", (max(1, sum(glyph.width for glyph in glyphs)), self.glyphHeight), (0, 0, 0, 0))
+        x = 0
+        for glyph in glyphs:
+            image.paste(glyph, (x, 0), glyph)
+            x += glyph.width
+        return image
+# end TimerRenderer
@@ -1,16 +1,20 @@
 from InquirerPy import prompt
 import os
 import sys
-import json
 from audio_tester import loadMemberImages, loadModel, VoiceDetectionApp
 import tkinter as tk
 from voice_training import voiceTrainingMain
 import tensorflow as tf
 from audio_processing import ( 
-    combineMemberVocals, convertToWav, extractAudioFeatures, buildPerceptronModel, segmentAndSaveAudio
+    combineMemberVocals, extractAudioFeatures, buildPerceptronModel, prepareWav, prepareSong
 )
+from prefetch import prefetchMap
 import numpy as np
 from VoiceTrainer import RLSSingerRecogAgent
+from feature_scaler import RunningScaler, getScalerPath
+from augmentation import AugmentedBatchStream, DEFAULT_SEED
+from cross_validation import runCrossValidation
+from project_store import getProjectStore, loadSongLabels, loadSongHistory, saveSongHistory
 
 groups = {
     "IVE": [{'name': 'Gaeul', 'color': '#0000ff'}, {'name': 'Yujin', 'color': '#ff00ff'}, {'name': 'Rei', 'color': '#65bd2b'}, {'name': 'Wonyoung', 'color': '#ff0000'}, {'name': 'Liz', 'color': '#00c3f5'}, {'name': 'Leeseo', 'color': '#aa9f00'}],
@@ -21,7 +25,7 @@ def chooseAction():
     actionQuestion = {
         "type": "list",
         "message": "Do you want to TRAIN or TEST a model?",
-        "choices": ["Train", "Test", "Extract Song"],
+        "choices": ["Train", "Test", "Extract Song", "Cross-Validate", "Export Project JSON"],
         "name": "actionChoice"
     }
     actionAnswer = prompt(actionQuestion)
@@ -68,23 +72,12 @@ def chooseGroupAndMember():
 
 def updateSongHistory(selectedGroup, selectedSong):
     """
-    Updates the song history JSON file to move the most recently selected song to the top.
-    Creates the file if it does not exist.
+    Updates the song history (project store and saved_songs.json) to move the most recently selected song to the top.
     
     :param selectedGroup: Name of the Kpop group.
     :param selectedSong: Name of the selected song without file extension.
     """
-    jsonFilePath = f"./{selectedGroup}/saved_songs.json"
-    
-    os.makedirs(os.path.dirname(jsonFilePath), exist_ok=True)
-    if os.path.exists(jsonFilePath):
-        with open(jsonFilePath, "r", encoding="utf-8") as file:
-            try:
-                songHistory = json.load(file)
-            except json.JSONDecodeError:
-                songHistory = []
-    else:
-        songHistory = []
+    songHistory = loadSongHistory(selectedGroup)
         
     songDir = f"./training_data/{selectedGroup}"
     allSongs = [f.replace(".mp3", "") for f in os.listdir(songDir) if f.endswith(".mp3") and "_vocals" not in f]
@@ -98,24 +91,14 @@ def updateSongHistory(selectedGroup, selectedSong):
     
     # Add the selected song at the top
     songHistory.insert(0, selectedSong)
-    
-    with open(jsonFilePath, "w", encoding="utf-8") as file:
-        json.dump(songHistory, file, indent=4, ensure_ascii=False)
+    saveSongHistory(selectedGroup, songHistory)
 
 def chooseTestSong(groupName):
     songDir = f"./training_data/{groupName}"
-    savedSongsFile = f"./{groupName}/saved_songs.json"
     allSongs = [f.replace(".mp3", "") for f in os.listdir(songDir) if f.endswith(".mp3") and "_vocals" not in f]
     
-    # Initialize savedSongs from JSON if available, else store allSongs
-    if os.path.exists(savedSongsFile):
-        with open(savedSongsFile, "r", encoding="utf-8") as file:
-            try:
-                savedSongs = json.load(file)
-            except json.JSONDecodeError:
-                savedSongs = []
-    else:
-        savedSongs = []
+    # Song history is kept in the project store and written back to <group>/saved_songs.json
+    savedSongs = loadSongHistory(groupName)
         
     if not savedSongs:
         savedSongs = allSongs
@@ -125,9 +108,7 @@ def chooseTestSong(groupName):
             if song not in savedSongs:
                 savedSongs.append(song)  # Append new songs to the end
 
-    # Save the updated list back to JSON
-    with open(savedSongsFile, "w", encoding="utf-8") as file:
-        json.dump(savedSongs, file, indent=4, ensure_ascii=False)
+    saveSongHistory(groupName, savedSongs)
         
     if not savedSongs:
         print("No songs available for testing.")
@@ -159,21 +140,9 @@ def chooseTestSong(groupName):
     return songPath, vocalsOnlyPath
 # End chooseTestSong
 
-def loadLabels(jsonPath):
-    """Load labeled data and dynamically check if a chunk is within a singer's range"""
-    with open(jsonPath, "r") as file:
-        labels = json.load(file)
-
-    # ✅ Store singers in a list of (startChunk, endChunk)
-    chunkRanges = []
-    for entry in labels:
-        singer, start, end = entry
-        chunkRanges.append((singer, start, end))
-
-    return chunkRanges 
-
-def prepareTrainingData(selectedGroup, selectedMember):
-    """Train and save a TensorFlow model for a specific member"""
+def prepareTrainingData(selectedGroup, selectedMember, augment=True, seed=DEFAULT_SEED):
+    """Train and save a TensorFlow model for a specific member.
+    With augment=True, batches are augmented on the fly in background workers (reproducible for a given seed)."""
     mp3Path = f"./training_data/{selectedGroup}/{selectedMember}_training_vocals.mp3"
     wavPath = f"./training_data/{selectedGroup}/{selectedMember}_training_vocals.wav"
     saveDir = f"./{selectedGroup}/{selectedMember}/train/data"
@@ -184,40 +153,67 @@ def prepareTrainingData(selectedGroup, selectedMember):
         print(f"Training audio not found for {selectedMember}.")
         return None
     
-    # Convert mp3 to wav
-    convertToWav(mp3Path, wavPath)
-    
-    # Extract features from WAV file
-    features = segmentAndSaveAudio(wavPath, savePath, segmentDuration=200)
+    # Normalization stats are accumulated from the extracted features and reused across retrains
+    scalerPath = getScalerPath(saveDir, selectedMember)
+    scaler = RunningScaler.loadOrCreate(scalerPath)
     
-    print(f"Features extracted from {selectedMember}_training_vocals.wav")
-    
-    negativeFeatures = []
+    # The member's vocals first, then every other member's as negatives
+    featureJobs = [(mp3Path, wavPath, savePath)]
     for otherMember in [m["name"] for m in groups[selectedGroup] if m["name"] != selectedMember]:
         otherPath = f"./training_data/{selectedGroup}/{otherMember}_training_vocals.mp3"
         otherWavPath = f"./training_data/{selectedGroup}/{otherMember}_training_vocals.wav"
         otherSaveDir = f"./{selectedGroup}/{otherMember}/train/data"
         os.makedirs(otherSaveDir, exist_ok=True)
-        otherSavePath = f"{otherSaveDir}/{otherMember}_chunks.npy"
         if os.path.exists(otherPath):
-            convertToWav(otherPath, otherWavPath)
-            negFeatures = segmentAndSaveAudio(otherWavPath, otherSavePath, segmentDuration=200)
-            negativeFeatures.append(negFeatures)
-            print(f"Negative features extracted from {otherMember}")
+            featureJobs.append((otherPath, otherWavPath, f"{otherSaveDir}/{otherMember}_chunks.npy"))
+    
+    # Each member's vocals are decoded and featurized (both cached) in the background while the previous
+    # member's features are folded into the scaler
+    features = None
+    negativeFeatures = []
+    for (songPath, _, _), prepared, error in prefetchMap(prepareSong, featureJobs):
+        songName = os.path.basename(songPath)
+        if error is not None:
+            print(f"Failed to extract features from {songName}: {error}")
+            if features is None:
+                return None
+            continue
+        
+        _, featuresPath = prepared
+        scaler.updateFromFile(featuresPath)
+        if features is None:
+            features = np.load(featuresPath)
+            print(f"Features extracted from {songName}")
+        else:
+            negativeFeatures.append(np.load(featuresPath))
+            print(f"Negative features extracted from {songName}")
             
+    scaler.save(scalerPath)
+    print(f"Normalization stats saved at: {scalerPath}")
+    
     X_train = np.vstack((features, *negativeFeatures))  # Combine features
     y_train = np.array([ [1, 0] ] * len(features) + [ [0, 1] ] * sum(len(n) for n in negativeFeatures))
     
-    indices = np.arange(len(X_train))
-    np.random.shuffle(indices)
-    X_train, y_train = X_train[indices], y_train[indices]
-    
     # Build perceptron model
     model = buildPerceptronModel(features.shape[1:], numMembers=2)
     print(f"Model for {selectedMember} created!")
     
     # Train the model
-    model.fit(X_train, y_train, epochs=50, batch_size=32)
+    epochs = 50
+    if augment:
+        # Member segments get other members' segments mixed in underneath; negatives are never relabeled
+        isPositive = np.arange(len(X_train)) < len(features)
+        stream = AugmentedBatchStream(
+            X_train, y_train, batchSize=32, seed=seed,
+            mixSources=np.flatnonzero(~isPositive), mixTargets=isPositive, scaler=scaler
+        )
+        model.fit(stream.batches(epochs), steps_per_epoch=len(stream), epochs=epochs)
+    else:
+        X_train = scaler.transform(X_train)  # Normalize features
+        indices = np.arange(len(X_train))
+        np.random.default_rng(seed).shuffle(indices)
+        X_train, y_train = X_train[indices], y_train[indices]
+        model.fit(X_train, y_train, epochs=epochs, batch_size=32)
     
     #model.fit(X_train, y_train, epochs=10, batch_size=32)
     
@@ -249,20 +245,29 @@ def trainRLAgent(selectedGroup, selectedMember, modelPath):
     # Initialize RL agent
     agent = RLSSingerRecogAgent([selectedMember], modelPath, rlModelPath, metricsPath)
     
+    songJobs = []
     for labelFile in labelFiles:
         songName = labelFile.replace("_labels.json", "")
-        print(f"Training {selectedMember} with {songName}")
-        jsonPath = os.path.join(labelsDir, labelFile)
-        labels = loadLabels(jsonPath)
-        # print("Labels:", labels)
-
         songPath = f"./training_data/{selectedGroup}/{songName}_vocals.mp3"
-        wavPath = f"./training_data/{selectedGroup}/{songName}_vocals.wav"
-        convertToWav(songPath, wavPath)
-        if not os.path.exists(wavPath):
+        if not os.path.exists(songPath):
             print(f"Skipping {songName} (missing vocals file).")
             continue
         
+        wavPath = f"./training_data/{selectedGroup}/{songName}_vocals.wav"
+        songJobs.append((songPath, wavPath))
+    
+    # Song N+1 is decoded in the background (and cached across runs) while the agent trains on song N.
+    # The agent extracts its own features from the WAV, so only the decode is prefetched.
+    for (songPath, _), wavPath, error in prefetchMap(prepareWav, songJobs):
+        songName = os.path.basename(songPath).replace("_vocals.mp3", "")
+        if error is not None:
+            print(f"Skipping {songName} (failed to prepare vocals: {error}).")
+            continue
+        
+        print(f"Training {selectedMember} with {songName}")
+        labels = loadSongLabels(selectedGroup, songName, os.path.join(labelsDir, f"{songName}_labels.json"))
+        # print("Labels:", labels)
+        
         # Train RL agent
         agent.trainAgent(labels, wavPath, songName)
 
@@ -297,16 +302,15 @@ def main():
 
                             def onClose():
                                 if tk.messagebox.askyesno("Exit", "Do you want to stop the application?"):
-                                    if hasattr(app, "videoTrackItem") and app.videoTrackItem:
-                                        app.videoTrackItem.pause()
-                                        app.videoTrackItem.stop()  
+                                    if app:
+                                        app.close()  # Writes pending label edits and stops video
                                     continueApp[0] = False
                                     root.destroy()
                                     sys.exit()
                                 else:
                                     if tk.messagebox.askyesno("Switch Member/Group", "Do you want to switch to a different member or group?"):
-                                        if hasattr(app, "videoTrackItem") and app.videoTrackItem:
-                                            app.videoTrackItem.stop()  
+                                        if app:
+                                            app.close()
                                         continueApp[0] = False
                                         root.destroy()
                                     
@@ -399,6 +403,34 @@ def main():
                 
                 combineMemberVocals(groupJSONFiles, vocalsOnly, selectedGroup)
                 break
+        elif action == "Cross-Validate":
+            groupAnswer = prompt({
+                "type": "list",
+                "message": "Choose a Kpop group to cross-validate:",
+                "choices": list(groups.keys()) + ["Back"],
+                "name": "groupChoice"
+            })
+            selectedGroup = groupAnswer['groupChoice']
+            
+            if selectedGroup != "Back":
+                foldsAnswer = prompt({
+                    "type": "input",
+                    "message": "Number of folds:",
+                    "default": "5",
+                    "name": "folds"
+                })
+                folds = foldsAnswer['folds'].strip()
+                if not folds.isdigit() or int(folds) < 2:
+                    tk.messagebox.showerror("Cross-Validate", f"Number of folds must be a whole number of at least 2, got '{folds}'.")
+                    continue
+                try:
+                    runCrossValidation(selectedGroup, [m["name"] for m in groups[selectedGroup]], k=int(folds))
+                except ValueError as e:
+                    tk.messagebox.showerror("Cross-Validate", str(e))
+        elif action == "Export Project JSON":
+            # Write labels, lyrics, detections and song history back out in the JSON layout
+            getProjectStore().exportJson(".")
+            print("Project exported to JSON.")
         # end while
 #end main
 
@@ -3,12 +3,13 @@ import librosa
 import numpy as np
 import soundfile as sf
 from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import StandardScaler
 from tensorflow.keras.models import Sequential
 from tensorflow.keras.models import load_model
 from tensorflow.keras.callbacks import ModelCheckpoint
 from tensorflow.keras.layers import Conv2D, MaxPooling2D, Flatten, Dense
 from tensorflow.keras.utils import to_categorical
+from feature_scaler import RunningScaler, getScalerPath
+from augmentation import AugmentedBatchStream, SUMMARY_LAYOUT, DEFAULT_SEED
 
 def extractFeatures(filePath):
     try:
@@ -32,7 +33,7 @@ def extractFeatures(filePath):
 # End extractFeatures
 
 # Process all audio files in selected directory
-def loadTrainingData(vocalsPath):
+def loadTrainingData(vocalsPath, scaler=None):
     featuresList = []
     
     for fileName in os.listdir(vocalsPath):
@@ -44,20 +45,26 @@ def loadTrainingData(vocalsPath):
             #If successfully extracted, append
             if features is not None:
                 featuresList.append(features)
+                if scaler is not None:
+                    scaler.update(features[np.newaxis, :], source=filePath)
     # end for
     return np.array(featuresList)
 # End loadTrainingData
 
 # Function to prepare data using features extracted from 'loadTrainingData'
-def prepareDataForSinger(features):
+def prepareDataForSinger(features, scaler=None, normalizeTrain=True):
     labels = np.ones((features.shape[0], 1))
     
     #Split into ttraining and testing sets 
     xTrain, xTest, yTrain, yTest = train_test_split(features, labels, test_size=0.2, random_state=42)
     
-    #Normalize features
-    scaler = StandardScaler()
-    xTrainScaled = scaler.fit_transform(xTrain)
+    #Normalize features with the persisted running statistics (fit on the training split if none were streamed)
+    if scaler is None:
+        scaler = RunningScaler()
+    if scaler.count == 0:
+        scaler.update(xTrain)
+    # Augmented training keeps the raw training split and normalizes each batch after augmentation
+    xTrainScaled = scaler.transform(xTrain) if normalizeTrain else xTrain
     xTestScaled = scaler.transform(xTest)
     
     return xTrainScaled, xTestScaled, yTrain, yTest
@@ -110,7 +117,11 @@ def loadAndDisplaySavedData(dataPath, selectedMember):
     return False
 # end loadAndDisplaySavedData
 
-def voiceTrainingMain(vocalsPath, selectedMember):
+def toConvInput(x):
+    """Add width and channel dimensions to match the input shape required by Conv2D"""
+    return np.expand_dims(x, axis=(-2, -1))
+
+def voiceTrainingMain(vocalsPath, selectedMember, augment=True, seed=DEFAULT_SEED):
     
     if os.path.exists(vocalsPath):
         dataPath = os.path.join(os.path.dirname(vocalsPath), "data")
@@ -119,23 +130,28 @@ def voiceTrainingMain(vocalsPath, selectedMember):
             print(f"Training data for {selectedMember} already exists. Displaying results.")
         else:   
             print(f"Extracting features from directory: {vocalsPath}")
-            features = loadTrainingData(vocalsPath)
+            scalerPath = getScalerPath(dataPath, selectedMember)
+            scaler = RunningScaler.loadOrCreate(scalerPath)
+            features = loadTrainingData(vocalsPath, scaler)
             print(f"Feature extraction complete. Extracted features shape: {features.shape}")
             
-            xTrain, xTest, yTrain, yTest = prepareDataForSinger(features)
+            xTrain, xTest, yTrain, yTest = prepareDataForSinger(features, scaler, normalizeTrain=not augment)
+            scaler.save(scalerPath)
 
             # Reshape the data to match the input shape required by Conv2D
-            xTrain = np.expand_dims(xTrain, axis=-1)  # Add a dimension for width (1)
-            xTrain = np.expand_dims(xTrain, axis=-1)  # Add a dimension for channels (1)
-            
-            xTest = np.expand_dims(xTest, axis=-1)    # Same for test data
-            xTest = np.expand_dims(xTest, axis=-1)
+            xTest = toConvInput(xTest)
 
             inputShape = (xTrain.shape[1], 1, 1)  # Adjusted input shape for CNN
             model = buildCnnModel(inputShape)
             
             #Train model
-            model.fit(xTrain, yTrain, validation_data=(xTest, yTest), epochs=15, batch_size=32)
+            epochs = 15
+            if augment:
+                stream = AugmentedBatchStream(xTrain, yTrain, batchSize=32, seed=seed, layout=SUMMARY_LAYOUT, scaler=scaler)
+                batches = ((toConvInput(xBatch), yBatch) for xBatch, yBatch in stream.batches(epochs))
+                model.fit(batches, steps_per_epoch=len(stream), validation_data=(xTest, yTest), epochs=epochs)
+            else:
+                model.fit(toConvInput(xTrain), yTrain, validation_data=(xTest, yTest), epochs=epochs, batch_size=32)
             
             # Evaluate model on test data
             testLoss, testAccuracy = model.evaluate(xTest, yTest)
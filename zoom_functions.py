@@ -1,7 +1,7 @@
 import tkinter as tk
 
 class ZoomManager:
-    def __init__(self, canvas, parent, progressBar, songDuration, chunkDuration, pygame):
+    def __init__(self, canvas, parent, progressBar, songDuration, chunkDuration, clock):
         self.canvas = canvas
         self.parent = parent
         self.progressBar = progressBar
@@ -9,7 +9,7 @@ class ZoomManager:
         self.chunkDuration = chunkDuration
         self.zoomLevel = 1.0 # Default zoom level
         self.totalWidth = 800 * self.zoomLevel
-        self.pygame = pygame
+        self.clock = clock
         self.minChunksInView = 10
         self.maxChunksInView = int(songDuration / chunkDuration) # Max chunks in view
         self.currentChunksInView = self.maxChunksInView
@@ -54,7 +54,7 @@ class ZoomManager:
 
         # Update the current section index based on playback offset and new visible duration
         if hasattr(self.parent, "playbackOffset"):
-            playbackTime = self.parent.playbackOffset + self.pygame.mixer.music.get_pos()
+            playbackTime = self.clock.positionMs()
             self.parent.currentSectionIndex = int(playbackTime // visibleDuration)
             
         self.parent.updateProgressBar()